@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Streaming Performance Analytics for European Indexes MT5 Bot
+Single-pass, constant-memory statistics over the trade journal and
+exported MT5 deal history
+
+Input is folded into fixed-size aggregates: TradeStats per group (symbol,
+weekday, range size, account), fixed-bin histograms for slippage and
+latency, and an equity curve thinned to a bounded number of points.
+Nothing is collected into lists or DataFrames, so memory does not grow
+with the length of the history.
+
+Sources:
+- Journal trade records (state/journal.jsonl): strategy view - range
+  size, intended entry vs fill, order round-trip latency. Streamed line
+  by line
+- Deal exports (scripts/analytics.py export-deals): broker view - realized
+  P&L including commission and swap, fill vs order price, order-to-deal
+  execution latency. Stored as one DEAL_DTYPE .npy file per account and
+  month, folded a month at a time with array operations (parsing text
+  would dominate the run time for millions of deals). The only state
+  kept between months is the handful of positions still open
+"""
+
+import logging
+import numpy as np
+from bisect import bisect_right
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional, Dict, Iterable, Iterator, Tuple
+
+from trade_store import TradeStats
+from journal import TradeJournal
+
+logger = logging.getLogger('EuropeanIndexesMT5.Analytics')
+
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+# Asia range as % of entry price (symbol-independent buckets)
+RANGE_PCT_EDGES = (0.25, 0.5, 0.75, 1.0, 1.5)
+
+# Adverse slippage in basis points of price (positive = worse than intended)
+SLIPPAGE_BPS_EDGES = tuple(x / 2 for x in range(-20, 21))
+
+# Milliseconds
+LATENCY_MS_EDGES = (5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+# MT5 deal constants (DEAL_TYPE_*, DEAL_ENTRY_*), so reports need no terminal
+DEAL_TYPE_BUY = 0
+DEAL_TYPE_SELL = 1
+DEAL_ENTRY_IN = 0
+DEAL_ENTRY_OUT = 1
+DEAL_ENTRY_INOUT = 2
+DEAL_ENTRY_OUT_BY = 3
+
+# One exported deal (joined with its order's requested price and setup time)
+DEAL_DTYPE = np.dtype([
+    ('ticket', 'i8'),
+    ('order', 'i8'),
+    ('position_id', 'i8'),
+    ('time_msc', 'i8'),
+    ('type', 'i1'),
+    ('entry', 'i1'),
+    ('magic', 'i8'),
+    ('symbol', 'U16'),
+    ('volume', 'f8'),
+    ('price', 'f8'),
+    ('profit', 'f8'),
+    ('commission', 'f8'),
+    ('swap', 'f8'),
+    ('fee', 'f8'),
+    ('order_price', 'f8'),     # 0 if the order was not found
+    ('order_time_msc', 'i8'),  # 0 if the order was not found
+])
+
+
+def _iso_ms(time_msc: int) -> str:
+    return datetime.utcfromtimestamp(int(time_msc) / 1000).isoformat(timespec='seconds')
+
+
+class Histogram:
+    """Fixed-bin histogram with running count/sum/min/max"""
+
+    __slots__ = ('edges', 'counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self, edges: Tuple[float, ...]):
+        self.edges = edges
+        self.counts = [0] * (len(edges) + 1)  # Underflow, bins, overflow
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        self.counts[bisect_right(self.edges, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def add_many(self, values: np.ndarray):
+        """Vectorized add() of an array of values"""
+        if len(values) == 0:
+            return
+        binned = np.bincount(np.searchsorted(self.edges, values, side='right'), minlength=len(self.counts))
+        self.counts = [a + int(b) for a, b in zip(self.counts, binned)]
+        self.count += len(values)
+        self.total += float(values.sum())
+        low, high = float(values.min()), float(values.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate quantile: upper edge of the bin holding it (exact min/max at the ends)"""
+        if self.count == 0:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                if i == 0:
+                    return self.min
+                if i == len(self.edges):
+                    return self.max
+                return min(self.edges[i], self.max)
+        return self.max
+
+    def as_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'max': self.max,
+            'edges': list(self.edges),
+            'counts': self.counts,
+        }
+
+
+class EquityCurve:
+    """Running equity and drawdown, keeping at most max_points curve samples"""
+
+    def __init__(self, max_points: int = 512):
+        self.max_points = max_points
+        self.points = []   # [timestamp, equity, drawdown]
+        self.stride = 1    # Keep every stride-th update
+        self.updates = 0
+        self.equity = 0.0
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+        self.max_drawdown_at = None
+
+    def add(self, timestamp: str, pnl: float):
+        self.equity += pnl
+        if self.equity > self.peak:
+            self.peak = self.equity
+        drawdown = self.peak - self.equity
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+            self.max_drawdown_at = timestamp
+
+        if self.updates % self.stride == 0:
+            self.points.append([timestamp, round(self.equity, 2), round(drawdown, 2)])
+            if len(self.points) > self.max_points:
+                # Halve the resolution instead of growing
+                self.points = self.points[::2]
+                self.stride *= 2
+        self.updates += 1
+
+    def add_many(self, times_msc: np.ndarray, pnls: np.ndarray):
+        """Vectorized add() for trades closed at epoch-millisecond times (in order)"""
+        if len(pnls) == 0:
+            return
+        equity = self.equity + np.cumsum(pnls)
+        peaks = np.maximum(np.maximum.accumulate(equity), self.peak)
+        drawdown = peaks - equity
+        worst = int(drawdown.argmax())
+        if drawdown[worst] > self.max_drawdown:
+            self.max_drawdown = float(drawdown[worst])
+            self.max_drawdown_at = _iso_ms(times_msc[worst])
+
+        # Same samples add() would keep: update numbers divisible by the stride
+        i = -self.updates % self.stride
+        while i < len(pnls):
+            self.points.append([_iso_ms(times_msc[i]), round(float(equity[i]), 2), round(float(drawdown[i]), 2)])
+            if len(self.points) > self.max_points:
+                self.points = self.points[::2]
+                self.stride *= 2
+            i += 1
+            i += -(self.updates + i) % self.stride
+
+        self.updates += len(pnls)
+        self.equity = float(equity[-1])
+        self.peak = float(peaks[-1])
+
+    def as_dict(self) -> Dict:
+        return {
+            'equity': self.equity,
+            'peak': self.peak,
+            'max_drawdown': self.max_drawdown,
+            'max_drawdown_at': self.max_drawdown_at,
+            'points': self.points,
+        }
+
+
+def range_bucket(range_size: Optional[float], price: float,
+                 edges: Tuple[float, ...] = RANGE_PCT_EDGES) -> str:
+    """Label of the range-size bucket ('0.50-0.75%'), 'unknown' without a range"""
+    if not range_size or not price:
+        return 'unknown'
+    i = bisect_right(edges, range_size / price * 100)
+    if i == 0:
+        return f"<{edges[0]:.2f}%"
+    if i == len(edges):
+        return f">={edges[-1]:.2f}%"
+    return f"{edges[i - 1]:.2f}-{edges[i]:.2f}%"
+
+
+def range_labels(edges: Tuple[float, ...] = RANGE_PCT_EDGES) -> Tuple[str, ...]:
+    """Every range_bucket() label, smallest range first"""
+    return (f"<{edges[0]:.2f}%",) + \
+        tuple(f"{low:.2f}-{high:.2f}%" for low, high in zip(edges, edges[1:])) + \
+        (f">={edges[-1]:.2f}%", 'unknown')
+
+
+def adverse_bps(fill: float, intended: float, direction: int) -> float:
+    """Slippage in basis points, positive when the fill was worse (direction 1 = buy)"""
+    return (fill - intended) * direction / intended * 1e4
+
+
+def _grouped(groups: Dict, key) -> TradeStats:
+    stats = groups.get(key)
+    if stats is None:
+        stats = groups[key] = TradeStats()
+    return stats
+
+
+class PerformanceAnalyzer:
+    """Fold journal trades and MT5 deals into a compact report, one record at a time"""
+
+    def __init__(self, range_edges: Tuple[float, ...] = RANGE_PCT_EDGES, curve_points: int = 512,
+                 magic: Optional[int] = None):
+        """
+        Initialize analyzer
+
+        Args:
+            range_edges: Range-size bucket edges in % of entry price
+            curve_points: Max samples kept per equity curve
+            magic: Only count deals with this magic number (None = all)
+        """
+        self.range_edges = range_edges
+        self.curve_points = curve_points
+        self.magic = magic
+
+        # Journal (strategy view)
+        self.trades = TradeStats()
+        self.by_symbol = {}
+        self.by_weekday = {}
+        self.by_range = {}
+        self.by_account = {}
+        self.by_reason = {}
+        self.curves = {}  # {account: EquityCurve}
+        self.slippage = Histogram(SLIPPAGE_BPS_EDGES)
+        self.latency = Histogram(LATENCY_MS_EDGES)
+        self.skipped = 0
+
+        # Deals (broker view)
+        self.deal_trades = TradeStats()
+        self.deal_by_symbol = {}
+        self.deal_by_weekday = {}
+        self.deal_by_account = {}
+        self.deal_curves = {}
+        self.deal_slippage = Histogram(SLIPPAGE_BPS_EDGES)
+        self.deal_latency = Histogram(LATENCY_MS_EDGES)
+        self.costs = {'commission': 0.0, 'swap': 0.0, 'fee': 0.0}
+        self.deals = 0
+        self.open_positions = {}  # {(account, position_id): position accumulator}
+
+    def _curve(self, curves: Dict, account) -> EquityCurve:
+        curve = curves.get(account)
+        if curve is None:
+            curve = curves[account] = EquityCurve(self.curve_points)
+        return curve
+
+    def add_trade(self, record: Dict, default_account=None):
+        """Fold one journal trade record"""
+        try:
+            pnl = float(record['pnl'])
+            symbol = record['symbol']
+            entry = float(record['entry_price'])
+            direction = 1 if record['direction'] == 'LONG' else -1
+            trading_date = record.get('date') or record['timestamp'][:10]
+            weekday = WEEKDAYS[date.fromisoformat(trading_date).weekday()]
+        except (KeyError, TypeError, ValueError):
+            self.skipped += 1
+            return
+
+        account = record.get('account') or default_account
+        self.trades.add(pnl)
+        _grouped(self.by_symbol, symbol).add(pnl)
+        _grouped(self.by_weekday, weekday).add(pnl)
+        _grouped(self.by_range, range_bucket(record.get('range_size'), entry, self.range_edges)).add(pnl)
+        _grouped(self.by_account, str(account)).add(pnl)
+        _grouped(self.by_reason, record.get('reason', 'unknown')).add(pnl)
+        self._curve(self.curves, str(account)).add(record.get('timestamp', trading_date), pnl)
+
+        intended = record.get('intended_entry')
+        if intended:
+            self.slippage.add(adverse_bps(entry, float(intended), direction))
+        latency = record.get('entry_latency_ms')
+        if latency is not None:
+            self.latency.add(float(latency))
+
+    def add_deals(self, deals: np.ndarray, account: str):
+        """
+        Fold one chunk of DEAL_DTYPE deals of one account (chunks in time order)
+
+        Entry deals give slippage against the order price and order-to-deal
+        latency. Every deal adds its profit and costs to its position; a
+        position is booked as one trade at the deal that brings its volume
+        back to zero, so partial closes and positions spanning chunks work.
+        """
+        mask = (deals['type'] == DEAL_TYPE_BUY) | (deals['type'] == DEAL_TYPE_SELL)
+        if self.magic is not None:
+            mask &= deals['magic'] == self.magic
+        d = deals[mask]
+        if len(d) == 0:
+            return
+
+        self.deals += len(d)
+        for cost in ('commission', 'swap', 'fee'):
+            self.costs[cost] += float(d[cost].sum())
+
+        # Fill quality on entries
+        is_in = d['entry'] == DEAL_ENTRY_IN
+        direction = np.where(d['type'] == DEAL_TYPE_BUY, 1.0, -1.0)
+        priced = is_in & (d['order_price'] > 0)
+        self.deal_slippage.add_many(adverse_bps(d['price'][priced], d['order_price'][priced], direction[priced]))
+        timed = is_in & (d['order_time_msc'] > 0)
+        self.deal_latency.add_many(np.maximum(0, d['time_msc'][timed] - d['order_time_msc'][timed]).astype(float))
+
+        # Per-position volume and P&L, carried over from earlier chunks
+        pids, group = np.unique(d['position_id'], return_inverse=True)
+        carry_volume = np.zeros(len(pids))
+        carry_pnl = np.zeros(len(pids))
+        for key in [k for k in self.open_positions if k[0] == account]:
+            slot = np.searchsorted(pids, key[1])
+            if slot < len(pids) and pids[slot] == key[1]:
+                carry_volume[slot], carry_pnl[slot] = self.open_positions.pop(key)
+
+        signed_volume = np.where(is_in, d['volume'], -d['volume'])
+        volume = carry_volume + np.bincount(group, weights=signed_volume, minlength=len(pids))
+        pnl = carry_pnl + np.bincount(group, weights=d['profit'] + d['commission'] + d['swap'] + d['fee'],
+                                      minlength=len(pids))
+        _, first_from_end = np.unique(d['position_id'][::-1], return_index=True)
+        last = len(d) - 1 - first_from_end  # Last deal of each position
+
+        closed = volume <= 1e-9
+        for slot in np.flatnonzero(~closed):
+            self.open_positions[(account, int(pids[slot]))] = (float(volume[slot]), float(pnl[slot]))
+
+        # Book closed positions in close order
+        last = last[closed]
+        order = np.argsort(d['time_msc'][last], kind='stable')
+        last = last[order]
+        pnl = pnl[closed][order]
+        times = d['time_msc'][last]
+        symbols = d['symbol'][last]
+        weekdays = (times // 86400000 + 3) % 7  # 1970-01-01 was a Thursday
+
+        self.deal_trades.add_many(pnl)
+        _grouped(self.deal_by_account, account).add_many(pnl)
+        for symbol in np.unique(symbols):
+            _grouped(self.deal_by_symbol, str(symbol)).add_many(pnl[symbols == symbol])
+        for weekday in np.unique(weekdays):
+            _grouped(self.deal_by_weekday, WEEKDAYS[weekday]).add_many(pnl[weekdays == weekday])
+        self._curve(self.deal_curves, account).add_many(times, pnl)
+
+    def report(self) -> Dict:
+        """Compact JSON-serializable report"""
+        def groups(stats: Dict) -> Dict:
+            return {key: s.as_dict() for key, s in sorted(stats.items(), key=lambda kv: str(kv[0]))}
+
+        return {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'journal': {
+                'totals': self.trades.as_dict(),
+                'by_symbol': groups(self.by_symbol),
+                'by_weekday': {d: self.by_weekday[d].as_dict() for d in WEEKDAYS if d in self.by_weekday},
+                'by_range_size': {label: self.by_range[label].as_dict()
+                                  for label in range_labels(self.range_edges) if label in self.by_range},
+                'by_account': groups(self.by_account),
+                'by_reason': groups(self.by_reason),
+                'equity': {account: c.as_dict() for account, c in self.curves.items()},
+                'slippage_bps': self.slippage.as_dict(),
+                'order_latency_ms': self.latency.as_dict(),
+                'skipped_records': self.skipped,
+            },
+            'deals': {
+                'deals': self.deals,
+                'totals': self.deal_trades.as_dict(),
+                'costs': self.costs,
+                'by_symbol': groups(self.deal_by_symbol),
+                'by_weekday': {d: self.deal_by_weekday[d].as_dict()
+                               for d in WEEKDAYS if d in self.deal_by_weekday},
+                'by_account': groups(self.deal_by_account),
+                'equity': {account: c.as_dict() for account, c in self.deal_curves.items()},
+                'slippage_bps': self.deal_slippage.as_dict(),
+                'execution_latency_ms': self.deal_latency.as_dict(),
+                'open_positions': len(self.open_positions),
+            },
+        }
+
+
+def deal_chunks(path) -> Iterator[np.ndarray]:
+    """Monthly DEAL_DTYPE arrays of one account export directory, oldest first"""
+    for chunk_file in sorted(Path(path).glob('*.npy')):
+        yield np.load(chunk_file)
+
+
+def analyze(journal_files: Iterable[str] = (), deal_dirs: Iterable[str] = (),
+            analyzer: Optional[PerformanceAnalyzer] = None) -> Dict:
+    """
+    Stream every journal and deal export once and return the report
+
+    Journals are read line by line; the account defaults to the file name
+    for records written before trades were tagged with one. Each deal
+    export directory is one account (state/deals/<login>/).
+    """
+    analyzer = analyzer or PerformanceAnalyzer()
+    for path in journal_files:
+        for record in TradeJournal(path).read('trade'):
+            analyzer.add_trade(record, default_account=path)
+    for path in deal_dirs:
+        account = Path(path).name
+        for chunk in deal_chunks(path):
+            analyzer.add_deals(chunk, account)
+    return analyzer.report()
+
+
+def deals_to_array(deals, orders: Optional[Dict] = None) -> np.ndarray:
+    """DEAL_DTYPE array from MT5 TradeDeal tuples (orders: {ticket: TradeOrder} for the join)"""
+    orders = orders or {}
+    rows = np.zeros(len(deals), dtype=DEAL_DTYPE)
+    for i, deal in enumerate(deals):
+        order = orders.get(deal.order)
+        rows[i] = (deal.ticket, deal.order, deal.position_id, deal.time_msc, deal.type, deal.entry,
+                   deal.magic, deal.symbol, deal.volume, deal.price, deal.profit, deal.commission,
+                   deal.swap, getattr(deal, 'fee', 0.0),
+                   order.price_open if order is not None else 0.0,
+                   order.time_setup_msc if order is not None else 0)
+    return rows[np.argsort(rows['time_msc'], kind='stable')]
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Multi-Timeframe Bar Builder for European Indexes MT5 Bot
+One M1 stream per symbol, every higher timeframe built from it
+
+Closed M1 bars are folded incrementally into M5/M15/H1/D1 bars kept in
+fixed-size NumPy ring buffers. Buckets are aligned to the session
+timezone (Dubai by default), so D1 bars run from local midnight and the
+Asia/London session edges always fall on bar boundaries. Every timeframe
+comes from the same M1 data, so they never disagree with each other, and
+the terminal is asked for one rates request per symbol instead of one per
+timeframe.
+
+Components subscribe to closed bars:
+
+    builder.subscribe(lambda symbol, timeframe, bar: ..., timeframes=['M5'])
+"""
+
+import logging
+import numpy as np
+import pytz
+from datetime import datetime
+from typing import Optional, Dict, List, Callable, Iterable
+
+logger = logging.getLogger('EuropeanIndexesMT5.Bars')
+
+BAR_DTYPE = np.dtype([
+    ('time', 'i8'),          # Bar open time, epoch seconds
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('tick_volume', 'f8'),
+])
+
+# Timeframe name -> length in seconds
+TIMEFRAMES = {
+    'M1': 60,
+    'M5': 300,
+    'M15': 900,
+    'H1': 3600,
+    'D1': 86400,
+}
+
+
+class BarRing:
+    """Fixed-capacity ring buffer of closed bars"""
+
+    def __init__(self, capacity: int):
+        self.data = np.zeros(capacity, dtype=BAR_DTYPE)
+        self.capacity = capacity
+        self.count = 0   # Bars ever appended
+        self.head = 0    # Next write position
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, bar):
+        self.data[self.head] = bar
+        self.head = (self.head + 1) % self.capacity
+        self.count += 1
+
+    def last(self, n: Optional[int] = None) -> np.ndarray:
+        """Up to n most recent bars, oldest first (a copy)"""
+        size = len(self)
+        n = size if n is None else min(n, size)
+        if n == 0:
+            return np.zeros(0, dtype=BAR_DTYPE)
+        start = (self.head - n) % self.capacity
+        if start + n <= self.capacity:
+            return self.data[start:start + n].copy()
+        return np.concatenate((self.data[start:], self.data[:self.head]))
+
+    def latest(self) -> Optional[np.void]:
+        """Most recent bar, or None"""
+        if self.count == 0:
+            return None
+        return self.data[(self.head - 1) % self.capacity].copy()
+
+
+class MultiTimeframeBarBuilder:
+    """Build aligned higher-timeframe bars from one M1 stream per symbol"""
+
+    def __init__(self, symbols: List[str],
+                 timeframes: Iterable[str] = ('M1', 'M5', 'M15', 'H1', 'D1'),
+                 capacity: int = 2000,
+                 timezone: str = 'Asia/Dubai'):
+        """
+        Initialize bar builder
+
+        Args:
+            symbols: Symbols to build bars for
+            timeframes: Timeframes to maintain (names from TIMEFRAMES)
+            capacity: Closed bars kept per symbol and timeframe
+            timezone: Bucket alignment timezone (D1 starts at local midnight)
+        """
+        unknown = [tf for tf in timeframes if tf not in TIMEFRAMES]
+        if unknown:
+            raise ValueError(f"Unknown timeframes: {unknown}")
+
+        self.symbols = list(symbols)
+        self.timeframes = sorted(set(timeframes), key=TIMEFRAMES.get)
+        self.tz = pytz.timezone(timezone)
+        self.rings = {s: {tf: BarRing(capacity) for tf in self.timeframes} for s in self.symbols}
+        self.forming = {s: {} for s in self.symbols}  # {symbol: {timeframe: bar}} partial bars
+        self.last_m1 = {s: None for s in self.symbols}  # Last M1 open time ingested
+        self.subscribers = []  # [(callback, timeframes or None, symbols or None)]
+
+        # UTC offset is cached per local day (DST can only change between days)
+        self._offset = 0
+        self._offset_valid = (0, -1)  # [start, end) epoch range the offset applies to
+
+    def subscribe(self, callback: Callable[[str, str, np.void], None],
+                  timeframes: Optional[Iterable[str]] = None,
+                  symbols: Optional[Iterable[str]] = None):
+        """
+        Call callback(symbol, timeframe, bar) whenever a bar closes
+
+        Args:
+            callback: Receives the closed bar as a BAR_DTYPE record
+            timeframes: Only these timeframes (default: all)
+            symbols: Only these symbols (default: all)
+        """
+        self.subscribers.append((callback,
+                                 set(timeframes) if timeframes else None,
+                                 set(symbols) if symbols else None))
+
+    def _utc_offset(self, t: int) -> int:
+        """Session-timezone UTC offset (seconds) at epoch time t"""
+        start, end = self._offset_valid
+        if not start <= t < end:
+            local = datetime.fromtimestamp(t, self.tz)
+            self._offset = int(local.utcoffset().total_seconds())
+            midnight = t - (t + self._offset) % 86400
+            self._offset_valid = (midnight, midnight + 86400)
+        return self._offset
+
+    def bucket(self, t: int, timeframe: str) -> int:
+        """Open time of the timeframe bucket containing t, aligned to local time"""
+        period = TIMEFRAMES[timeframe]
+        offset = self._utc_offset(t)
+        return t - (t + offset) % period
+
+    def _emit(self, symbol: str, timeframe: str, bar: np.void):
+        self.rings[symbol][timeframe].append(bar)
+        for callback, timeframes, symbols in self.subscribers:
+            if (timeframes is None or timeframe in timeframes) and (symbols is None or symbol in symbols):
+                try:
+                    callback(symbol, timeframe, bar)
+                except Exception as e:
+                    logger.error(f"Bar subscriber failed on {symbol} {timeframe}: {e}")
+
+    def on_m1(self, symbol: str, t: int, open_: float, high: float, low: float,
+              close: float, volume: float = 0.0):
+        """
+        Fold one closed M1 bar into every timeframe
+
+        A higher-timeframe bar closes as soon as the M1 bar covering its
+        last minute arrives (or when a later bucket starts, after a gap).
+        """
+        forming = self.forming[symbol]
+        for timeframe in self.timeframes:
+            period = TIMEFRAMES[timeframe]
+            start = self.bucket(t, timeframe)
+            bar = forming.get(timeframe)
+
+            if bar is not None and bar['time'] != start:
+                self._emit(symbol, timeframe, bar)  # Gap: previous bucket never got its last minute
+                bar = None
+
+            if bar is None:
+                bar = np.zeros((), dtype=BAR_DTYPE)
+                bar['time'] = start
+                bar['open'] = open_
+                bar['high'] = high
+                bar['low'] = low
+                bar['close'] = close
+                bar['tick_volume'] = volume
+            else:
+                if high > bar['high']:
+                    bar['high'] = high
+                if low < bar['low']:
+                    bar['low'] = low
+                bar['close'] = close
+                bar['tick_volume'] += volume
+
+            if t + 60 >= start + period:
+                self._emit(symbol, timeframe, bar)
+                forming.pop(timeframe, None)
+            else:
+                forming[timeframe] = bar
+
+        self.last_m1[symbol] = t
+
+    def ingest(self, symbol: str, rates: np.ndarray) -> int:
+        """
+        Feed closed M1 rates (MT5 copy_rates_* array), skipping bars already seen
+
+        Returns the number of new M1 bars.
+        """
+        if symbol not in self.forming or rates is None or len(rates) == 0:
+            return 0
+
+        times = np.asarray(rates['time'], dtype=np.int64)
+        last = self.last_m1[symbol]
+        new = np.flatnonzero(times > last) if last is not None else np.arange(len(times))
+        if 'tick_volume' in rates.dtype.names:
+            volumes = rates['tick_volume']
+        else:
+            volumes = np.zeros(len(rates))
+
+        for i in new:
+            self.on_m1(symbol, int(times[i]), float(rates['open'][i]), float(rates['high'][i]),
+                       float(rates['low'][i]), float(rates['close'][i]), float(volumes[i]))
+        return len(new)
+
+    def bars(self, symbol: str, timeframe: str, n: Optional[int] = None,
+             include_forming: bool = False) -> np.ndarray:
+        """
+        Closed bars for symbol/timeframe, oldest first
+
+        Args:
+            n: At most this many bars (default: all kept)
+            include_forming: Append the current partial bar, if any
+        """
+        closed = self.rings[symbol][timeframe].last(n)
+        forming = self.forming[symbol].get(timeframe)
+        if include_forming and forming is not None:
+            closed = np.concatenate((closed, forming.reshape(1)))
+            if n is not None:
+                closed = closed[-n:]
+        return closed
+
+    def window(self, symbol: str, timeframe: str, t1: int, t2: int) -> np.ndarray:
+        """Closed bars opening in [t1, t2) epoch seconds"""
+        bars = self.bars(symbol, timeframe)
+        lo, hi = np.searchsorted(bars['time'], [t1, t2], side='left')
+        return bars[lo:hi]
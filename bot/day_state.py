@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Day State Manager for European Indexes MT5 Bot
+Date-keyed per-day trading state with explicit rollover
+
+Everything that belongs to one trading day (Asia ranges, risk used) lives
+in a DayState tagged with its Dubai date. The loop calls check_rollover()
+at the top of every cycle; the first cycle on a new date swaps in a fresh
+DayState and hands back the finished one for archiving. The rollover does
+not depend on the loop waking up inside a particular time window, and a
+previous day's ranges can never be read on the next day.
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Optional, Dict
+
+logger = logging.getLogger('EuropeanIndexesMT5.DayState')
+
+
+class DayState:
+    """Trading state of one Dubai trading date"""
+
+    __slots__ = ('date', 'asia_ranges', 'daily_risk_used', 'pending_orders')
+
+    def __init__(self, trading_date: date):
+        self.date = trading_date
+        self.asia_ranges = {}  # {symbol: range_data}
+        self.daily_risk_used = 0
+        self.pending_orders = {}  # {symbol: OCO pair (pending entry mode)}
+
+
+class DayStateManager:
+    """Own the current DayState and roll it over when the trading date changes"""
+
+    def __init__(self, timezone, now: Optional[datetime] = None):
+        """
+        Initialize manager
+
+        Args:
+            timezone: pytz timezone that defines the trading date (Dubai)
+            now: Current time (default: datetime.now)
+        """
+        self.tz = timezone
+        self.current = DayState(self.trading_date(now))
+
+    def trading_date(self, now: Optional[datetime] = None) -> date:
+        """Trading date in the session timezone"""
+        if now is None:
+            return datetime.now(self.tz).date()
+        if now.tzinfo is None:
+            now = self.tz.localize(now)
+        return now.astimezone(self.tz).date()
+
+    def check_rollover(self, now: Optional[datetime] = None) -> Optional[DayState]:
+        """
+        Start a new DayState if the trading date has changed
+
+        Returns the finished DayState (for archiving), or None if still the
+        same day. Skipped dates (bot stopped over a weekend) roll over once.
+        """
+        today = self.trading_date(now)
+        if today == self.current.date:
+            return None
+
+        previous = self.current
+        self.current = DayState(today)
+        logger.info(f"📅 Day rollover: {previous.date} → {today}")
+        return previous
+
+    def day_summary(self, state: DayState) -> Dict:
+        """Per-day fields for the journal's day record"""
+        return {
+            'daily_risk_used': state.daily_risk_used,
+            'pending_orders': {symbol: pair['status'] for symbol, pair in state.pending_orders.items()},
+            'asia_ranges': {
+                symbol: {
+                    'asia_high': r['asia_high'],
+                    'asia_low': r['asia_low'],
+                    'range_size': r['range_size'],
+                }
+                for symbol, r in state.asia_ranges.items()
+            },
+        }
@@ -13,7 +13,6 @@ Strategy: Asia-London range breakout reversal
 Expected Performance: 88-261% annual return, 86-92% win rate
 """
 
-import MetaTrader5 as mt5
 import pandas as pd
 import numpy as np
 from datetime import datetime, time as dt_time, timedelta
@@ -22,51 +21,108 @@ import time
 import logging
 import json
 import os
+from collections import deque
 from typing import Optional, Dict, List
 from pathlib import Path
 
-# Setup comprehensive logging
-log_dir = Path(__file__).resolve().parents[2] / 'logs'
-log_dir.mkdir(exist_ok=True)
+from log_setup import setup_logging
+from mt5_gateway import load_mt5
+from runtime_state import RuntimeSnapshot
+from symbol_resolver import SymbolResolver
+from live_state import LiveStateWriter
+from exposure import CorrelationExposureLimiter
+from trade_store import TradeStore, TradeStats
+from bar_builder import MultiTimeframeBarBuilder
+from journal import TradeJournal
+from day_state import DayStateManager
+from mt5_executor import MT5Executor, LoopWatchdog
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_dir / 'european_indexes_mt5.log'),
-        logging.StreamHandler()
-    ]
-)
+# Setup comprehensive logging (queued, written by a background thread)
+log_dir = Path(__file__).resolve().parents[2] / 'logs'
+log_file = log_dir / 'european_indexes_mt5.log'
+setup_logging(log_file)
 logger = logging.getLogger('EuropeanIndexesMT5')
 
+# MetaTrader5 module, or a client of the shared MT5 gateway when MT5_GATEWAY is set.
+# Every call runs through the executor, so a hung terminal costs a deadline, not the loop.
+mt5 = MT5Executor(load_mt5())
+
+MAGIC_NUMBER = 234000
+ENTRY_MODES = ('market', 'pending')
+
+# Trade server clocks run at most this far from UTC; larger offsets come from stale quotes
+MAX_SERVER_OFFSET = 14 * 3600
+
 
 class TradeMonitor:
     """Monitor trades, errors, and performance"""
     
-    def __init__(self, state_file: str):
+    def __init__(self, state_file: str, journal: Optional[TradeJournal] = None,
+                 max_errors_kept: int = 200, history_limit: int = 10000):
+        """
+        Initialize monitor
+        
+        Args:
+            state_file: JSON file with today's trades/errors and total PnL
+            journal: Archive every closed trade here (optional)
+            max_errors_kept: Most recent errors kept in memory (all are counted)
+            history_limit: Trade rows kept in the store across days (the
+                journal has the full history)
+        """
         self.state_file = state_file
-        self.trades_today = []
-        self.errors_today = []
+        self.journal = journal
+        self.history_limit = history_limit
+        self.trading_date = None  # Set by the bot on each day rollover
+        self.store = TradeStore()  # Columnar history, kept across days
+        self.day_start = 0  # First store row of the current day
+        self.daily = TradeStats()
+        self.daily_by_symbol = {}  # {symbol: TradeStats} for today
+        self.errors_today = deque(maxlen=max_errors_kept)
+        self.error_count = 0
+        self.errors_by_symbol = {}  # {symbol: error count} for today
         self.daily_pnl = 0
         self.total_pnl = 0
+    
+    @property
+    def trades_today(self) -> List[Dict]:
+        """Today's trades as dicts (built from the columnar store)"""
+        return list(self.store.records(self.day_start))
+    
+    def reset_day(self, trading_date=None):
+        """Start a new trading day (recent history stays in the store)"""
+        self.store.trim(self.history_limit)
+        self.day_start = len(self.store)
+        self.trading_date = trading_date
+        self.daily = TradeStats()
+        self.daily_by_symbol = {}
+        self.errors_today.clear()
+        self.error_count = 0
+        self.errors_by_symbol = {}
+        self.daily_pnl = 0
+    
+    def _record_trade(self, symbol: str, direction: str, entry: float, exit: float,
+                      pnl: float, reason: str, timestamp: Optional[float] = None):
+        """Insert a trade and update running aggregates (no I/O)"""
+        self.store.append(symbol, direction, entry, exit, pnl, reason, timestamp)
+        self.daily.add(pnl)
+        if symbol not in self.daily_by_symbol:
+            self.daily_by_symbol[symbol] = TradeStats()
+        self.daily_by_symbol[symbol].add(pnl)
         
     def log_trade(self, symbol: str, direction: str, entry: float, exit: float, 
-                   pnl: float, reason: str):
-        """Log trade details"""
-        trade = {
-            'timestamp': datetime.now().isoformat(),
-            'symbol': symbol,
-            'direction': direction,
-            'entry_price': entry,
-            'exit_price': exit,
-            'pnl': pnl,
-            'reason': reason
-        }
-        self.trades_today.append(trade)
+                   pnl: float, reason: str, details: Optional[Dict] = None):
+        """Log trade details (details: extra journal-only fields, e.g. intended entry)"""
+        self._record_trade(symbol, direction, entry, exit, pnl, reason)
         self.daily_pnl += pnl
         self.total_pnl += pnl
+        if self.journal is not None:
+            record = self.store.record(len(self.store) - 1)
+            if details:
+                record.update(details)
+            self.journal.append_trade(self.trading_date or datetime.now().date(), record)
         
-        logger.info(f"📊 TRADE: {symbol} {direction} | Entry: {entry:.2f} → Exit: {exit:.2f} | PnL: {pnl:.2f} | Reason: {reason}")
+        logger.info("📊 TRADE: %s %s | Entry: %.2f → Exit: %.2f | PnL: %.2f | Reason: %s",
+                    symbol, direction, entry, exit, pnl, reason)
         self.save_state()
     
     def log_error(self, error_type: str, message: str, symbol: str = None):
@@ -78,23 +134,23 @@ class TradeMonitor:
             'symbol': symbol
         }
         self.errors_today.append(error)
-        logger.error(f"❌ ERROR [{error_type}]: {message} | Symbol: {symbol}")
+        self.error_count += 1
+        self.errors_by_symbol[symbol] = self.errors_by_symbol.get(symbol, 0) + 1
+        logger.error("❌ ERROR [%s]: %s | Symbol: %s", error_type, message, symbol)
         self.save_state()
     
     def get_stats(self) -> Dict:
-        """Get trading statistics"""
-        wins = sum(1 for t in self.trades_today if t['pnl'] > 0)
-        total_trades = len(self.trades_today)
-        win_rate = (wins / total_trades * 100) if total_trades > 0 else 0
-        
+        """Get trading statistics (O(1) - read from running aggregates)"""
         return {
-            'trades_today': total_trades,
-            'wins': wins,
-            'losses': total_trades - wins,
-            'win_rate': win_rate,
+            'trades_today': self.daily.trades,
+            'wins': self.daily.wins,
+            'losses': self.daily.losses,
+            'win_rate': self.daily.win_rate,
             'daily_pnl': self.daily_pnl,
             'total_pnl': self.total_pnl,
-            'errors_today': len(self.errors_today)
+            'max_drawdown_today': self.daily.max_drawdown,
+            'errors_today': self.error_count,
+            'by_symbol': {s: st.as_dict() for s, st in self.daily_by_symbol.items()}
         }
     
     def save_state(self):
@@ -103,10 +159,11 @@ class TradeMonitor:
             os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
             state = {
                 'trades_today': self.trades_today,
-                'errors_today': self.errors_today,
+                'errors_today': list(self.errors_today),
                 'daily_pnl': self.daily_pnl,
                 'total_pnl': self.total_pnl,
                 'stats': self.get_stats(),
+                'trading_date': self.trading_date.isoformat() if self.trading_date else None,
                 'last_update': datetime.now().isoformat()
             }
             with open(self.state_file, 'w') as f:
@@ -115,13 +172,32 @@ class TradeMonitor:
             logger.error(f"Error saving state: {e}")
     
     def load_state(self):
-        """Load previous state"""
+        """Load previous state (today's trades/errors too, when saved on this Dubai trading day)"""
         try:
             if os.path.exists(self.state_file):
                 with open(self.state_file, 'r') as f:
                     state = json.load(f)
                     self.total_pnl = state.get('total_pnl', 0)
                     logger.info(f"Loaded state: Total PnL = {self.total_pnl:.2f}")
+                    
+                    # Older state files only carry the host-local save time
+                    saved_date = state.get('trading_date') or state.get('last_update', '')[:10]
+                    if saved_date == (self.trading_date or datetime.now().date()).isoformat():
+                        for trade in state.get('trades_today', []):
+                            self._record_trade(
+                                trade['symbol'], trade['direction'],
+                                trade['entry_price'], trade['exit_price'],
+                                trade['pnl'], trade['reason'],
+                                datetime.fromisoformat(trade['timestamp']).timestamp()
+                            )
+                        for error in state.get('errors_today', []):
+                            self.errors_today.append(error)
+                            self.error_count += 1
+                            symbol = error.get('symbol')
+                            self.errors_by_symbol[symbol] = self.errors_by_symbol.get(symbol, 0) + 1
+                        self.daily_pnl = state.get('daily_pnl', 0)
+                        logger.info(f"Resumed today's state: {self.daily.trades} trades | "
+                                    f"Daily PnL = {self.daily_pnl:.2f}")
         except Exception as e:
             logger.error(f"Error loading state: {e}")
     
@@ -133,7 +209,7 @@ class TradeMonitor:
         logger.info("="*60)
         logger.info(f"Trades: {stats['trades_today']} | Wins: {stats['wins']} | Losses: {stats['losses']}")
         logger.info(f"Win Rate: {stats['win_rate']:.1f}%")
-        logger.info(f"Daily P&L: {stats['daily_pnl']:.2f}")
+        logger.info(f"Daily P&L: {stats['daily_pnl']:.2f} | Max Drawdown: {stats['max_drawdown_today']:.2f}")
         logger.info(f"Total P&L: {stats['total_pnl']:.2f}")
         logger.info(f"Errors: {stats['errors_today']}")
         logger.info("="*60)
@@ -150,7 +226,12 @@ class EuropeanIndexesMT5Bot:
                  stop_loss_pct: float = 1.5,
                  max_risk_per_trade: float = 0.02,
                  max_daily_risk: float = 0.05,
-                 lot_size: float = 0.01):
+                 lot_size: float = 0.01,
+                 status_log_every: int = 1,
+                 close_on_shutdown: bool = False,
+                 symbol_aliases: Dict[str, List[str]] = None,
+                 max_correlated_exposure: float = 2.0,
+                 entry_mode: str = 'market'):
         """
         Initialize MT5 bot
         
@@ -160,7 +241,22 @@ class EuropeanIndexesMT5Bot:
             max_risk_per_trade: Max risk per trade (2% default)
             max_daily_risk: Max daily risk (5% default)
             lot_size: Position size in lots
+            status_log_every: Log the per-cycle status lines at INFO every N
+                cycles (DEBUG otherwise)
+            close_on_shutdown: Close open positions when the bot stops. Off by
+                default - positions keep their broker-side SL/TP and are
+                picked up again by warm_start() on restart
+            symbol_aliases: Alias groups for broker symbol resolution
+                (config.json "symbol_variations"), e.g. {'DAX': ['GER40', 'DE40']}
+            max_correlated_exposure: Cap on correlated open risk in units of one
+                trade (2.0 = at most the equivalent of two independent trades)
+            entry_mode: 'market' polls ticks and enters at market on a breakout;
+                'pending' rests an OCO pair of limit orders at the range edges
+                from London open, so the broker triggers the entry
         """
+        if entry_mode not in ENTRY_MODES:
+            raise ValueError(f"entry_mode must be one of {ENTRY_MODES}, got {entry_mode!r}")
+        
         # Default symbols for prop firms (check your broker's symbol names)
         if symbols is None:
             self.symbols = ['GER40', 'FRA40', 'UK100', 'EUSTX50']  # Common MT5 names
@@ -171,6 +267,11 @@ class EuropeanIndexesMT5Bot:
         self.max_risk_per_trade = max_risk_per_trade
         self.max_daily_risk = max_daily_risk
         self.lot_size = lot_size
+        self.status_log_every = max(1, status_log_every)
+        self.close_on_shutdown = close_on_shutdown
+        self.max_correlated_exposure = max_correlated_exposure
+        self.entry_mode = entry_mode
+        self.cycle_count = 0
         
         # Time zones
         self.dubai_tz = pytz.timezone('Asia/Dubai')
@@ -182,20 +283,116 @@ class EuropeanIndexesMT5Bot:
         self.london_start_hour = 11
         self.london_end_hour = 14
         
-        # State tracking
-        self.asia_ranges = {}  # {symbol: range_data}
+        # State tracking (ranges and daily risk live in the current DayState)
+        self.days = DayStateManager(self.dubai_tz)
         self.current_trades = {}  # {symbol: trade_data}
-        self.daily_risk_used = 0
+        self.last_ticks = {}  # {symbol: last tick seen by the loop}
+        self.live_state = None  # Shared-memory publisher (see publish_live_state)
+        self.exposure = CorrelationExposureLimiter(self.symbols, max_correlated_exposure)
+        self.bars = self.create_bar_builder()
+        self.last_bar_fetch = {}  # {symbol: monotonic time of its last ingested M1 fetch}
+        self.server_offset = 0  # Trade server clock minus UTC (seconds); MT5 bar times are server time
+        self.forming_m1 = {}  # {symbol: server time of the forming M1 bar at the last fetch}
+        self.account = None  # Login of the connected account (tags journal trades)
+        self.degraded = False  # Close-only mode after MT5 timeouts or a loop stall
+        self.healthy_cycles = 0  # Clean cycles since the last reconnect
+        self.watchdog = LoopWatchdog()
         
         # Monitoring
         state_dir = Path(__file__).resolve().parents[2] / 'state'
         state_dir.mkdir(exist_ok=True)
-        self.monitor = TradeMonitor(str(state_dir / 'european_indexes_mt5_state.json'))
+        self.journal = TradeJournal(str(state_dir / 'journal.jsonl'))
+        self.monitor = TradeMonitor(str(state_dir / 'european_indexes_mt5_state.json'), self.journal)
+        self.monitor.trading_date = self.days.current.date
+        self.snapshot = RuntimeSnapshot(str(state_dir / 'european_indexes_mt5_runtime.json'))
+        self.resolver = SymbolResolver(symbol_aliases, cache_dir=str(state_dir / 'symbols'))
         
         logger.info("European Indexes MT5 Bot initialized")
         logger.info(f"Symbols: {', '.join(self.symbols)}")
         logger.info(f"Stop Loss: {self.stop_loss_pct*100:.0f}% of range")
         logger.info(f"Max Risk/Trade: {self.max_risk_per_trade*100:.0f}%")
+        logger.info(f"Entry Mode: {self.entry_mode}")
+    
+    @property
+    def asia_ranges(self) -> Dict:
+        """Today's Asia ranges {symbol: range_data}"""
+        return self.days.current.asia_ranges
+    
+    @asia_ranges.setter
+    def asia_ranges(self, ranges: Dict):
+        self.days.current.asia_ranges = ranges
+    
+    @property
+    def daily_risk_used(self) -> float:
+        return self.days.current.daily_risk_used
+    
+    @daily_risk_used.setter
+    def daily_risk_used(self, value: float):
+        self.days.current.daily_risk_used = value
+    
+    @property
+    def reserved_risk(self) -> float:
+        """Risk held by resting OCO pairs with no fill yet (each can fill one leg)"""
+        return sum(pair['risk'] for pair in self.pending_orders.values()
+                   if pair['orders'] and 'FILLED' not in pair['resolved'].values())
+    
+    def roll_day(self, now: Optional[datetime] = None) -> bool:
+        """
+        Roll over to a new trading day on the first cycle of a new date
+        
+        The finished day (ranges, risk used, trade stats) is archived to the
+        journal before the in-memory state is reset. Returns True on rollover.
+        """
+        previous = self.days.check_rollover(now)
+        if previous is None:
+            return False
+        
+        summary = self.days.day_summary(previous)
+        summary.update(self.monitor.get_stats())
+        self.journal.append_day(previous.date, summary)
+        
+        self.monitor.reset_day(self.days.current.date)
+        self.save_snapshot()
+        logger.info(f"Daily state reset | Archived {previous.date}: "
+                    f"{summary['trades_today']} trades | PnL {summary['daily_pnl']:.2f}")
+        return True
+    
+    @property
+    def close_only(self) -> bool:
+        """No new entries: degraded, or a stall the loop has not handled yet"""
+        return self.degraded or self.watchdog.stall_detected.is_set()
+    
+    def handle_loop_stall(self):
+        """
+        Handle a stall flagged by the watchdog (on the loop thread, so state
+        writes and the trade store are never touched concurrently): close-only
+        mode and a fresh terminal connection
+        """
+        overdue = self.watchdog.take_stall()
+        if overdue is None:
+            return
+        self.degraded = True
+        self.healthy_cycles = 0
+        self.monitor.log_error("LOOP_STALL", f"Main loop heartbeat overdue by {overdue:.0f}s - reconnecting")
+        mt5.reconnect()
+    
+    def check_mt5_health(self):
+        """
+        Enter close-only mode on MT5 timeouts and reconnect; leave it after
+        three clean cycles on the new connection
+        """
+        if not mt5.healthy:
+            if not self.degraded:
+                logger.warning("⚠️  MT5 calls timing out - entering close-only mode")
+            self.degraded = True
+            self.healthy_cycles = 0
+            self.monitor.log_error("MT5_TIMEOUT", f"{mt5.timeouts} call(s) over deadline - reconnecting")
+            mt5.reconnect()
+        elif self.degraded:
+            self.healthy_cycles += 1
+            if self.healthy_cycles >= 3:
+                self.degraded = False
+                logger.info("✅ MT5 responsive again - leaving close-only mode")
     
     def connect_mt5(self) -> bool:
         """Connect to MT5"""
@@ -212,17 +409,45 @@ class EuropeanIndexesMT5Bot:
             
             logger.info(f"✅ Connected to MT5")
             logger.info(f"Account: {account_info.login} | Balance: ${account_info.balance:.2f}")
+            self.account = account_info.login
             logger.info(f"Server: {account_info.server}")
             
-            # Verify symbols
+            # Map configured names to this broker's symbols
+            # (one symbols_get() scan, cached per server)
+            resolved = self.resolver.resolve_with_terminal(mt5, account_info.server, self.symbols)
+            selected = {symbol: resolved.get(symbol) is not None and mt5.symbol_select(resolved[symbol], True)
+                        for symbol in self.symbols}
+            failed = [symbol for symbol, ok in selected.items() if not ok]
+            if failed and not self.resolver.scanned:
+                # Cached names the broker has since renamed or removed: rescan once
+                self.resolver.invalidate(account_info.server, failed)
+                resolved.update(self.resolver.resolve_with_terminal(mt5, account_info.server, failed))
+                for symbol in failed:
+                    selected[symbol] = resolved.get(symbol) is not None and mt5.symbol_select(resolved[symbol], True)
+            
+            broker_symbols = []
             for symbol in self.symbols:
-                symbol_info = mt5.symbol_info(symbol)
-                if symbol_info is None:
+                broker_symbol = resolved.get(symbol)
+                if not selected[symbol]:
                     self.monitor.log_error("SYMBOL_ERROR", f"Symbol not found: {symbol}", symbol)
                     logger.warning(f"⚠️  Symbol {symbol} not available - check broker symbol names")
+                    continue
+                
+                description = self.resolver.describe(mt5, broker_symbol)
+                if broker_symbol != symbol:
+                    logger.info(f"✓ {symbol} → {broker_symbol} {description}")
                 else:
-                    logger.info(f"✓ {symbol}: {symbol_info.description}")
+                    logger.info(f"✓ {symbol}: {description}")
+                broker_symbols.append(broker_symbol)
+            
+            if not broker_symbols:
+                self.monitor.log_error("SYMBOL_ERROR", "No configured symbols available on this server")
+                return False
             
+            self.symbols = broker_symbols
+            self.exposure = CorrelationExposureLimiter(self.symbols, self.max_correlated_exposure)
+            self.bars = self.create_bar_builder()
+            self.last_bar_fetch = {}  # New builder: warm up again
             return True
             
         except Exception as e:
@@ -231,7 +456,10 @@ class EuropeanIndexesMT5Bot:
     
     def disconnect_mt5(self):
         """Disconnect from MT5"""
-        mt5.shutdown()
+        try:
+            mt5.shutdown()
+        except Exception as e:
+            logger.warning(f"⚠️  MT5 shutdown failed: {e}")
         logger.info("Disconnected from MT5")
     
     def get_historical_data(self, symbol: str, timeframe: int, bars: int = 100) -> pd.DataFrame:
@@ -264,8 +492,90 @@ class EuropeanIndexesMT5Bot:
             self.monitor.log_error("DATA_ERROR", f"Error getting data for {symbol}: {e}", symbol)
             return pd.DataFrame()
     
+    def create_bar_builder(self) -> MultiTimeframeBarBuilder:
+        """Bar builder for the current symbols, with the exposure model subscribed to M5"""
+        builder = MultiTimeframeBarBuilder(self.symbols, timezone='Asia/Dubai')
+        builder.subscribe(
+            lambda symbol, timeframe, bar: self.exposure.on_bar(symbol, int(bar['time']), float(bar['close'])),
+            timeframes=['M5']
+        )
+        return builder
+    
+    def refresh_bars(self, warmup_bars: int = 1440):
+        """
+        Fetch new closed M1 bars - one rates request per symbol - into the bar builder
+        
+        The first call loads warmup_bars (a full day, so today's Asia session
+        is covered); later calls only ask each symbol for the minutes elapsed
+        since its last successful fetch, so a failed or empty fetch is made up
+        next time. M5/M15/H1/D1 are all derived from this one stream.
+        
+        MT5 stamps bars in trade server time. The server offset is taken from
+        the forming minute of a symbol that is ticking, and bar times are
+        shifted to UTC before the builder buckets them to Dubai sessions.
+        """
+        now = time.monotonic()
+        
+        def bar_count(symbol):
+            fetched = self.last_bar_fetch.get(symbol)
+            if fetched is None:
+                return warmup_bars
+            return min(warmup_bars, int((now - fetched) // 60) + 3)
+        
+        try:
+            calls = [('copy_rates_from_pos', (symbol, mt5.TIMEFRAME_M1, 0, bar_count(symbol)), {})
+                     for symbol in self.symbols]
+            if hasattr(mt5, 'batch'):
+                results = mt5.batch(calls)  # Gateway: every symbol in one round trip
+            else:
+                results = [mt5.copy_rates_from_pos(*args) for _, args, _ in calls]
+            
+            received = []
+            for symbol, rates in zip(self.symbols, results):
+                if rates is None or isinstance(rates, Exception) or len(rates) == 0:
+                    self.monitor.log_error("DATA_ERROR", f"No M1 data received for {symbol}", symbol)
+                    continue
+                received.append((symbol, rates))
+            
+            self.update_server_offset(received)
+            for symbol, rates in received:
+                # The last row is the still-forming minute
+                closed = rates[:-1].copy()
+                closed['time'] -= self.server_offset
+                self.bars.ingest(symbol, closed)
+                self.last_bar_fetch[symbol] = now
+                
+        except Exception as e:
+            self.monitor.log_error("DATA_ERROR", f"Error refreshing bars: {e}")
+    
+    def update_server_offset(self, received: List):
+        """
+        Re-derive the server clock offset from the forming M1 bars just fetched
+        
+        Only symbols whose forming minute moved since the last fetch count (a
+        closed market's last bar is old and would understate the offset); on
+        the first fetch every symbol counts and the freshest wins.
+        """
+        first_fetch = not self.forming_m1
+        offsets = []
+        for symbol, rates in received:
+            forming = int(rates['time'][-1])
+            if first_fetch or forming > self.forming_m1.get(symbol, forming):
+                offsets.append(self.server_time_offset(forming))
+            self.forming_m1[symbol] = forming
+        
+        if not offsets:
+            return
+        offset = max(offsets)
+        if abs(offset) > MAX_SERVER_OFFSET:
+            logger.warning("Ignoring server time offset of %.1fh (stale quotes)", offset / 3600)
+            return
+        if offset != self.server_offset:
+            logger.info("🕒 Server time offset: UTC%+.1fh", offset / 3600)
+            self.server_offset = offset
+    
     def identify_asia_range(self, symbol: str) -> Optional[Dict]:
-        """Identify Asia session range for symbol"""
+        """Identify Asia session range for symbol (from the bar builder's M5 bars)"""
         try:
             now_dubai = datetime.now(self.dubai_tz)
             today = now_dubai.date()
@@ -274,24 +584,14 @@ class EuropeanIndexesMT5Bot:
             asia_start = self.dubai_tz.localize(datetime.combine(today, dt_time(self.asia_start_hour, 0)))
             asia_end = self.dubai_tz.localize(datetime.combine(today, dt_time(self.asia_end_hour, 0)))
             
-            asia_start_utc = asia_start.astimezone(pytz.UTC)
-            asia_end_utc = asia_end.astimezone(pytz.UTC)
-            
-            # Get data
-            df = self.get_historical_data(symbol, mt5.TIMEFRAME_M5, bars=100)
-            
-            if df.empty:
-                return None
-            
-            # Filter for Asia session
-            asia_data = df[(df.index >= asia_start_utc) & (df.index < asia_end_utc)]
+            asia_data = self.bars.window(symbol, 'M5', int(asia_start.timestamp()), int(asia_end.timestamp()))
             
             if len(asia_data) < 3:
                 logger.warning(f"{symbol}: Insufficient Asia data ({len(asia_data)} bars)")
                 return None
             
-            asia_high = asia_data['high'].max()
-            asia_low = asia_data['low'].min()
+            asia_high = float(asia_data['high'].max())
+            asia_low = float(asia_data['low'].min())
             range_size = asia_high - asia_low
             
             # Validate range
@@ -299,20 +599,51 @@ class EuropeanIndexesMT5Bot:
                 logger.warning(f"{symbol}: Range too small ({range_size:.2f})")
                 return None
             
-            logger.info(f"✓ {symbol} Asia Range: {asia_low:.2f} - {asia_high:.2f} (Size: {range_size:.2f})")
+            final = now_dubai >= asia_end
+            logger.info(f"✓ {symbol} Asia Range{'' if final else ' (provisional)'}: "
+                        f"{asia_low:.2f} - {asia_high:.2f} (Size: {range_size:.2f})")
             
             return {
                 'date': today,
                 'asia_high': asia_high,
                 'asia_low': asia_low,
                 'range_size': range_size,
-                'identified_at': now_dubai
+                'identified_at': now_dubai,
+                'final': final  # Built from the whole Asia session (safe to trade)
             }
             
         except Exception as e:
             self.monitor.log_error("RANGE_ERROR", f"Error identifying range: {e}", symbol)
             return None
     
+    def finalize_asia_ranges(self, include_missing: bool = True):
+        """
+        Rebuild provisional ranges from the complete Asia session once it has closed
+        
+        Ranges found during Asia only cover the bars seen so far; they are
+        recomputed here and dropped if that fails, so London never trades a
+        partial range. include_missing also retries symbols with no range yet.
+        """
+        changed = False
+        for symbol in self.symbols:
+            current = self.asia_ranges.get(symbol)
+            if current is not None and current.get('final'):
+                continue
+            if current is None and not include_missing:
+                continue
+            
+            asia_range = self.identify_asia_range(symbol)
+            if asia_range and asia_range['final']:
+                self.asia_ranges[symbol] = asia_range
+                changed = True
+            elif current is not None:
+                logger.warning("%s: provisional Asia range could not be finalized - not trading it", symbol)
+                del self.asia_ranges[symbol]
+                changed = True
+        
+        if changed:
+            self.save_snapshot()
+    
     def check_breakout(self, symbol: str) -> Optional[str]:
         """Check if price broke Asia range"""
         if symbol not in self.asia_ranges:
@@ -323,16 +654,17 @@ class EuropeanIndexesMT5Bot:
             tick = mt5.symbol_info_tick(symbol)
             if tick is None:
                 return None
+            self.last_ticks[symbol] = tick
             
             current_price = tick.bid
             asia_range = self.asia_ranges[symbol]
             
             # Check breakout
             if current_price > asia_range['asia_high']:
-                logger.info(f"{symbol} breakout ABOVE: {current_price:.2f} > {asia_range['asia_high']:.2f}")
+                logger.info("%s breakout ABOVE: %.2f > %.2f", symbol, current_price, asia_range['asia_high'])
                 return 'SHORT'  # Fade the breakout
             elif current_price < asia_range['asia_low']:
-                logger.info(f"{symbol} breakout BELOW: {current_price:.2f} < {asia_range['asia_low']:.2f}")
+                logger.info("%s breakout BELOW: %.2f < %.2f", symbol, current_price, asia_range['asia_low'])
                 return 'LONG'  # Fade the breakout
             
             return None
@@ -343,6 +675,10 @@ class EuropeanIndexesMT5Bot:
     
     def place_order(self, symbol: str, direction: str, entry_price: float) -> bool:
         """Place order with stop loss and take profit"""
+        if self.close_only:
+            logger.warning("%s: close-only mode - skipping %s entry", symbol, direction)
+            return False
+        
         try:
             asia_range = self.asia_ranges[symbol]
             
@@ -358,10 +694,15 @@ class EuropeanIndexesMT5Bot:
                 stop_loss = entry_price + stop_distance
                 order_type = mt5.ORDER_TYPE_SELL
             
-            # Check risk limit
+            # Check risk limit (resting OCO pairs count as if filled)
             risk_this_trade = self.lot_size * stop_distance
-            if self.daily_risk_used + risk_this_trade > self.max_daily_risk:
-                logger.warning(f"{symbol}: Daily risk limit reached")
+            if self.daily_risk_used + self.reserved_risk + risk_this_trade > self.max_daily_risk:
+                logger.warning("%s: Daily risk limit reached", symbol)
+                return False
+            
+            # Check correlated exposure across open positions (in-memory only)
+            self.exposure.sync_positions(self.current_trades)
+            if not self.exposure.check(symbol, direction):
                 return False
             
             # Prepare order
@@ -380,33 +721,39 @@ class EuropeanIndexesMT5Bot:
                 "sl": stop_loss,
                 "tp": target_price,
                 "deviation": 10,
-                "magic": 234000,
+                "magic": MAGIC_NUMBER,
                 "comment": "Asia-London Range",
                 "type_time": mt5.ORDER_TIME_GTC,
                 "type_filling": mt5.ORDER_FILLING_IOC,
             }
             
             # Send order
+            sent = time.perf_counter()
             result = mt5.order_send(request)
+            latency_ms = (time.perf_counter() - sent) * 1000
             
             if result.retcode != mt5.TRADE_RETCODE_DONE:
                 self.monitor.log_error("ORDER_ERROR", f"Order failed: {result.comment}", symbol)
                 return False
             
-            logger.info(f"✅ {symbol} order placed: {direction} {self.lot_size} lots @ {entry_price:.2f}")
-            logger.info(f"   Target: {target_price:.2f} | Stop: {stop_loss:.2f}")
+            logger.info("✅ %s order placed: %s %s lots @ %.2f", symbol, direction, self.lot_size, entry_price)
+            logger.info("   Target: %.2f | Stop: %.2f", target_price, stop_loss)
             
-            # Store trade
+            # Store trade (entry at the fill; the quote it was sent at is kept for slippage)
             self.current_trades[symbol] = {
                 'direction': direction,
-                'entry_price': entry_price,
+                'entry_price': result.price or entry_price,
                 'target_price': target_price,
                 'stop_loss': stop_loss,
                 'entry_time': datetime.now(self.dubai_tz),
-                'ticket': result.order
+                'ticket': result.order,
+                'intended_entry': entry_price,
+                'range_size': asia_range['range_size'],
+                'entry_latency_ms': latency_ms
             }
             
             self.daily_risk_used += risk_this_trade
+            self.save_snapshot()
             
             return True
             
@@ -414,6 +761,294 @@ class EuropeanIndexesMT5Bot:
             self.monitor.log_error("ORDER_ERROR", f"Error placing order: {e}", symbol)
             return False
     
+    @property
+    def pending_orders(self) -> Dict:
+        """Today's OCO pairs {symbol: pair} (pending entry mode)"""
+        return self.days.current.pending_orders
+    
+    @staticmethod
+    def server_time_offset(server_time: int) -> int:
+        """Trade server clock minus UTC in seconds (rounded to 30 min), from a fresh server timestamp"""
+        return int(round((server_time - time.time()) / 1800.0)) * 1800
+    
+    def place_pending_orders(self, symbol: str) -> bool:
+        """
+        Rest today's OCO pair: SELL LIMIT at the Asia high and BUY LIMIT at
+        the Asia low, each with its SL/TP, expiring at London end
+        
+        If price is already beyond an edge the breakout has happened and a
+        limit on that side would fill at once, so the fade is entered at
+        market instead. Returns True once the symbol's entry is in place.
+        """
+        if self.close_only:
+            logger.warning("%s: close-only mode - not placing pending orders", symbol)
+            return False
+        
+        try:
+            asia_range = self.asia_ranges[symbol]
+            tick = mt5.symbol_info_tick(symbol)
+            if tick is None:
+                return False
+            self.last_ticks[symbol] = tick
+            
+            # Breakout before the orders went in: market entry, as in market mode
+            if tick.bid > asia_range['asia_high'] or tick.ask < asia_range['asia_low']:
+                direction = 'SHORT' if tick.bid > asia_range['asia_high'] else 'LONG'
+                logger.info("%s already beyond the range at London open - %s at market", symbol, direction)
+                if not self.place_order(symbol, direction, tick.bid if direction == 'SHORT' else tick.ask):
+                    return False
+                self.pending_orders[symbol] = {'status': 'MARKET', 'orders': {}, 'resolved': {}, 'risk': 0.0}
+                return True
+            
+            symbol_info = mt5.symbol_info(symbol)
+            if symbol_info is None:
+                self.monitor.log_error("ORDER_ERROR", f"Symbol info not available", symbol)
+                return False
+            
+            # Limit prices must sit at least the stops level away from market
+            min_distance = symbol_info.trade_stops_level * symbol_info.point
+            if (asia_range['asia_high'] - tick.bid < min_distance
+                    or tick.ask - asia_range['asia_low'] < min_distance):
+                logger.debug("%s: price within stops level of a range edge - retrying next cycle", symbol)
+                return False
+            
+            # One leg at most can fill, so the pair reserves one trade's risk until it resolves;
+            # pairs already resting count too, so simultaneous fills can't overrun the limit
+            stop_distance = asia_range['range_size'] * self.stop_loss_pct
+            risk_this_trade = self.lot_size * stop_distance
+            if self.daily_risk_used + self.reserved_risk + risk_this_trade > self.max_daily_risk:
+                logger.warning("%s: Daily risk limit reached", symbol)
+                return False
+            
+            self.exposure.sync_positions(self.current_trades)
+            sides = [d for d in ('SHORT', 'LONG') if self.exposure.check(symbol, d)]
+            if not sides:
+                return False
+            
+            # Server-side expiry at London end; brokers without it rely on cancel_pending_orders()
+            now_dubai = datetime.now(self.dubai_tz)
+            london_end = self.dubai_tz.localize(datetime.combine(now_dubai.date(), dt_time(self.london_end_hour, 0)))
+            if symbol_info.expiration_mode & mt5.SYMBOL_EXPIRATION_SPECIFIED:
+                type_time = mt5.ORDER_TIME_SPECIFIED
+                expiration = int(london_end.timestamp()) + self.server_time_offset(tick.time)
+            else:
+                type_time = mt5.ORDER_TIME_GTC
+                expiration = 0
+            
+            digits = symbol_info.digits
+            orders = {}
+            prices = {}
+            for direction in sides:
+                if direction == 'SHORT':
+                    order_type = mt5.ORDER_TYPE_SELL_LIMIT
+                    price = asia_range['asia_high']
+                    stop_loss = price + stop_distance
+                    target_price = asia_range['asia_low']
+                else:
+                    order_type = mt5.ORDER_TYPE_BUY_LIMIT
+                    price = asia_range['asia_low']
+                    stop_loss = price - stop_distance
+                    target_price = asia_range['asia_high']
+                
+                request = {
+                    "action": mt5.TRADE_ACTION_PENDING,
+                    "symbol": symbol,
+                    "volume": self.lot_size,
+                    "type": order_type,
+                    "price": round(price, digits),
+                    "sl": round(stop_loss, digits),
+                    "tp": round(target_price, digits),
+                    "magic": MAGIC_NUMBER,
+                    "comment": "Asia-London Range OCO",
+                    "type_time": type_time,
+                    "expiration": expiration,
+                    "type_filling": mt5.ORDER_FILLING_RETURN,
+                }
+                
+                result = mt5.order_send(request)
+                if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                    comment = result.comment if result is not None else mt5.last_error()
+                    self.monitor.log_error("ORDER_ERROR", f"Pending {direction} order failed: {comment}", symbol)
+                    continue
+                
+                orders[direction] = result.order
+                prices[direction] = request['price']
+                logger.info("📌 %s %s LIMIT @ %.2f placed | Target: %.2f | Stop: %.2f",
+                            symbol, 'SELL' if direction == 'SHORT' else 'BUY', price, target_price, stop_loss)
+            
+            if not orders:
+                return False
+            
+            self.pending_orders[symbol] = {
+                'status': 'PLACED',
+                'orders': orders,      # {direction: order ticket} still on the book
+                'resolved': {},        # {direction: 'FILLED' | 'CANCELLED'}
+                'prices': prices,      # {direction: limit price}
+                'risk': risk_this_trade,
+            }
+            return True
+        
+        except Exception as e:
+            self.monitor.log_error("ORDER_ERROR", f"Error placing pending orders: {e}", symbol)
+            return False
+    
+    def cancel_order(self, symbol: str, ticket: int, reason: str) -> bool:
+        """Remove one pending order"""
+        try:
+            result = mt5.order_send({
+                "action": mt5.TRADE_ACTION_REMOVE,
+                "order": ticket,
+                "comment": f"Cancel: {reason}",
+            })
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                comment = result.comment if result is not None else mt5.last_error()
+                self.monitor.log_error("CANCEL_ERROR", f"Cancel of order #{ticket} failed: {comment}", symbol)
+                return False
+            
+            logger.info("🗑️  %s pending order #%d cancelled (%s)", symbol, ticket, reason)
+            return True
+        
+        except Exception as e:
+            self.monitor.log_error("CANCEL_ERROR", f"Error cancelling order #{ticket}: {e}", symbol)
+            return False
+    
+    def sync_pending_orders(self):
+        """
+        OCO bookkeeping for live pairs (one orders_get and positions_get per cycle)
+        
+        A leg that has left the book either filled or expired. Once a leg
+        fills, its sibling is cancelled and the position is tracked like a
+        market-mode entry. A fill that already hit SL/TP between two cycles is
+        booked from its deals. If both legs filled before the cancel landed,
+        the second position is closed at once.
+        
+        Pairs are placed while the book is flat, so the correlated exposure
+        cap is enforced at fill time: a fill that breaches it (several
+        indexes filling in one cycle) is closed, and resting legs of other
+        pairs that would now breach it are cancelled.
+        """
+        live_pairs = {s: p for s, p in self.pending_orders.items() if p['orders']}
+        if not live_pairs:
+            return
+        
+        try:
+            live = {order.ticket for order in (mt5.orders_get() or ()) if order.magic == MAGIC_NUMBER}
+            positions = {p.identifier: p for p in (mt5.positions_get() or ()) if p.magic == MAGIC_NUMBER}
+        except Exception as e:
+            self.monitor.log_error("PENDING_ERROR", f"Error reading orders: {e}")
+            return
+        
+        for symbol, pair in live_pairs.items():
+            gone = [d for d, ticket in pair['orders'].items() if ticket not in live]
+            filled = 'FILLED' in pair['resolved'].values()
+            if not gone and not filled:
+                continue
+            
+            try:
+                for direction in gone:
+                    ticket = pair['orders'][direction]
+                    position = positions.get(ticket)
+                    if position is not None:
+                        self._track_pending_fill(symbol, direction, position, pair)
+                    elif self._book_closed_fill(symbol, direction, ticket, pair.get('prices', {}).get(direction)):
+                        self.daily_risk_used += pair['risk']
+                        pair['resolved'][direction] = 'FILLED'
+                    else:
+                        logger.info("%s pending %s order #%d expired", symbol, direction, ticket)
+                        pair['resolved'][direction] = 'CANCELLED'
+                    del pair['orders'][direction]
+                
+                # OCO: nothing else may fill once one leg has (retried each cycle until it sticks)
+                if 'FILLED' in pair['resolved'].values():
+                    for direction, ticket in list(pair['orders'].items()):
+                        if self.cancel_order(symbol, ticket, 'OCO'):
+                            del pair['orders'][direction]
+                            pair['resolved'][direction] = 'CANCELLED'
+                
+            except Exception as e:
+                self.monitor.log_error("PENDING_ERROR", f"Error syncing OCO pair: {e}", symbol)
+            
+            self._settle_pair(pair)
+            self.save_snapshot()
+        
+        self._cancel_legs_over_exposure()
+    
+    def _cancel_legs_over_exposure(self):
+        """Cancel unfilled legs whose fill would push correlated exposure over the cap"""
+        self.exposure.sync_positions(self.current_trades)
+        for symbol, pair in self.pending_orders.items():
+            if not pair['orders'] or 'FILLED' in pair['resolved'].values():
+                continue
+            for direction, ticket in list(pair['orders'].items()):
+                if not self.exposure.check(symbol, direction) and self.cancel_order(symbol, ticket, 'EXPOSURE_LIMIT'):
+                    del pair['orders'][direction]
+                    pair['resolved'][direction] = 'CANCELLED'
+            self._settle_pair(pair)
+    
+    def _track_pending_fill(self, symbol: str, direction: str, position, pair: Dict):
+        """Adopt a filled leg as the symbol's trade (or close it if a sibling got there first)"""
+        pair['resolved'][direction] = 'FILLED'
+        if symbol in self.current_trades:
+            logger.warning("⚠️  %s: both OCO legs filled - closing the %s leg", symbol, direction)
+            self.close_position(symbol, 'OCO_DOUBLE_FILL', ticket=position.ticket)
+            return
+        
+        # Legs of correlated indexes can fill in the same cycle
+        self.exposure.sync_positions(self.current_trades)
+        if not self.exposure.check(symbol, direction):
+            logger.warning("⚠️  %s: %s fill breaches the correlated exposure cap - closing it", symbol, direction)
+            if self.close_position(symbol, 'EXPOSURE_LIMIT', ticket=position.ticket):
+                return
+            logger.warning("⚠️  %s: close failed - tracking the %s position instead", symbol, direction)
+        
+        self.current_trades[symbol] = {
+            'direction': direction,
+            'entry_price': position.price_open,
+            'target_price': position.tp,
+            'stop_loss': position.sl,
+            'entry_time': datetime.fromtimestamp(position.time - self.server_offset, self.dubai_tz),
+            'ticket': position.identifier,
+            'intended_entry': pair.get('prices', {}).get(direction),
+            'range_size': self.asia_ranges.get(symbol, {}).get('range_size')
+        }
+        self.daily_risk_used += pair['risk']
+        logger.info("✅ %s limit filled: %s %s lots @ %.2f", symbol, direction, position.volume, position.price_open)
+        logger.info("   Target: %.2f | Stop: %.2f", position.tp, position.sl)
+    
+    def _book_closed_fill(self, symbol: str, direction: str, ticket: int,
+                          pair_price: Optional[float] = None) -> bool:
+        """Book a leg that filled and closed between cycles; False if it never filled"""
+        deals = mt5.history_deals_get(position=ticket) or ()
+        entries = [d for d in deals if d.entry == mt5.DEAL_ENTRY_IN]
+        if not entries:
+            return False
+        
+        exits = [d for d in deals if d.entry in (mt5.DEAL_ENTRY_OUT, mt5.DEAL_ENTRY_OUT_BY)]
+        pnl = sum(d.profit + d.commission + d.swap for d in deals)
+        exit_price = exits[-1].price if exits else entries[0].price
+        self.monitor.log_trade(symbol, direction, entries[0].price, exit_price, pnl, "TP/SL Hit",
+                               self.trade_details({'ticket': ticket,
+                                                   'intended_entry': pair_price,
+                                                   'range_size': self.asia_ranges.get(symbol, {}).get('range_size')}))
+        return True
+    
+    @staticmethod
+    def _settle_pair(pair: Dict):
+        """Final pair status once no leg is left on the book"""
+        if not pair['orders'] and pair['status'] == 'PLACED':
+            pair['status'] = 'FILLED' if 'FILLED' in pair['resolved'].values() else 'CANCELLED'
+    
+    def cancel_pending_orders(self, reason: str):
+        """Book any fills, then cancel every leg still on the book (London end, shutdown)"""
+        self.sync_pending_orders()
+        for symbol, pair in self.pending_orders.items():
+            for direction, ticket in list(pair['orders'].items()):
+                if self.cancel_order(symbol, ticket, reason):
+                    del pair['orders'][direction]
+                    pair['resolved'][direction] = 'CANCELLED'
+            self._settle_pair(pair)
+        self.save_snapshot()
+    
     def manage_position(self, symbol: str):
         """Manage open position"""
         if symbol not in self.current_trades:
@@ -426,6 +1061,7 @@ class EuropeanIndexesMT5Bot:
             tick = mt5.symbol_info_tick(symbol)
             if tick is None:
                 return
+            self.last_ticks[symbol] = tick
             
             current_price = tick.bid if trade['direction'] == 'LONG' else tick.ask
             
@@ -439,22 +1075,27 @@ class EuropeanIndexesMT5Bot:
                 self.monitor.log_trade(
                     symbol, trade['direction'],
                     trade['entry_price'], current_price,
-                    pnl, "TP/SL Hit"
+                    pnl, "TP/SL Hit", self.trade_details(trade)
                 )
                 
                 del self.current_trades[symbol]
+                self.save_snapshot()
                 
         except Exception as e:
             self.monitor.log_error("POSITION_ERROR", f"Error managing position: {e}", symbol)
     
-    def close_position(self, symbol: str, reason: str):
-        """Manually close position"""
+    def close_position(self, symbol: str, reason: str, ticket: Optional[int] = None) -> bool:
+        """Manually close position (only position #ticket if given); True if one was closed"""
+        closed = False
         try:
             positions = mt5.positions_get(symbol=symbol)
             if positions is None or len(positions) == 0:
-                return
+                return False
             
             for position in positions:
+                if ticket is not None and position.ticket != ticket:
+                    continue
+                
                 tick = mt5.symbol_info_tick(symbol)
                 price = tick.ask if position.type == mt5.ORDER_TYPE_BUY else tick.bid
                 
@@ -466,7 +1107,7 @@ class EuropeanIndexesMT5Bot:
                     "position": position.ticket,
                     "price": price,
                     "deviation": 10,
-                    "magic": 234000,
+                    "magic": MAGIC_NUMBER,
                     "comment": f"Close: {reason}",
                     "type_time": mt5.ORDER_TIME_GTC,
                     "type_filling": mt5.ORDER_FILLING_IOC,
@@ -475,20 +1116,224 @@ class EuropeanIndexesMT5Bot:
                 result = mt5.order_send(request)
                 
                 if result.retcode == mt5.TRADE_RETCODE_DONE:
-                    if symbol in self.current_trades:
+                    closed = True
+                    if ticket is not None and self.current_trades.get(symbol, {}).get('ticket') != position.identifier:
+                        # Untracked extra position (OCO double fill)
+                        self.monitor.log_trade(
+                            symbol, 'LONG' if position.type == mt5.POSITION_TYPE_BUY else 'SHORT',
+                            position.price_open, price,
+                            position.profit, reason, self.trade_details({'ticket': position.identifier})
+                        )
+                    elif symbol in self.current_trades:
                         trade = self.current_trades[symbol]
                         pnl = position.profit
                         
                         self.monitor.log_trade(
                             symbol, trade['direction'],
                             trade['entry_price'], price,
-                            pnl, reason
+                            pnl, reason, self.trade_details(trade)
                         )
                         
                         del self.current_trades[symbol]
+                        self.save_snapshot()
                 
         except Exception as e:
             self.monitor.log_error("CLOSE_ERROR", f"Error closing position: {e}", symbol)
+        return closed
+    
+    def trade_details(self, trade: Dict) -> Dict:
+        """Journal-only fields of a tracked trade (read by scripts/analytics.py)"""
+        details = {'account': self.account}
+        for key in ('ticket', 'intended_entry', 'range_size', 'entry_latency_ms'):
+            if trade.get(key) is not None:
+                details[key] = trade[key]
+        return details
+    
+    def save_snapshot(self):
+        """Persist ranges, open trades, risk used and OCO pairs for warm restarts"""
+        self.snapshot.save(
+            self.days.current.date,
+            self.asia_ranges,
+            self.current_trades,
+            self.daily_risk_used,
+            self.pending_orders
+        )
+    
+    def warm_start(self):
+        """
+        Rebuild state after a restart without closing anything
+        
+        Loads today's runtime snapshot and reconciles it against the terminal
+        in one pass (one positions_get and one history_deals_get call):
+        - Open positions with our magic number that we don't track are adopted
+        - Tracked trades whose position is gone are booked from today's deals
+        - Today's OCO pairs are restored, so a pair that already filled is not
+          re-armed; resting legs of a symbol that now has a position are cancelled
+        - Missing or provisional ranges are rebuilt if the Asia session is already over
+        """
+        started = time.perf_counter()
+        now_dubai = datetime.now(self.dubai_tz)
+        
+        snapshot = self.snapshot.load(now_dubai.date())
+        if snapshot:
+            self.asia_ranges = {s: r for s, r in snapshot['asia_ranges'].items() if s in self.symbols}
+            self.current_trades = {s: t for s, t in snapshot['current_trades'].items() if s in self.symbols}
+            self.daily_risk_used = snapshot['daily_risk_used']
+            self.days.current.pending_orders = {s: p for s, p in snapshot['pending_orders'].items()
+                                                if s in self.symbols}
+            logger.info(f"Loaded runtime snapshot from {snapshot['saved_at']}: "
+                        f"{len(self.asia_ranges)} ranges | {len(self.current_trades)} trades | "
+                        f"{len(self.pending_orders)} OCO pairs")
+        
+        try:
+            positions = mt5.positions_get() or ()
+            day_start = self.dubai_tz.localize(datetime.combine(now_dubai.date(), dt_time(0, 0)))
+            deals = mt5.history_deals_get(day_start.astimezone(pytz.UTC), datetime.now(pytz.UTC)) or ()
+            
+            open_positions = {}
+            for position in positions:
+                if position.magic == MAGIC_NUMBER and position.symbol in self.symbols:
+                    open_positions.setdefault(position.symbol, position)
+            
+            closing_deals = {}  # {position_id: [deals]}
+            for deal in deals:
+                if deal.entry in (mt5.DEAL_ENTRY_OUT, mt5.DEAL_ENTRY_OUT_BY):
+                    closing_deals.setdefault(deal.position_id, []).append(deal)
+            
+            # Tracked trades closed while we were down (TP/SL hit)
+            for symbol in [s for s in self.current_trades if s not in open_positions]:
+                trade = self.current_trades.pop(symbol)
+                exits = closing_deals.get(trade['ticket'], [])
+                pnl = sum(d.profit + d.commission + d.swap for d in exits)
+                exit_price = exits[-1].price if exits else trade['target_price']
+                
+                self.monitor.log_trade(
+                    symbol, trade['direction'],
+                    trade['entry_price'], exit_price,
+                    pnl, "Closed while offline", self.trade_details(trade)
+                )
+            
+            # Positions opened before a crash that were never snapshotted
+            for symbol, position in open_positions.items():
+                if symbol in self.current_trades:
+                    continue
+                
+                self.current_trades[symbol] = {
+                    'direction': 'LONG' if position.type == mt5.POSITION_TYPE_BUY else 'SHORT',
+                    'entry_price': position.price_open,
+                    'target_price': position.tp,
+                    'stop_loss': position.sl,
+                    'entry_time': datetime.fromtimestamp(position.time - self.server_offset, self.dubai_tz),
+                    'ticket': position.identifier
+                }
+                if position.sl:
+                    self.daily_risk_used += position.volume * abs(position.price_open - position.sl)
+                logger.info(f"✓ {symbol}: adopted open position #{position.ticket} "
+                            f"({self.current_trades[symbol]['direction']} @ {position.price_open:.2f})")
+            
+            # Resting OCO legs placed before the restart (pending entry mode)
+            live_orders = set()
+            check_orders = self.entry_mode == 'pending' or self.pending_orders
+            for order in (mt5.orders_get() or ()) if check_orders else ():
+                if order.magic != MAGIC_NUMBER or order.symbol not in self.symbols:
+                    continue
+                live_orders.add(order.ticket)
+                pair = self.pending_orders.setdefault(order.symbol, {
+                    'status': 'PLACED', 'orders': {}, 'resolved': {},
+                    'risk': order.volume_initial * abs(order.price_open - order.sl),
+                })
+                direction = 'SHORT' if order.type == mt5.ORDER_TYPE_SELL_LIMIT else 'LONG'
+                if pair['orders'].get(direction) != order.ticket:
+                    pair['orders'][direction] = order.ticket
+                    logger.info(f"✓ {order.symbol}: adopted pending {direction} order #{order.ticket} "
+                                f"@ {order.price_open:.2f}")
+            
+            # A symbol with a position has had its fill: the pair's risk is already in
+            # daily_risk_used, and the sibling leg must not stay on the book
+            for symbol, pair in self.pending_orders.items():
+                trade = self.current_trades.get(symbol)
+                if trade is None or pair['status'] != 'PLACED':
+                    continue
+                for direction, ticket in list(pair['orders'].items()):
+                    if ticket == trade['ticket']:
+                        del pair['orders'][direction]
+                        pair['resolved'][direction] = 'FILLED'
+                    elif ticket in live_orders and self.cancel_order(symbol, ticket, 'OCO'):
+                        del pair['orders'][direction]
+                        pair['resolved'][direction] = 'CANCELLED'
+                if 'FILLED' not in pair['resolved'].values():
+                    pair['resolved'][trade['direction']] = 'FILLED'
+                self._settle_pair(pair)
+            
+            # Asia is over: rebuild ranges we lost or only saw part of
+            if self.get_session_status() in ('PRE_LONDON', 'LONDON'):
+                self.refresh_bars()
+                self.finalize_asia_ranges()
+            
+            self.save_snapshot()
+            
+        except Exception as e:
+            self.monitor.log_error("WARM_START", f"Error reconciling state: {e}")
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"✅ Warm start complete in {elapsed_ms:.0f} ms: "
+                    f"{len(self.asia_ranges)} ranges | {len(self.current_trades)} positions | "
+                    f"Daily Risk: {self.daily_risk_used:.1%}")
+    
+    def publish_live_state(self, session: str, loop_latency_ms: float):
+        """
+        Publish ranges, positions, last ticks and counters to shared memory
+        
+        Uses only state already in memory (ticks cached by the loop), so it
+        adds no terminal calls. Readers: scripts/monitor.py --shm.
+        """
+        if self.live_state is None:
+            return
+        
+        try:
+            records = {}
+            for symbol in self.symbols:
+                record = {}
+                asia_range = self.asia_ranges.get(symbol)
+                if asia_range:
+                    record['asia_high'] = float(asia_range['asia_high'])
+                    record['asia_low'] = float(asia_range['asia_low'])
+                    record['range_size'] = float(asia_range['range_size'])
+                
+                tick = self.last_ticks.get(symbol)
+                if tick is not None:
+                    record['bid'] = tick.bid
+                    record['ask'] = tick.ask
+                    record['tick_time'] = float(tick.time)
+                
+                trade = self.current_trades.get(symbol)
+                if trade:
+                    long_trade = trade['direction'] == 'LONG'
+                    record['position'] = 1 if long_trade else -1
+                    record['entry_price'] = trade['entry_price']
+                    record['stop_loss'] = trade['stop_loss']
+                    record['target_price'] = trade['target_price']
+                    if tick is not None:
+                        move = tick.bid - trade['entry_price'] if long_trade else trade['entry_price'] - tick.ask
+                        record['unrealized_pnl'] = move * self.lot_size
+                
+                symbol_stats = self.monitor.daily_by_symbol.get(symbol)
+                record['trades'] = symbol_stats.trades if symbol_stats else 0
+                record['errors'] = self.monitor.errors_by_symbol.get(symbol, 0)
+                records[symbol] = record
+            
+            stats = self.monitor.get_stats()
+            stats['daily_risk_used'] = self.daily_risk_used
+            stats['loop_latency_ms'] = loop_latency_ms
+            stats['session'] = session
+            stats['degraded'] = self.degraded
+            stats['mt5_p99_ms'] = mt5.p99_ms()
+            stats['mt5_timeouts'] = mt5.timeouts
+            stats['loop_stalls'] = self.watchdog.stalls
+            self.live_state.publish(stats, records)
+            
+        except Exception as e:
+            logger.debug("Live state publish failed: %s", e)
     
     def get_session_status(self) -> str:
         """Get current session"""
@@ -522,63 +1367,97 @@ class EuropeanIndexesMT5Bot:
             logger.error("Failed to connect to MT5. Exiting.")
             return
         
+        # Resume today's ranges/positions instead of starting cold
+        self.warm_start()
+        
+        try:
+            self.live_state = LiveStateWriter(self.symbols)
+        except Exception as e:
+            logger.warning(f"⚠️  Shared-memory live state unavailable: {e}")
+        
+        self.watchdog.start()
+        
         try:
             while True:
+                cycle_started = time.perf_counter()
                 session = self.get_session_status()
                 now_dubai = datetime.now(self.dubai_tz)
                 
-                logger.info(f"\n[{now_dubai.strftime('%H:%M:%S')} Dubai] Session: {session}")
-                logger.info(f"Active Positions: {len(self.current_trades)} | Daily Risk: {self.daily_risk_used:.1%}")
+                # First cycle of a new trading date: archive yesterday, start fresh
+                self.roll_day(now_dubai)
                 
-                # Reset daily state if new day
-                if now_dubai.hour == 0 and now_dubai.minute < 5:
-                    self.daily_risk_used = 0
-                    self.asia_ranges = {}
-                    self.monitor.trades_today = []
-                    self.monitor.errors_today = []
-                    self.monitor.daily_pnl = 0
-                    logger.info("Daily state reset")
+                # Reconnect / close-only mode after a loop stall or overrunning terminal calls
+                self.handle_loop_stall()
+                self.check_mt5_health()
+                
+                # One M1 request per symbol feeds every timeframe (and the exposure model)
+                self.refresh_bars()
+                
+                # Per-cycle status lines are throttled to keep log volume down
+                self.cycle_count += 1
+                status_level = logging.INFO if self.cycle_count % self.status_log_every == 0 else logging.DEBUG
+                if logger.isEnabledFor(status_level):
+                    logger.log(status_level, "\n[%s Dubai] Session: %s", now_dubai.strftime('%H:%M:%S'), session)
+                    logger.log(status_level, "Active Positions: %d | Daily Risk: %.1f%%",
+                               len(self.current_trades), self.daily_risk_used * 100)
+                    logger.log(status_level, "MT5 p99: %.0f ms | Timeouts: %d | Reconnects: %d%s",
+                               mt5.p99_ms(), mt5.timeouts, mt5.reconnects,
+                               " | CLOSE-ONLY" if self.degraded else "")
                 
                 # During Asia: Identify ranges
                 if session == 'ASIA':
-                    logger.info("Asia session - monitoring ranges...")
+                    logger.log(status_level, "Asia session - monitoring ranges...")
                     for symbol in self.symbols:
                         if symbol not in self.asia_ranges:
                             asia_range = self.identify_asia_range(symbol)
                             if asia_range:
                                 self.asia_ranges[symbol] = asia_range
-                    time.sleep(300)  # 5 minutes
+                                self.save_snapshot()
+                    sleep_seconds = 300  # 5 minutes
                 
                 # Pre-London: Finalize ranges
                 elif session == 'PRE_LONDON':
-                    logger.info("Pre-London - finalizing ranges...")
-                    for symbol in self.symbols:
-                        if symbol not in self.asia_ranges:
-                            asia_range = self.identify_asia_range(symbol)
-                            if asia_range:
-                                self.asia_ranges[symbol] = asia_range
-                    time.sleep(300)
+                    logger.log(status_level, "Pre-London - finalizing ranges...")
+                    self.finalize_asia_ranges()
+                    sleep_seconds = 300
                 
                 # London: Trade
                 elif session == 'LONDON':
+                    # Only complete ranges are traded (no Pre-London gap, or a stall across it)
+                    self.finalize_asia_ranges(include_missing=False)
+                    
+                    # Pending mode: the broker triggers entries; the loop only keeps pairs OCO
+                    if self.entry_mode == 'pending':
+                        self.sync_pending_orders()
+                    
                     for symbol in self.symbols:
                         # Manage existing positions
                         if symbol in self.current_trades:
                             self.manage_position(symbol)
                         
+                        # Rest the OCO pair once per day at the final range edges
+                        elif self.entry_mode == 'pending':
+                            if symbol in self.asia_ranges and symbol not in self.pending_orders:
+                                if self.place_pending_orders(symbol):
+                                    self.save_snapshot()
+                        
                         # Look for new trades
                         elif symbol in self.asia_ranges:
                             direction = self.check_breakout(symbol)
                             if direction:
-                                tick = mt5.symbol_info_tick(symbol)
+                                tick = self.last_ticks.get(symbol)  # Fetched by check_breakout
                                 if tick:
                                     entry_price = tick.ask if direction == 'LONG' else tick.bid
                                     self.place_order(symbol, direction, entry_price)
                     
-                    time.sleep(60)  # 1 minute
+                    sleep_seconds = 60  # 1 minute
                 
                 # After London: Close positions
                 else:
+                    if any(pair['orders'] for pair in self.pending_orders.values()):
+                        logger.info("London session ended - cancelling pending orders")
+                        self.cancel_pending_orders('LONDON_END')
+                    
                     if self.current_trades:
                         logger.info("London session ended - closing positions")
                         for symbol in list(self.current_trades.keys()):
@@ -587,7 +1466,13 @@ class EuropeanIndexesMT5Bot:
                     # Print summary
                     self.monitor.print_summary()
                     
-                    time.sleep(1800)  # 30 minutes
+                    # Retry soon if a close or cancel failed (e.g. terminal timeout)
+                    pending_left = any(pair['orders'] for pair in self.pending_orders.values())
+                    sleep_seconds = 60 if self.current_trades or pending_left else 1800
+                
+                self.publish_live_state(session, (time.perf_counter() - cycle_started) * 1000)
+                self.watchdog.beat(sleep_seconds)
+                time.sleep(sleep_seconds)
                 
         except KeyboardInterrupt:
             logger.info("\nBot stopped by user")
@@ -595,9 +1480,22 @@ class EuropeanIndexesMT5Bot:
             self.monitor.log_error("FATAL_ERROR", str(e))
             logger.error(f"Fatal error: {e}", exc_info=True)
         finally:
-            # Close all positions
-            for symbol in list(self.current_trades.keys()):
-                self.close_position(symbol, 'SHUTDOWN')
+            # Unwatched legs are no longer OCO - never leave them resting
+            if any(pair['orders'] for pair in self.pending_orders.values()):
+                self.cancel_pending_orders('SHUTDOWN')
+            
+            if self.close_on_shutdown:
+                for symbol in list(self.current_trades.keys()):
+                    self.close_position(symbol, 'SHUTDOWN')
+            elif self.current_trades:
+                # Positions keep broker-side SL/TP; warm_start() resumes them
+                logger.info(f"Leaving {len(self.current_trades)} position(s) open: "
+                            f"{', '.join(self.current_trades)}")
+            
+            self.watchdog.stop()
+            self.save_snapshot()
+            if self.live_state is not None:
+                self.live_state.close()
             
             self.monitor.print_summary()
             self.disconnect_mt5()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Correlated Exposure Limiter for European Indexes MT5 Bot
+
+GER40, FRA40, UK100 and EUSTX50 move together, so several simultaneous
+fades are really one larger bet. This module keeps an exponentially
+weighted covariance of bar returns for every configured symbol, updated
+online with a numerically stable (West/Welford-style) recurrence - no
+DataFrames, no refetching history.
+
+Exposure is measured in units of single-trade risk: each open position
+is one unit with sign +1 (long) or -1 (short). The effective exposure of
+a book s is sqrt(s' C s) where C is the correlation matrix, so four
+perfectly correlated same-direction fades count as 4 and four
+uncorrelated ones as 2.
+"""
+
+import math
+import logging
+import numpy as np
+from typing import Optional, Dict, List
+
+logger = logging.getLogger('EuropeanIndexesMT5.Exposure')
+
+
+class CorrelationExposureLimiter:
+    """Online return covariance and correlated-risk cap across a symbol basket"""
+
+    def __init__(self, symbols: List[str],
+                 max_correlated_exposure: float = 2.0,
+                 halflife_bars: float = 288,
+                 min_bars: int = 30):
+        """
+        Initialize limiter
+
+        Args:
+            symbols: Symbols to track
+            max_correlated_exposure: Cap on sqrt(s' C s), in single-trade units
+            halflife_bars: Half-life of the exponential weighting (288 M5 bars = 1 day)
+            min_bars: Until this many joint returns are seen, symbols are
+                treated as perfectly correlated (the conservative default)
+        """
+        self.symbols = list(symbols)
+        self.slot = {s: i for i, s in enumerate(self.symbols)}
+        self.max_correlated_exposure = max_correlated_exposure
+        self.alpha = 1 - 0.5 ** (1 / halflife_bars)
+        self.min_bars = min_bars
+
+        n = len(self.symbols)
+        self.mean = np.zeros(n)
+        self.cov = np.zeros((n, n))
+        self.corr = np.ones((n, n))
+        self.count = 0
+
+        self.last_close = np.full(n, np.nan)  # Last close per symbol
+        self.pending = {}  # {bar_time: {slot: close}} bars not yet seen for every symbol
+        self.max_pending = 1000
+        self.last_bar_time = None
+        self.positions = np.zeros(n)  # +1 long / -1 short / 0 flat
+
+    def update_returns(self, returns: np.ndarray):
+        """
+        Fold one joint return vector into the weighted mean/covariance
+
+        West's incremental update: O(n^2) per bar for the whole matrix
+        (O(1) per pair), stable because it works on deviations from the
+        running mean rather than raw sums of squares.
+        """
+        a = self.alpha
+        if self.count == 0:
+            self.mean = returns.astype(np.float64)
+            self.count = 1
+            return
+
+        delta = returns - self.mean
+        self.mean += a * delta
+        self.cov = (1 - a) * (self.cov + a * np.outer(delta, delta))
+        self.count += 1
+
+        std = np.sqrt(np.diag(self.cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = self.cov / np.outer(std, std)
+        corr[~np.isfinite(corr)] = 0.0
+        np.fill_diagonal(corr, 1.0)
+        self.corr = np.clip(corr, -1.0, 1.0)
+
+    def on_bar(self, symbol: str, bar_time: int, close: float):
+        """
+        Feed one closed bar; the model updates once every symbol has reported bar_time
+
+        Bars for a time already folded in (or older) are ignored, so feeding
+        the same bar twice is harmless.
+        """
+        slot = self.slot.get(symbol)
+        if slot is None or (self.last_bar_time is not None and bar_time <= self.last_bar_time):
+            return
+
+        closes = self.pending.setdefault(bar_time, {})
+        closes[slot] = close
+        if len(closes) < len(self.symbols):
+            if len(self.pending) > self.max_pending:
+                del self.pending[min(self.pending)]  # A symbol stopped reporting
+            return
+
+        # Complete: drop this and any older incomplete bar times
+        for stale in [t for t in self.pending if t <= bar_time]:
+            del self.pending[stale]
+        self.last_bar_time = bar_time
+
+        current = np.array([closes[i] for i in range(len(self.symbols))], dtype=np.float64)
+        if not np.isnan(self.last_close).any():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns = np.log(current / self.last_close)
+            if np.isfinite(returns).all():
+                self.update_returns(returns)
+        self.last_close = current
+
+    def sync_positions(self, current_trades: Dict[str, Dict]):
+        """Rebuild the position vector from the bot's current_trades"""
+        self.positions[:] = 0.0
+        for symbol, trade in current_trades.items():
+            self.set_position(symbol, trade['direction'])
+
+    def set_position(self, symbol: str, direction: Optional[str]):
+        """Record an open position ('LONG'/'SHORT') or a close (None)"""
+        slot = self.slot.get(symbol)
+        if slot is not None:
+            self.positions[slot] = {'LONG': 1.0, 'SHORT': -1.0}.get(direction, 0.0)
+
+    def exposure(self, positions: Optional[np.ndarray] = None) -> float:
+        """Effective number of independent bets sqrt(s' C s)"""
+        s = self.positions if positions is None else positions
+        corr = self.corr if self.count >= self.min_bars else np.ones_like(self.corr)
+        return math.sqrt(max(float(s @ corr @ s), 0.0))
+
+    def check(self, symbol: str, direction: str) -> bool:
+        """
+        True if adding this position keeps correlated exposure within the cap
+
+        Pure in-memory arithmetic on the current matrix (microseconds even
+        for 50+ symbols) - safe to call on the entry path.
+        """
+        slot = self.slot.get(symbol)
+        if slot is None:
+            return True
+
+        proposed = self.positions.copy()
+        proposed[slot] = 1.0 if direction == 'LONG' else -1.0
+        exposure = self.exposure(proposed)
+        if exposure > self.max_correlated_exposure + 1e-9:
+            logger.warning("%s: correlated exposure %.2f would exceed cap %.2f",
+                           symbol, exposure, self.max_correlated_exposure)
+            return False
+        return True
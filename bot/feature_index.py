@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Daily Feature Index for European Indexes MT5 Bot
+Persistent per-symbol table of Asia-London range behaviour
+
+One row per trading day:
+- Asia range (high/low/size) and session volumes
+- First London breakout side and time
+- Time for price to return to the opposite edge (target)
+- Maximum adverse excursion (MAE) beyond the broken edge
+
+The table is built once from history and updated incrementally. Sorted
+indexes on key columns let filtered queries over years of days run in
+milliseconds without re-scanning bars.
+"""
+
+import numpy as np
+import pandas as pd
+import pytz
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Tuple
+from pathlib import Path
+
+from range_index import RangeIndex
+
+logger = logging.getLogger('EuropeanIndexesMT5.FeatureIndex')
+
+FEATURE_DTYPE = np.dtype([
+    ('date', 'i4'),               # Dubai trading date, days since 1970-01-01
+    ('weekday', 'i1'),            # 0 = Monday
+    ('asia_high', 'f8'),
+    ('asia_low', 'f8'),
+    ('range_size', 'f8'),
+    ('asia_volume', 'f8'),        # Sum of tick volume in the Asia session
+    ('london_volume', 'f8'),      # Sum of tick volume in the London session
+    ('breakout_side', 'i1'),      # 1 = broke above, -1 = broke below, 0 = no breakout
+    ('breakout_minute', 'f4'),    # Minutes after London open, NaN if no breakout
+    ('target_minutes', 'f4'),     # Minutes from breakout to opposite edge, NaN if not reached
+    ('mae', 'f8'),                # Points beyond the broken edge before target/London end
+])
+
+# Columns with a persisted sort order for fast range filters
+INDEXED_COLUMNS = ('date', 'range_size', 'breakout_minute', 'target_minutes', 'mae', 'asia_volume')
+
+EPOCH = datetime(1970, 1, 1).date()
+
+
+def date_to_int(day) -> int:
+    """Convert a date to days since epoch"""
+    return (day - EPOCH).days
+
+
+def int_to_date(value: int):
+    """Convert days since epoch back to a date"""
+    return EPOCH + timedelta(days=int(value))
+
+
+def compute_daily_features(df: pd.DataFrame,
+                           asia_start_hour: int = 5,
+                           asia_end_hour: int = 9,
+                           london_start_hour: int = 11,
+                           london_end_hour: int = 14,
+                           timezone: str = 'Asia/Dubai',
+                           min_asia_bars: int = 3) -> np.ndarray:
+    """
+    Compute one feature row per trading day from intraday bars
+
+    Args:
+        df: Bars indexed by UTC time with high/low/open/tick_volume columns
+            (as returned by get_historical_data)
+        asia_start_hour/asia_end_hour: Asia session in local hours
+        london_start_hour/london_end_hour: London session in local hours
+        timezone: Session timezone (Dubai by default)
+        min_asia_bars: Days with fewer Asia bars are skipped (weekends, holidays)
+    """
+    if df.empty:
+        return np.zeros(0, dtype=FEATURE_DTYPE)
+
+    index = df.index
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    local = index.tz_convert(pytz.timezone(timezone))
+
+    minute_of_day = (local.hour * 60 + local.minute).to_numpy()
+    days = np.array([date_to_int(d) for d in local.date], dtype=np.int64)
+    times = local.as_unit('s').asi8 // 60  # epoch minutes
+
+    opens = df['open'].to_numpy(dtype=np.float64)
+    highs = df['high'].to_numpy(dtype=np.float64)
+    lows = df['low'].to_numpy(dtype=np.float64)
+    if 'tick_volume' in df.columns:
+        volume = df['tick_volume'].to_numpy(dtype=np.float64)
+    else:
+        volume = np.zeros(len(df), dtype=np.float64)
+
+    ranges = RangeIndex(times * 60, highs, lows)
+
+    asia_mask = (minute_of_day >= asia_start_hour * 60) & (minute_of_day < asia_end_hour * 60)
+    london_mask = (minute_of_day >= london_start_hour * 60) & (minute_of_day < london_end_hour * 60)
+
+    # Bars are time-ordered, so each day is a contiguous block
+    boundaries = np.flatnonzero(np.diff(days)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(days)]))
+
+    rows = []
+    for start, end in zip(starts, ends):
+        day_asia = np.flatnonzero(asia_mask[start:end]) + start
+        if len(day_asia) < min_asia_bars:
+            continue
+
+        # Bars are time-ordered, so a session is a contiguous run of positions
+        asia_high = float(ranges.max_table.query(day_asia[0], day_asia[-1] + 1))
+        asia_low = float(ranges.min_table.query(day_asia[0], day_asia[-1] + 1))
+        day_london = np.flatnonzero(london_mask[start:end]) + start
+        day = int(days[start])
+
+        row = (
+            day, int_to_date(day).weekday(),
+            asia_high, asia_low, asia_high - asia_low,
+            volume[day_asia].sum(), volume[day_london].sum(),
+            *_breakout_features(day_london, times, opens, highs, lows, ranges,
+                                asia_high, asia_low, london_start_hour * 60, minute_of_day)
+        )
+        rows.append(row)
+
+    return np.array(rows, dtype=FEATURE_DTYPE)
+
+
+def _breakout_features(london: np.ndarray, times: np.ndarray, opens: np.ndarray,
+                       highs: np.ndarray, lows: np.ndarray, ranges: RangeIndex,
+                       asia_high: float,
+                       asia_low: float, london_open_minute: int,
+                       minute_of_day: np.ndarray) -> Tuple[int, float, float, float]:
+    """Breakout side/time, time to target and MAE for one day's London bars"""
+    if len(london) == 0:
+        return 0, np.nan, np.nan, np.nan
+
+    above = np.flatnonzero(highs[london] > asia_high)
+    below = np.flatnonzero(lows[london] < asia_low)
+    first_above = above[0] if len(above) else len(london)
+    first_below = below[0] if len(below) else len(london)
+
+    if first_above == len(london) and first_below == len(london):
+        return 0, np.nan, np.nan, np.nan
+
+    if first_above < first_below:
+        side, k = 1, first_above
+    elif first_below < first_above:
+        side, k = -1, first_below
+    else:
+        # Both edges broken inside one bar - take the edge nearest the open
+        bar = london[first_above]
+        side = 1 if (asia_high - opens[bar]) <= (opens[bar] - asia_low) else -1
+        k = first_above
+
+    breakout_bar = london[k]
+    breakout_minute = float(minute_of_day[breakout_bar] - london_open_minute)
+
+    # Fade target is the opposite edge, checked from the bar after the breakout
+    after = london[k + 1:]
+    if side == 1:
+        hits = np.flatnonzero(lows[after] <= asia_low)
+    else:
+        hits = np.flatnonzero(highs[after] >= asia_high)
+
+    if len(hits):
+        target_bar = after[hits[0]]
+        target_minutes = float(times[target_bar] - times[breakout_bar])
+        window_end = target_bar + 1
+    else:
+        target_minutes = np.nan
+        window_end = london[-1] + 1
+
+    if side == 1:
+        mae = ranges.max_table.query(breakout_bar, window_end) - asia_high
+    else:
+        mae = asia_low - ranges.min_table.query(breakout_bar, window_end)
+
+    return side, breakout_minute, target_minutes, float(mae)
+
+
+class DailyFeatureIndex:
+    """Persistent per-symbol daily feature tables with sorted column indexes"""
+
+    def __init__(self, store_dir: str,
+                 asia_start_hour: int = 5,
+                 asia_end_hour: int = 9,
+                 london_start_hour: int = 11,
+                 london_end_hour: int = 14,
+                 timezone: str = 'Asia/Dubai'):
+        """
+        Initialize feature index
+
+        Args:
+            store_dir: Directory holding one <symbol>.npz table per symbol
+            asia_start_hour/asia_end_hour: Asia session (local hours)
+            london_start_hour/london_end_hour: London session (local hours)
+            timezone: Session timezone
+        """
+        self.store_dir = Path(store_dir)
+        self.sessions = {
+            'asia_start_hour': asia_start_hour,
+            'asia_end_hour': asia_end_hour,
+            'london_start_hour': london_start_hour,
+            'london_end_hour': london_end_hour,
+            'timezone': timezone,
+        }
+        self.tz = pytz.timezone(timezone)
+        self.tables = {}  # {symbol: structured array sorted by date}
+        self.orders = {}  # {symbol: {column: argsort order}}
+        self.ranges = {}  # {symbol: RangeIndex over stored bars}
+
+    def _path(self, symbol: str) -> Path:
+        return self.store_dir / f"{symbol}.npz"
+
+    def load(self, symbol: str) -> np.ndarray:
+        """Load (or create empty) table for symbol"""
+        if symbol in self.tables:
+            return self.tables[symbol]
+
+        table = np.zeros(0, dtype=FEATURE_DTYPE)
+        orders = {}
+        path = self._path(symbol)
+        try:
+            if path.exists():
+                with np.load(path) as data:
+                    table = data['table'].astype(FEATURE_DTYPE)
+                    orders = {col: data[f"order_{col}"] for col in INDEXED_COLUMNS
+                              if f"order_{col}" in data.files}
+        except Exception as e:
+            logger.error(f"Error loading feature table for {symbol}: {e}")
+            table = np.zeros(0, dtype=FEATURE_DTYPE)
+            orders = {}
+
+        self.tables[symbol] = table
+        if len(orders) != len(INDEXED_COLUMNS) or any(len(o) != len(table) for o in orders.values()):
+            orders = self._build_orders(table)
+        self.orders[symbol] = orders
+        return table
+
+    def range_index(self, symbol: str) -> RangeIndex:
+        """High/low range index over the symbol's stored bars (<symbol>_bars.npz)"""
+        if symbol not in self.ranges:
+            self.ranges[symbol] = RangeIndex.load(self.store_dir / f"{symbol}_bars.npz")
+        return self.ranges[symbol]
+
+    def save(self, symbol: str):
+        """Persist table and its sorted indexes"""
+        try:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(symbol)
+            tmp_path = path.with_suffix('.tmp.npz')
+            arrays = {f"order_{col}": order for col, order in self.orders[symbol].items()}
+            np.savez(tmp_path, table=self.tables[symbol], **arrays)
+            tmp_path.replace(path)
+        except Exception as e:
+            logger.error(f"Error saving feature table for {symbol}: {e}")
+
+    @staticmethod
+    def _build_orders(table: np.ndarray) -> Dict[str, np.ndarray]:
+        """Stable argsort per indexed column (NaN sorts last)"""
+        return {col: np.argsort(table[col], kind='stable') for col in INDEXED_COLUMNS}
+
+    def last_date(self, symbol: str):
+        """Last stored trading date, or None if the table is empty"""
+        table = self.load(symbol)
+        return int_to_date(table['date'][-1]) if len(table) else None
+
+    def update(self, symbol: str, bars: pd.DataFrame, now: Optional[datetime] = None) -> int:
+        """
+        Add completed days from bars that are not yet in the table
+
+        Only days whose London session has ended are added, so a day is
+        never stored half-finished. New bars are also appended to the
+        symbol's range index. Returns the number of new rows.
+
+        Bars must be indexed by real UTC: MT5 stamps bars in trade server
+        time, so shift them first (see scripts/features.py build).
+        """
+        table = self.load(symbol)
+        ranges = self.range_index(symbol)
+        if len(ranges) and not ranges.utc:
+            raise ValueError(f"{symbol}: stored bars predate the server-time to UTC conversion - "
+                             f"delete {self.store_dir / symbol}*.npz and rebuild")
+
+        if len(bars):
+            index = bars.index if bars.index.tz is not None else bars.index.tz_localize('UTC')
+            if ranges.extend(index.as_unit('s').asi8, bars['high'].to_numpy(), bars['low'].to_numpy()):
+                ranges.save(self.store_dir / f"{symbol}_bars.npz")
+
+        rows = compute_daily_features(bars, **self.sessions)
+        if len(rows) == 0:
+            return 0
+
+        now_local = (now or datetime.now(pytz.UTC)).astimezone(self.tz)
+        today = date_to_int(now_local.date())
+        if now_local.hour >= self.sessions['london_end_hour']:
+            today += 1  # Today's session is complete
+
+        last = table['date'][-1] if len(table) else -1
+        rows = rows[(rows['date'] > last) & (rows['date'] < today)]
+        if len(rows) == 0:
+            return 0
+
+        table = np.concatenate((table, rows))
+        self.tables[symbol] = table
+        self.orders[symbol] = self._build_orders(table)
+        self.save(symbol)
+
+        logger.info(f"✓ {symbol}: {len(rows)} new feature rows ({len(table)} days total)")
+        return len(rows)
+
+    def query(self, symbol: str, **filters) -> np.ndarray:
+        """
+        Return rows matching all filters, ordered by date
+
+        Each filter is column=(low, high) with inclusive bounds where either
+        bound may be None, or column=value for equality. A bounded filter
+        never matches NaN, so target_minutes=(None, None) selects days where
+        the target was reached. Indexed columns are
+        resolved by binary search on their sort order; the narrowest one is
+        used to pick candidates and the rest are checked on those rows only.
+
+        Example:
+            index.query('GER40', range_size=(None, 40), breakout_side=1)
+        """
+        table = self.load(symbol)
+        if not filters or len(table) == 0:
+            return table
+
+        bounds = {}
+        for column, value in filters.items():
+            if column not in FEATURE_DTYPE.names:
+                raise ValueError(f"Unknown feature column: {column}")
+            if isinstance(value, tuple):
+                bounds[column] = value
+            else:
+                bounds[column] = (value, value)
+
+        candidates = None
+        for column, (low, high) in bounds.items():
+            if column not in INDEXED_COLUMNS:
+                continue
+            order = self.orders[symbol][column]
+            values = table[column][order]
+            lo = 0 if low is None else np.searchsorted(values, low, side='left')
+            hi = np.searchsorted(values, np.inf if high is None else high, side='right')
+            rows = order[lo:hi]
+            if candidates is None or len(rows) < len(candidates):
+                candidates = rows
+
+        if candidates is None:
+            candidates = np.arange(len(table))
+
+        subset = table[candidates]
+        mask = np.ones(len(subset), dtype=bool)
+        for column, (low, high) in bounds.items():
+            if subset[column].dtype.kind == 'f':
+                mask &= ~np.isnan(subset[column])
+            if low is not None:
+                mask &= subset[column] >= low
+            if high is not None:
+                mask &= subset[column] <= high
+
+        return table[np.sort(candidates[mask])]
+
+    @staticmethod
+    def summarize(rows: np.ndarray) -> Dict:
+        """Hit-rate summary for a query result"""
+        breakouts = rows[rows['breakout_side'] != 0]
+        hits = breakouts[~np.isnan(breakouts['target_minutes'])]
+
+        return {
+            'days': len(rows),
+            'breakouts': len(breakouts),
+            'target_hits': len(hits),
+            'hit_rate': (len(hits) / len(breakouts) * 100) if len(breakouts) else 0,
+            'median_target_minutes': float(np.median(hits['target_minutes'])) if len(hits) else None,
+            'avg_mae': float(breakouts['mae'].mean()) if len(breakouts) else None,
+            'avg_range_size': float(rows['range_size'].mean()) if len(rows) else None,
+        }
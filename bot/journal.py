@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Trade Journal for European Indexes MT5 Bot
+Append-only JSON Lines archive of every closed trade and every finished day
+
+The bot keeps only the current day in memory; the journal is the
+long-term record. One object per line:
+
+    {"type": "trade", "date": "2025-01-06", "symbol": "GER40", ...}
+    {"type": "day", "date": "2025-01-06", "trades": 3, "pnl": 412.5, ...}
+
+Lines are written whole and flushed immediately, so a crash can at worst
+lose the line being written. Readers stream the file line by line.
+"""
+
+import json
+import os
+import logging
+from datetime import date, datetime
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger('EuropeanIndexesMT5.Journal')
+
+
+def _default(value):
+    """JSON encoder for dates and numpy scalars"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+class TradeJournal:
+    """Append-only JSONL journal of trades and daily summaries"""
+
+    def __init__(self, journal_file: str):
+        self.journal_file = journal_file
+
+    def append(self, record: Dict):
+        """Write one record as a single line"""
+        try:
+            os.makedirs(os.path.dirname(self.journal_file) or '.', exist_ok=True)
+            line = json.dumps(record, default=_default, separators=(',', ':'))
+            with open(self.journal_file, 'a') as f:
+                f.write(line + '\n')
+        except Exception as e:
+            logger.error(f"Error writing journal: {e}")
+
+    def append_trade(self, trading_date: date, trade: Dict):
+        """Archive one closed trade"""
+        self.append({'type': 'trade', 'date': trading_date, **trade})
+
+    def append_day(self, trading_date: date, summary: Dict):
+        """Archive the summary of a finished trading day"""
+        self.append({'type': 'day', 'date': trading_date, **summary})
+
+    def read(self, record_type: Optional[str] = None) -> Iterator[Dict]:
+        """Stream records (optionally only one type); unreadable lines are skipped"""
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record_type is None or record.get('type') == record_type:
+                    yield record
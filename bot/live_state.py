@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Shared-Memory Live State for European Indexes MT5 Bot
+
+The bot publishes a fixed-layout block (per-symbol range, position, last
+tick, PnL and counters) into a multiprocessing.shared_memory segment.
+Monitors and alerting scripts map the same segment and read consistent
+snapshots at any frequency - no files, no parsing, no calls into the
+trading process.
+
+Consistency uses a seqlock: the writer bumps the sequence number to odd
+before writing and back to even after. Readers copy the block and retry
+if the sequence was odd or changed while they were copying.
+"""
+
+import struct
+import time
+import logging
+from multiprocessing import shared_memory
+from typing import Optional, Dict, List
+
+logger = logging.getLogger('EuropeanIndexesMT5.LiveState')
+
+DEFAULT_SEGMENT = 'european_indexes_mt5_live'
+LAYOUT_MAGIC = b'EIM2'
+MAX_SYMBOLS = 32
+
+SESSIONS = ['CLOSED', 'ASIA', 'PRE_LONDON', 'LONDON']
+
+# seq is kept in its own 8 bytes at offset 0 so it can be read alone
+SEQ = struct.Struct('<Q')
+HEADER = struct.Struct('<4sHHdddddIIIBBdII')
+HEADER_FIELDS = ('magic', 'max_symbols', 'n_symbols', 'updated_at', 'daily_pnl', 'total_pnl',
+                 'daily_risk_used', 'loop_latency_ms', 'trades_today', 'wins', 'errors_today',
+                 'session', 'degraded', 'mt5_p99_ms', 'mt5_timeouts', 'loop_stalls')
+RECORD = struct.Struct('<16sdddbdddddddII')
+RECORD_FIELDS = ('symbol', 'asia_high', 'asia_low', 'range_size', 'position', 'entry_price',
+                 'stop_loss', 'target_price', 'bid', 'ask', 'tick_time', 'unrealized_pnl',
+                 'trades', 'errors')
+
+HEADER_OFFSET = SEQ.size
+RECORDS_OFFSET = HEADER_OFFSET + HEADER.size
+SEGMENT_SIZE = RECORDS_OFFSET + RECORD.size * MAX_SYMBOLS
+
+
+def _untrack(shm: shared_memory.SharedMemory):
+    """
+    Stop the resource tracker from unlinking a segment we only attached to
+
+    Before Python 3.13 every process that opens a segment registers it and
+    unlinks it at exit, which would destroy the bot's segment whenever a
+    monitor quits.
+    """
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+class LiveStateWriter:
+    """Publish live bot state into a shared-memory segment (single writer)"""
+
+    def __init__(self, symbols: List[str], name: str = DEFAULT_SEGMENT):
+        """
+        Create (or take over) the live state segment
+
+        Args:
+            symbols: Symbols in record order (at most MAX_SYMBOLS)
+            name: Shared-memory segment name
+        """
+        self.symbols = list(symbols)[:MAX_SYMBOLS]
+        self.name = name
+        self.seq = 0
+
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=SEGMENT_SIZE)
+        self.buf = self.shm.buf
+        SEQ.pack_into(self.buf, 0, 0)
+        logger.info(f"Live state published to shared memory '{name}' ({SEGMENT_SIZE} bytes)")
+
+    def publish(self, header: Dict, records: Dict[str, Dict]):
+        """
+        Write one consistent snapshot
+
+        Args:
+            header: Account-level values (see HEADER_FIELDS)
+            records: {symbol: per-symbol values (see RECORD_FIELDS)}
+        """
+        buf = self.buf
+        self.seq += 1
+        SEQ.pack_into(buf, 0, self.seq)  # odd: write in progress
+
+        HEADER.pack_into(
+            buf, HEADER_OFFSET,
+            LAYOUT_MAGIC, MAX_SYMBOLS, len(self.symbols), time.time(),
+            header.get('daily_pnl', 0.0), header.get('total_pnl', 0.0),
+            header.get('daily_risk_used', 0.0), header.get('loop_latency_ms', 0.0),
+            header.get('trades_today', 0), header.get('wins', 0), header.get('errors_today', 0),
+            SESSIONS.index(header.get('session', 'CLOSED')),
+            1 if header.get('degraded') else 0, header.get('mt5_p99_ms', 0.0),
+            header.get('mt5_timeouts', 0), header.get('loop_stalls', 0)
+        )
+
+        offset = RECORDS_OFFSET
+        for symbol in self.symbols:
+            r = records.get(symbol, {})
+            RECORD.pack_into(
+                buf, offset,
+                symbol.encode('utf-8')[:16],
+                r.get('asia_high', 0.0), r.get('asia_low', 0.0), r.get('range_size', 0.0),
+                r.get('position', 0), r.get('entry_price', 0.0), r.get('stop_loss', 0.0),
+                r.get('target_price', 0.0), r.get('bid', 0.0), r.get('ask', 0.0),
+                r.get('tick_time', 0.0), r.get('unrealized_pnl', 0.0),
+                r.get('trades', 0), r.get('errors', 0)
+            )
+            offset += RECORD.size
+
+        self.seq += 1
+        SEQ.pack_into(buf, 0, self.seq)  # even: snapshot complete
+
+    def close(self):
+        """Release and remove the segment"""
+        try:
+            self.buf = None
+            self.shm.close()
+            self.shm.unlink()
+        except Exception as e:
+            logger.error(f"Error closing live state segment: {e}")
+
+
+class LiveStateReader:
+    """Read consistent snapshots of the bot's live state"""
+
+    def __init__(self, name: str = DEFAULT_SEGMENT):
+        """Attach to an existing segment (FileNotFoundError if the bot isn't publishing)"""
+        self.shm = shared_memory.SharedMemory(name=name)
+        _untrack(self.shm)
+        self.buf = self.shm.buf
+
+    def snapshot(self, max_retries: int = 1000) -> Optional[Dict]:
+        """
+        Copy a consistent snapshot, or None if the writer never settled
+
+        Returns {'seq', header fields..., 'symbols': {symbol: record}}.
+        """
+        buf = self.buf
+        for _ in range(max_retries):
+            seq_before = SEQ.unpack_from(buf, 0)[0]
+            if seq_before & 1:
+                continue
+            data = bytes(buf[:SEGMENT_SIZE])
+            if SEQ.unpack_from(buf, 0)[0] != seq_before:
+                continue
+            if seq_before == 0:
+                return None  # Nothing published yet
+            if data[HEADER_OFFSET:HEADER_OFFSET + 4] != LAYOUT_MAGIC:
+                raise ValueError(f"Live state layout {data[HEADER_OFFSET:HEADER_OFFSET + 4]!r} "
+                                 f"does not match reader ({LAYOUT_MAGIC!r}) - update the bot or monitor")
+            return self._parse(seq_before, data)
+        return None
+
+    @staticmethod
+    def _parse(seq: int, data: bytes) -> Dict:
+        header = dict(zip(HEADER_FIELDS, HEADER.unpack_from(data, HEADER_OFFSET)))
+        header['seq'] = seq
+        header['session'] = SESSIONS[header['session']]
+        header['degraded'] = bool(header['degraded'])
+
+        symbols = {}
+        offset = RECORDS_OFFSET
+        for _ in range(header['n_symbols']):
+            record = dict(zip(RECORD_FIELDS, RECORD.unpack_from(data, offset)))
+            record['symbol'] = record['symbol'].rstrip(b'\x00').decode('utf-8')
+            symbols[record['symbol']] = record
+            offset += RECORD.size
+        header['symbols'] = symbols
+        return header
+
+    def close(self):
+        """Detach from the segment (the bot keeps it alive)"""
+        self.buf = None
+        self.shm.close()
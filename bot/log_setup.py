@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Non-blocking Logging Setup for European Indexes MT5 Bot
+
+Log calls only put the record on an in-memory queue. A background
+QueueListener thread formats records and writes them to a rotating log
+file and the console, so disk I/O never sits between breakout detection
+and order_send.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+from pathlib import Path
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Argument types safe to format later on the listener thread
+IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+
+_listener = None  # Active QueueListener
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread
+
+    The stock QueueHandler formats the message in the caller so records can
+    be pickled to another process. Our queue is in-process, so the record is
+    passed as-is and %-style arguments are merged off the trading thread.
+    Records whose arguments could change before the listener gets to them
+    (dicts, lists, positions...) are formatted here instead, so the log
+    shows the values at the time of the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args and (isinstance(args, dict) or
+                     not all(isinstance(arg, IMMUTABLE_ARGS) for arg in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def setup_logging(log_file: Path,
+                  level: str = 'INFO',
+                  max_bytes: int = 10 * 1024 * 1024,
+                  backup_count: int = 5,
+                  rotate_when: Optional[str] = None,
+                  console: bool = True) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a queue to a background writer thread
+
+    Safe to call again (e.g. after reading config.json): the previous
+    listener is flushed and replaced.
+
+    Args:
+        log_file: Log file path
+        level: Root log level name (e.g. 'INFO', 'DEBUG')
+        max_bytes: Rotate when the file reaches this size (0 disables)
+        backup_count: Number of rotated files to keep
+        rotate_when: Time-based rotation instead of size (e.g. 'midnight', 'H')
+        console: Also write to stderr
+    """
+    global _listener
+    stop_logging()
+
+    log_file = Path(log_file)
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+
+    if rotate_when:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            log_file, when=rotate_when, backupCount=backup_count, encoding='utf-8')
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [file_handler]
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is None:
+        return
+
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+atexit.register(stop_logging)
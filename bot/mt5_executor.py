@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+MT5 Call Executor and Loop Watchdog for European Indexes MT5 Bot
+
+The MetaTrader5 binding blocks until the terminal answers. A hung terminal
+would freeze the trading loop indefinitely, and positions would miss their
+end-of-London exit. This module adds:
+
+- MT5Executor: a drop-in wrapper for the mt5 module that runs every call
+  on one daemon worker thread (the binding is not thread-safe) and waits
+  at most a per-method deadline. A call that overruns raises MT5Timeout,
+  and the executor reports itself unhealthy until reconnect() succeeds.
+  The worker is a daemon so a call hung in the terminal never blocks
+  process exit. Per-method latency is recorded for p50/p99/max reporting.
+- LoopWatchdog: a background thread that expects a heartbeat from the
+  loop and flags (and logs) a stall if none arrives in time. It only sets
+  an event; the loop itself handles the stall (state, reconnect) on its
+  own thread.
+"""
+
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Optional, Dict
+
+logger = logging.getLogger('EuropeanIndexesMT5.Executor')
+
+# Per-method deadlines in seconds (DEFAULT_TIMEOUT for anything else)
+DEFAULT_TIMEOUT = 5.0
+CALL_TIMEOUTS = {
+    'initialize': 30.0,
+    'shutdown': 5.0,
+    'order_send': 10.0,
+    'symbol_info_tick': 2.0,
+    'positions_get': 3.0,
+    'history_deals_get': 10.0,
+    'symbols_get': 15.0,
+    'batch': 10.0,
+}
+
+# Calls kept in each method's latency window
+LATENCY_WINDOW = 500
+
+
+class MT5Timeout(Exception):
+    """An MT5 call did not return within its deadline"""
+
+
+class MT5Executor:
+    """Run mt5 calls on a single worker thread with per-call deadlines"""
+
+    def __init__(self, mt5, default_timeout: float = DEFAULT_TIMEOUT,
+                 timeouts: Optional[Dict[str, float]] = None):
+        """
+        Initialize executor
+
+        Args:
+            mt5: MetaTrader5 module or GatewayClient
+            default_timeout: Deadline for methods without an explicit one
+            timeouts: Per-method deadline overrides (merged into CALL_TIMEOUTS)
+        """
+        self._mt5 = mt5
+        self._default_timeout = default_timeout
+        self._timeouts = {**CALL_TIMEOUTS, **(timeouts or {})}
+        self._jobs = self._start_worker()
+        self._busy = None  # Future of a call that overran and may still be running
+
+        self.latencies = {}  # {method: deque of seconds}
+        self.timeouts = 0
+        self.consecutive_timeouts = 0
+        self.reconnects = 0
+
+    @staticmethod
+    def _start_worker() -> queue.SimpleQueue:
+        """Start a daemon worker thread; returns its job queue (None stops it)"""
+        jobs = queue.SimpleQueue()
+        threading.Thread(target=MT5Executor._work, args=(jobs,), name='mt5', daemon=True).start()
+        return jobs
+
+    @staticmethod
+    def _work(jobs: queue.SimpleQueue):
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            future, function, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(function(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    @property
+    def healthy(self) -> bool:
+        """False after a timeout, until a reconnect (or the stuck call) completes"""
+        if self._busy is not None and self._busy.done():
+            self._busy = None
+            self.consecutive_timeouts = 0
+        return self._busy is None and self.consecutive_timeouts == 0
+
+    def call(self, method: str, *args, timeout: Optional[float] = None, **kwargs):
+        """
+        Run mt5.<method>(*args, **kwargs) with a deadline
+
+        Raises MT5Timeout if the call overruns, or immediately if an earlier
+        call is still stuck on the worker (queuing behind it would only
+        extend the stall).
+        """
+        if self._busy is not None and not self._busy.done():
+            raise MT5Timeout(f"{method}: terminal still busy with an overrun call")
+
+        deadline = timeout if timeout is not None else self._timeouts.get(method, self._default_timeout)
+        function = getattr(self._mt5, method)
+        started = time.perf_counter()
+        future = Future()
+        self._jobs.put((future, function, args, kwargs))
+        try:
+            result = future.result(timeout=deadline)
+        except FutureTimeout:
+            self._busy = future
+            self.timeouts += 1
+            self.consecutive_timeouts += 1
+            self._record(method, time.perf_counter() - started)
+            logger.error("⏱️  MT5 %s exceeded %.1fs deadline", method, deadline)
+            raise MT5Timeout(f"{method} exceeded {deadline:.1f}s")
+
+        self._record(method, time.perf_counter() - started)
+        self.consecutive_timeouts = 0
+        return result
+
+    def _record(self, method: str, seconds: float):
+        window = self.latencies.get(method)
+        if window is None:
+            window = self.latencies[method] = deque(maxlen=LATENCY_WINDOW)
+        window.append(seconds)
+
+    def reconnect(self, **initialize_kwargs) -> bool:
+        """
+        Re-initialize the terminal connection after timeouts
+
+        A thread blocked inside the binding cannot be interrupted, and the
+        binding is not thread-safe, so while a call is still stuck nothing
+        else may enter it: reconnect() returns False until the call comes
+        back. A gateway client is different - its stuck call only holds its
+        own channel, so the client is given a fresh channel (reset()) and a
+        fresh worker, and the old worker exits once its call returns.
+        """
+        if self._busy is not None and not self._busy.done():
+            reset = getattr(self._mt5, 'reset', None)
+            if reset is None:
+                logger.warning("⚠️  MT5 call still blocked in the terminal - reconnect waits for it")
+                return False
+            reset()
+            self._jobs.put(None)
+            self._jobs = self._start_worker()
+
+        self.reconnects += 1
+        self._busy = None
+        self.consecutive_timeouts = 0
+
+        try:
+            self.call('shutdown')
+        except Exception as e:
+            logger.warning(f"⚠️  MT5 shutdown during reconnect failed: {e}")
+
+        try:
+            if self.call('initialize', **initialize_kwargs):
+                logger.info(f"✅ Reconnected to MT5 (reconnect #{self.reconnects})")
+                return True
+            logger.error(f"❌ MT5 re-initialization failed: {self._mt5.last_error()}")
+        except MT5Timeout as e:
+            logger.error(f"❌ MT5 re-initialization timed out: {e}")
+        return False
+
+    def latency_stats(self) -> Dict[str, Dict]:
+        """{method: {'calls', 'p50_ms', 'p99_ms', 'max_ms'}} over each method's recent window"""
+        stats = {}
+        for method, window in self.latencies.items():
+            ordered = sorted(window)
+            n = len(ordered)
+            stats[method] = {
+                'calls': n,
+                'p50_ms': ordered[n // 2] * 1000,
+                'p99_ms': ordered[min(n - 1, int(n * 0.99))] * 1000,
+                'max_ms': ordered[-1] * 1000,
+            }
+        return stats
+
+    def p99_ms(self) -> float:
+        """Worst per-method p99 latency in milliseconds (0 before any call)"""
+        return max((s['p99_ms'] for s in self.latency_stats().values()), default=0.0)
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        value = getattr(self._mt5, name)
+        if name.isupper() or not callable(value):
+            return value  # Constants (TIMEFRAME_M1, ORDER_TYPE_BUY, ...)
+        if name == 'last_error':
+            return value  # Reads the last result locally, never blocks
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+
+
+class LoopWatchdog:
+    """Background thread that flags a stalled loop from missing heartbeats"""
+
+    def __init__(self, grace_seconds: float = 60.0, check_interval: float = 1.0):
+        """
+        Initialize watchdog
+
+        Args:
+            grace_seconds: Slack added to each heartbeat's expected interval
+            check_interval: How often the thread checks the deadline
+        """
+        self.grace_seconds = grace_seconds
+        self.check_interval = check_interval
+        self.deadline = None
+        self.stalled = False
+        self.stalls = 0
+        self.last_beat = None
+        self.overdue = 0.0
+        self.stall_detected = threading.Event()  # Set on a stall, cleared by take_stall()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='loop-watchdog', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def beat(self, next_beat_in: float):
+        """Heartbeat from the loop; the next one is expected within next_beat_in seconds (plus grace)"""
+        now = time.monotonic()
+        if self.stalled:
+            logger.info(f"✅ Loop recovered after {now - self.last_beat:.0f}s")
+            self.stalled = False
+        self.last_beat = now
+        self.deadline = now + next_beat_in + self.grace_seconds
+
+    def take_stall(self) -> Optional[float]:
+        """Seconds overdue of a stall the loop has not handled yet (and clear it), else None"""
+        if not self.stall_detected.is_set():
+            return None
+        self.stall_detected.clear()
+        return self.overdue
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            deadline = self.deadline
+            if deadline is None or self.stalled:
+                continue
+            overdue = time.monotonic() - deadline
+            if overdue > 0:
+                self.stalled = True
+                self.stalls += 1
+                logger.error(f"🚨 Loop stalled: no heartbeat for "
+                             f"{time.monotonic() - self.last_beat:.0f}s")
+                self.overdue = overdue
+                self.stall_detected.set()
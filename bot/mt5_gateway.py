@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+MT5 Gateway for European Indexes MT5 Bot
+
+The MetaTrader5 binding allows one terminal connection per process. The
+gateway process owns that single connection and serves ticks, bars,
+positions, history and order requests to local clients (bot, monitor,
+test/research scripts) over a multiprocessing.connection channel - a Unix
+socket on Linux/macOS, a named pipe on Windows.
+
+- Identical read requests in flight at the same time are coalesced into
+  one terminal call
+- Read results are cached for a few milliseconds (longer for static data)
+- order_send and other trading calls are never cached or coalesced, and
+  drop every cached read so no client sees pre-trade positions or orders
+- Clients can send a batch of calls in one round trip
+
+The channel pickles requests and forwards order_send, so access is locked
+down: clients must present a random per-install key (state/gateway.key,
+mode 0600, or MT5_GATEWAY_KEY) and on POSIX the socket lives in a private
+0700 directory and is itself 0600.
+
+Clients get a drop-in replacement for the MetaTrader5 module:
+
+    from mt5_gateway import load_mt5
+    mt5 = load_mt5()  # gateway client if MT5_GATEWAY is set, else MetaTrader5
+"""
+
+import os
+import sys
+import stat
+import time
+import secrets
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import Future
+from multiprocessing.connection import Listener, Client
+from typing import Optional, Dict, List, Tuple, Any
+
+logger = logging.getLogger('EuropeanIndexesMT5.Gateway')
+
+if sys.platform == 'win32':
+    DEFAULT_ADDRESS = r'\\.\pipe\european_indexes_mt5_gateway'
+else:
+    # Per-user private directory (never a shared /tmp path)
+    SOCKET_DIR = Path(os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()) / \
+        f"european_indexes_mt5_gateway-{os.getuid()}"
+    DEFAULT_ADDRESS = str(SOCKET_DIR / 'gateway.sock')
+
+# Shared secret, generated once per install by the gateway
+KEY_FILE = Path(__file__).resolve().parents[2] / 'state' / 'gateway.key'
+
+# Reads: safe to coalesce and cache {method: cache TTL multiplier}
+READ_METHODS = {
+    'symbol_info_tick': 1,
+    'positions_get': 1,
+    'positions_total': 1,
+    'orders_get': 1,
+    'orders_total': 1,
+    'copy_rates_from_pos': 1,
+    'copy_rates_from': 1,
+    'copy_rates_range': 1,
+    'copy_ticks_from': 1,
+    'copy_ticks_range': 1,
+    'history_deals_get': 1,
+    'history_orders_get': 1,
+    'account_info': 1,
+    'symbol_info': 200,       # Static-ish data: cached ~1s at the default TTL
+    'symbols_get': 200,
+    'symbols_total': 200,
+    'terminal_info': 200,
+    'version': 200,
+}
+
+# Calls that are forwarded one by one, never cached or merged
+PASSTHROUGH_METHODS = {'order_send', 'order_check', 'order_calc_margin', 'order_calc_profit',
+                       'symbol_select', 'market_book_add', 'market_book_get', 'market_book_release'}
+
+# Passthrough calls that change terminal state: cached reads are dropped after each
+STATE_CHANGING_METHODS = {'order_send', 'symbol_select', 'market_book_add', 'market_book_release'}
+
+
+class GatewayError(Exception):
+    """Raised by the client when the gateway rejects or fails a request"""
+
+
+class Record(dict):
+    """Picklable stand-in for MT5 result tuples (attribute access + _asdict)"""
+
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def _asdict(self) -> Dict:
+        return dict(self)
+
+
+def load_authkey(create: bool = False) -> bytes:
+    """
+    Gateway key: MT5_GATEWAY_KEY if set, else the install's key file
+
+    Args:
+        create: Generate the key file (mode 0600) if it does not exist yet
+            (the gateway does this; clients only read it)
+    """
+    key = os.environ.get('MT5_GATEWAY_KEY')
+    if key:
+        return key.encode('utf-8')
+
+    if create and not KEY_FILE.exists():
+        KEY_FILE.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                f.write(secrets.token_hex(32))
+            logger.info(f"🔑 Generated gateway key {KEY_FILE}")
+        except FileExistsError:
+            pass  # Created concurrently
+
+    try:
+        if sys.platform != 'win32' and KEY_FILE.stat().st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+            raise GatewayError(f"{KEY_FILE} is readable by other users (chmod 600 it)")
+        key = KEY_FILE.read_text().strip()
+    except FileNotFoundError:
+        raise GatewayError("No gateway key: start scripts/run_gateway.py once or set MT5_GATEWAY_KEY")
+    if not key:
+        raise GatewayError(f"{KEY_FILE} is empty")
+    return key.encode('utf-8')
+
+
+def _private_socket_dir(address: str):
+    """Create the socket's directory 0700 and refuse one other users can write to"""
+    directory = Path(address).parent
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = directory.stat()
+    if st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise GatewayError(f"Socket directory {directory} must be owned by this user and not "
+                           f"writable by others (use a private directory)")
+    if directory == Path(DEFAULT_ADDRESS).parent and st.st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+        os.chmod(directory, 0o700)
+
+
+def to_wire(value: Any) -> Any:
+    """Convert MT5 namedtuples (possibly nested) to Records clients can unpickle without MT5"""
+    if hasattr(value, '_asdict'):
+        return Record((k, to_wire(v)) for k, v in value._asdict().items())
+    if isinstance(value, tuple):
+        return tuple(to_wire(v) for v in value)
+    return value
+
+
+def _request_key(method: str, args: Tuple, kwargs: Dict) -> Optional[Tuple]:
+    """Hashable identity of a read request (None if arguments aren't hashable)"""
+    key = (method, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return None
+
+
+class MT5Gateway:
+    """Serve one MT5 terminal connection to many local clients"""
+
+    def __init__(self, address: str = DEFAULT_ADDRESS,
+                 authkey: Optional[bytes] = None,
+                 cache_ttl_ms: float = 5.0,
+                 initialize_kwargs: Optional[Dict] = None):
+        """
+        Initialize gateway
+
+        Args:
+            address: Unix socket path / named pipe to listen on
+            authkey: Shared secret clients must present (default: load_authkey(),
+                generating the key file on first run)
+            cache_ttl_ms: How long read results are reused
+            initialize_kwargs: Passed to mt5.initialize() (path, login, server...)
+        """
+        import MetaTrader5 as mt5
+
+        self.mt5 = mt5
+        self.address = address
+        self.authkey = authkey or load_authkey(create=True)
+        self.cache_ttl = cache_ttl_ms / 1000
+        self.initialize_kwargs = initialize_kwargs or {}
+
+        self.terminal_lock = threading.Lock()  # The binding is not thread-safe
+        self.state_lock = threading.Lock()
+        self.inflight = {}  # {request key: Future}
+        self.cache = {}     # {request key: (expires_at, result, last_error)}
+        self.generation = 0  # Bumped when a trade invalidates cached reads
+        self.stats = {'requests': 0, 'terminal_calls': 0, 'cache_hits': 0, 'coalesced': 0, 'clients': 0}
+        self.constants = {name: getattr(mt5, name) for name in dir(mt5)
+                          if name.isupper() and isinstance(getattr(mt5, name), (int, float, str))}
+
+    def _terminal_call(self, method: str, args: Tuple, kwargs: Dict) -> Tuple[Any, Any]:
+        """Run one call on the terminal; returns (result, last_error)"""
+        with self.terminal_lock:
+            self.stats['terminal_calls'] += 1
+            result = getattr(self.mt5, method)(*args, **kwargs)
+            return to_wire(result), self.mt5.last_error()
+
+    def call(self, method: str, args: Tuple = (), kwargs: Optional[Dict] = None) -> Tuple[Any, Any]:
+        """Execute a client request with caching and coalescing for reads"""
+        kwargs = kwargs or {}
+        self.stats['requests'] += 1
+
+        if method in PASSTHROUGH_METHODS:
+            try:
+                return self._terminal_call(method, args, kwargs)
+            finally:
+                if method in STATE_CHANGING_METHODS:
+                    self.invalidate()
+        if method not in READ_METHODS:
+            raise GatewayError(f"Method not allowed through gateway: {method}")
+
+        key = _request_key(method, args, kwargs)
+        if key is None:
+            return self._terminal_call(method, args, kwargs)
+
+        with self.state_lock:
+            cached = self.cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                self.stats['cache_hits'] += 1
+                return cached[1], cached[2]
+
+            future = self.inflight.get(key)
+            owner = future is None
+            generation = self.generation
+            if owner:
+                future = Future()
+                self.inflight[key] = future
+            else:
+                self.stats['coalesced'] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result, error = self._terminal_call(method, args, kwargs)
+            future.set_result((result, error))
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.state_lock:
+                if self.inflight.get(key) is future:
+                    del self.inflight[key]
+                # A read that overlapped a trade may predate it: don't cache it
+                if future.done() and future.exception() is None and generation == self.generation:
+                    ttl = self.cache_ttl * READ_METHODS[method]
+                    self.cache[key] = (time.monotonic() + ttl, *future.result())
+                    if len(self.cache) > 10000:
+                        now = time.monotonic()
+                        self.cache = {k: v for k, v in self.cache.items() if v[0] > now}
+
+        return result, error
+
+    def invalidate(self):
+        """Drop cached reads and detach in-flight ones (after a trade)"""
+        with self.state_lock:
+            self.generation += 1
+            self.cache = {}
+            self.inflight = {}
+
+    def _handle(self, request: Tuple) -> Tuple[str, Any, Any]:
+        """Dispatch one wire request -> (status, result, last_error)"""
+        method, args, kwargs = request
+        if method == '__constants__':
+            return 'ok', self.constants, None
+        if method == '__stats__':
+            return 'ok', dict(self.stats), None
+        if method == '__batch__':
+            results = []
+            for sub_method, sub_args, sub_kwargs in args[0]:
+                try:
+                    result, error = self.call(sub_method, tuple(sub_args), sub_kwargs)
+                    results.append(('ok', result, error))
+                except Exception as e:
+                    results.append(('error', str(e), None))
+            return 'ok', results, None
+
+        result, error = self.call(method, tuple(args), kwargs)
+        return 'ok', result, error
+
+    def _serve_client(self, conn):
+        """Request loop for one client connection"""
+        with self.state_lock:
+            self.stats['clients'] += 1
+        try:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    break
+                try:
+                    response = self._handle(request)
+                except Exception as e:
+                    response = ('error', f"{type(e).__name__}: {e}", None)
+                conn.send(response)
+        finally:
+            conn.close()
+            with self.state_lock:
+                self.stats['clients'] -= 1
+
+    def serve_forever(self):
+        """Connect to the terminal and accept clients until interrupted"""
+        if not self.mt5.initialize(**self.initialize_kwargs):
+            raise GatewayError(f"MT5 initialization failed: {self.mt5.last_error()}")
+
+        if sys.platform != 'win32':
+            _private_socket_dir(self.address)
+            if os.path.exists(self.address):
+                os.unlink(self.address)  # Stale socket from a previous run
+            old_umask = os.umask(0o177)  # Socket created 0600, no window with wider access
+            try:
+                listener = Listener(self.address, family='AF_UNIX', authkey=self.authkey)
+            finally:
+                os.umask(old_umask)
+        else:
+            listener = Listener(self.address, authkey=self.authkey)
+        logger.info(f"✅ MT5 gateway listening on {self.address}")
+        try:
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    logger.warning(f"⚠️  Rejected gateway client: {e}")
+                    continue
+                threading.Thread(target=self._serve_client, args=(conn,), daemon=True).start()
+        finally:
+            listener.close()
+            self.mt5.shutdown()
+            logger.info(f"MT5 gateway stopped | {self.stats}")
+
+
+class GatewayClient:
+    """
+    Drop-in replacement for the MetaTrader5 module backed by the gateway
+
+    initialize() connects to the gateway (the terminal is already
+    initialized there) and shutdown() only closes this client's channel.
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, authkey: Optional[bytes] = None):
+        self._address = address
+        self._authkey = authkey
+        self._conn = None
+        self._lock = threading.Lock()
+        self._constants = {}
+        self._last_error = (1, 'Success')
+
+    def _connect(self):
+        if self._conn is None:
+            if self._authkey is None:
+                self._authkey = load_authkey()
+            self._conn = Client(self._address, authkey=self._authkey)
+            self._constants = self._send('__constants__', (), {})
+
+    def _send(self, method: str, args: Tuple, kwargs: Dict) -> Any:
+        with self._lock:
+            conn = self._conn
+            conn.send((method, args, kwargs))
+            status, result, error = conn.recv()
+        if status != 'ok':
+            raise GatewayError(result)
+        if error is not None:
+            self._last_error = error
+        return result
+
+    def _request(self, method: str, *args, **kwargs) -> Any:
+        self._connect()
+        return self._send(method, args, kwargs)
+
+    def initialize(self, *args, **kwargs) -> bool:
+        """Connect to the gateway (arguments are ignored - the gateway owns the login)"""
+        try:
+            self._connect()
+            return True
+        except Exception as e:
+            self._last_error = (-10003, f"Gateway unavailable at {self._address}: {e}")
+            return False
+
+    def shutdown(self):
+        """Close this client's channel (the terminal connection stays up)"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def reset(self):
+        """
+        Abandon the channel and its lock to a call that is stuck on them
+
+        The stuck thread keeps the old channel until the gateway answers;
+        the next request opens a new one.
+        """
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def last_error(self):
+        return self._last_error
+
+    def batch(self, calls: List[Tuple[str, Tuple, Dict]]) -> List[Any]:
+        """
+        Run several calls in one round trip
+
+        Example:
+            ticks = mt5.batch([('symbol_info_tick', (s,), {}) for s in symbols])
+        Failed calls come back as GatewayError instances.
+        """
+        results = []
+        for status, result, error in self._request('__batch__', list(calls)):
+            results.append(result if status == 'ok' else GatewayError(result))
+        return results
+
+    def gateway_stats(self) -> Dict:
+        """Request/cache/coalescing counters from the gateway"""
+        return self._request('__stats__')
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name.isupper():
+            self._connect()
+            try:
+                return self._constants[name]
+            except KeyError:
+                raise AttributeError(name)
+        if name in READ_METHODS or name in PASSTHROUGH_METHODS:
+            return lambda *args, **kwargs: self._request(name, *args, **kwargs)
+        raise AttributeError(name)
+
+
+def load_mt5(address: Optional[str] = None):
+    """
+    MetaTrader5 module, or a gateway client when a gateway is configured
+
+    Args:
+        address: Gateway address; defaults to the MT5_GATEWAY environment
+            variable ('1' means the default address). Without either, the
+            MetaTrader5 module itself is returned.
+    """
+    address = address or os.environ.get('MT5_GATEWAY')
+    if address:
+        return GatewayClient(DEFAULT_ADDRESS if address == '1' else address)
+
+    import MetaTrader5
+    return MetaTrader5
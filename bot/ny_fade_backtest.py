@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+NY Fade Portfolio Backtest
+Vectorized NumPy model of Gold_NY_Fade / BTC_NY_Fade / DAX_NY_Fade
+
+All three EAs run the same rules on M1 bars (server "data time"):
+1. Range = high/low of the bars between RangeStart and RangeEnd
+2. From RangeEnd until ExitHour, fade the first break: bid above the
+   range high -> SELL, ask below the range low -> BUY (one trade per day)
+3. SL at the broken edge +/- range x StopLossMultiplier, TP at the
+   opposite edge
+4. Lots sized to risk RiskPercent of balance, floored to the volume step
+   and clamped to min/max volume
+5. Anything still open at ExitHour is closed
+
+Signals, fills and exits are computed per symbol with array operations
+over every day at once (range lookups go through RangeIndex). Only the
+portfolio pass is sequential: symbols share one balance, and position
+size depends on the balance when the trade opens, so trades are replayed
+in time order (a loop over trades, not bars).
+
+Trades never span days, so signals can also be computed per calendar
+month and memoized with a ResultCache (keyed by the month's bar bytes,
+the inputs that shape signals and STRATEGY_VERSION). Reruns, risk
+changes and appended data then only recompute the months that changed.
+
+Bar-level approximations (M1 bars cannot show the tick path):
+- Range uses bars opening in [RangeStart, RangeEnd); the EA's end-inclusive
+  CopyRates adds only the first tick of the RangeEnd bar
+- Entries fill at the range edge, or at the bar open if it gapped through
+- Exits are checked from the bar after entry; if SL and TP are both
+  inside one bar, SL is assumed first
+- Bars are bid prices; ask = bid + spread x point
+"""
+
+import heapq
+import logging
+import numpy as np
+from typing import Optional, Dict
+
+from range_index import RangeIndex
+from result_cache import cache_key
+
+logger = logging.getLogger('EuropeanIndexesMT5.NYFadeBacktest')
+
+# Bump whenever simulate_symbol() would produce different signals for the
+# same bars and inputs - it invalidates every cached result
+STRATEGY_VERSION = 1
+
+# Inputs that change signals (risk_percent only affects sizing, done later)
+SIGNAL_PARAMS = ('range_start_hour', 'range_start_minute', 'range_end_hour', 'range_end_minute',
+                 'exit_hour', 'exit_minute', 'stop_loss_multiplier')
+
+# EA inputs per symbol (names follow the .mq5 inputs in snake_case)
+DEFAULT_STRATEGIES = {
+    'XAUUSD': {   # Gold_NY_Fade.mq5
+        'risk_percent': 1.0,
+        'range_start_hour': 12, 'range_start_minute': 30,
+        'range_end_hour': 14, 'range_end_minute': 0,
+        'exit_hour': 19, 'exit_minute': 0,
+        'stop_loss_multiplier': 1.0,
+    },
+    'BTCUSD': {   # BTC_NY_Fade.mq5
+        'risk_percent': 1.0,
+        'range_start_hour': 13, 'range_start_minute': 30,
+        'range_end_hour': 15, 'range_end_minute': 0,
+        'exit_hour': 19, 'exit_minute': 0,
+        'stop_loss_multiplier': 1.0,
+    },
+    'GER40': {    # DAX_NY_Fade.mq5
+        'risk_percent': 1.0,
+        'range_start_hour': 13, 'range_start_minute': 30,
+        'range_end_hour': 15, 'range_end_minute': 0,
+        'exit_hour': 19, 'exit_minute': 0,
+        'stop_loss_multiplier': 1.0,
+    },
+}
+
+# Contract specs (override with the broker's symbol_info values)
+DEFAULT_SPECS = {
+    'XAUUSD': {'point': 0.01, 'tick_size': 0.01, 'tick_value': 1.0,
+               'volume_min': 0.01, 'volume_max': 100.0, 'volume_step': 0.01},
+    'BTCUSD': {'point': 0.01, 'tick_size': 0.01, 'tick_value': 0.01,
+               'volume_min': 0.01, 'volume_max': 100.0, 'volume_step': 0.01},
+    'GER40': {'point': 0.01, 'tick_size': 0.01, 'tick_value': 0.01,
+              'volume_min': 0.01, 'volume_max': 100.0, 'volume_step': 0.01},
+}
+
+EXIT_REASONS = ('SL', 'TP', 'TIME', 'END')
+
+# One row per day with a trade, per symbol (before sizing)
+SIGNAL_DTYPE = np.dtype([
+    ('day', 'i8'),            # Server date, days since epoch
+    ('direction', 'i1'),      # 1 = BUY, -1 = SELL
+    ('range_high', 'f8'),
+    ('range_low', 'f8'),
+    ('entry_time', 'i8'),
+    ('entry_price', 'f8'),
+    ('stop_loss', 'f8'),
+    ('take_profit', 'f8'),
+    ('exit_time', 'i8'),
+    ('exit_price', 'f8'),
+    ('exit_reason', 'i1'),    # Index into EXIT_REASONS
+])
+
+TRADE_DTYPE = np.dtype(SIGNAL_DTYPE.descr + [
+    ('symbol_id', 'i2'),
+    ('lots', 'f8'),
+    ('pnl', 'f8'),
+    ('balance', 'f8'),        # Balance after this trade closed
+])
+
+
+def session_seconds(params: Dict, prefix: str) -> int:
+    """Seconds after midnight of an EA hour/minute input pair"""
+    return params[f"{prefix}_hour"] * 3600 + params.get(f"{prefix}_minute", 0) * 60
+
+
+def _first_per_group(mask: np.ndarray, groups: np.ndarray):
+    """(group ids, first position) of the first True per group, positions ascending"""
+    positions = np.flatnonzero(mask)
+    ids, first = np.unique(groups[positions], return_index=True)
+    return ids, positions[first]
+
+
+def simulate_symbol(bars: np.ndarray, params: Dict, spec: Dict,
+                    ranges: Optional[RangeIndex] = None) -> np.ndarray:
+    """
+    Per-day fade trades for one symbol (unsized), vectorized over all days
+
+    Args:
+        bars: M1 rates (time, open, high, low, close[, spread]) sorted by time
+        params: EA inputs (see DEFAULT_STRATEGIES)
+        spec: Contract spec; 'point' converts spread to price
+        ranges: Prebuilt RangeIndex over bars, e.g. shared across parameter
+            sweeps (built from the range-window bars if omitted)
+
+    Returns:
+        SIGNAL_DTYPE array, one row per traded day
+    """
+    if len(bars) == 0:
+        return np.zeros(0, dtype=SIGNAL_DTYPE)
+
+    t = np.asarray(bars['time'], dtype=np.int64)
+    opens = np.asarray(bars['open'], dtype=np.float64)
+    highs = np.asarray(bars['high'], dtype=np.float64)
+    lows = np.asarray(bars['low'], dtype=np.float64)
+    closes = np.asarray(bars['close'], dtype=np.float64)
+    if 'spread' in bars.dtype.names:
+        ask_offset = np.asarray(bars['spread'], dtype=np.float64) * spec.get('point', 0.0)
+    else:
+        ask_offset = np.zeros(len(t))
+
+    range_start = session_seconds(params, 'range_start')
+    range_end = session_seconds(params, 'range_end')
+    exit_at = session_seconds(params, 'exit')
+    multiplier = params.get('stop_loss_multiplier', 1.0)
+
+    bar_day = t // 86400
+    days = np.unique(bar_day)
+    day_of_bar = np.searchsorted(days, bar_day)
+    second_of_day = t - bar_day * 86400
+
+    # 1. Range per day - two sparse-table lookups per day. The index only
+    #    needs the bars inside range windows (a fraction of 24h data)
+    if ranges is None:
+        in_range = (second_of_day >= range_start) & (second_of_day < range_end)
+        ranges = RangeIndex(t[in_range], highs[in_range], lows[in_range])
+    range_high, range_low = ranges.window(days * 86400 + range_start, days * 86400 + range_end)
+    valid_day = np.isfinite(range_high) & (range_high > range_low)
+
+    # 2. First break per day inside the trading window
+    rh = range_high[day_of_bar]
+    rl = range_low[day_of_bar]
+    window = valid_day[day_of_bar] & (second_of_day >= range_end) & (second_of_day < exit_at)
+    breaks_up = window & (highs > rh)                  # bid > range high -> SELL
+    breaks_down = window & (lows + ask_offset < rl)    # ask < range low -> BUY
+    trade_days, entry_pos = _first_per_group(breaks_up | breaks_down, day_of_bar)
+    if len(trade_days) == 0:
+        return np.zeros(0, dtype=SIGNAL_DTYPE)
+
+    direction = np.where(breaks_up[entry_pos], -1, 1).astype(np.int8)  # EA checks the SELL side first
+    day_high = range_high[trade_days]
+    day_low = range_low[trade_days]
+    size = day_high - day_low
+    sell = direction == -1
+    entry_price = np.where(sell,
+                           np.maximum(opens[entry_pos], day_high),
+                           np.minimum(opens[entry_pos] + ask_offset[entry_pos], day_low))
+    stop_loss = np.where(sell, day_high + size * multiplier, day_low - size * multiplier)
+    take_profit = np.where(sell, day_low, day_high)
+
+    # 3. First SL/TP touch after the entry bar, before exit time
+    trade_of_day = np.full(len(days), -1)
+    trade_of_day[trade_days] = np.arange(len(trade_days))
+    trade_of_bar = trade_of_day[day_of_bar]
+    k = np.maximum(trade_of_bar, 0)
+    open_bar = (trade_of_bar >= 0) & (np.arange(len(t)) > entry_pos[k]) & (second_of_day < exit_at)
+
+    bar_sell = sell[k]
+    ask_high = highs + ask_offset
+    ask_low = lows + ask_offset
+    hits_sl = open_bar & np.where(bar_sell, ask_high >= stop_loss[k], lows <= stop_loss[k])
+    hits_tp = open_bar & np.where(bar_sell, ask_low <= take_profit[k], highs >= take_profit[k])
+    hit_trades, hit_pos = _first_per_group(hits_sl | hits_tp, trade_of_bar)
+
+    exit_time = np.zeros(len(trade_days), dtype=np.int64)
+    exit_price = np.zeros(len(trade_days))
+    exit_reason = np.full(len(trade_days), EXIT_REASONS.index('TIME'), dtype=np.int8)
+
+    # 4. Time exit at the first bar at/after ExitHour (or the day's last bar)
+    day_start = days[trade_days] * 86400
+    exit_pos = np.searchsorted(t, day_start + exit_at, side='left')
+    same_day = (exit_pos < len(t)) & (t[np.minimum(exit_pos, len(t) - 1)] < day_start + 86400)
+    last_pos = np.searchsorted(t, day_start + 86400, side='left') - 1
+    exit_pos_c = np.minimum(exit_pos, len(t) - 1)
+    exit_time[:] = np.where(same_day, t[exit_pos_c], t[last_pos])
+    exit_price[:] = np.where(
+        same_day,
+        np.where(sell, opens[exit_pos_c] + ask_offset[exit_pos_c], opens[exit_pos_c]),
+        np.where(sell, closes[last_pos] + ask_offset[last_pos], closes[last_pos])
+    )
+    exit_reason[~same_day] = EXIT_REASONS.index('END')
+
+    # SL/TP exits override the time exit
+    if len(hit_trades):
+        sl_first = hits_sl[hit_pos]  # SL assumed first when both are inside one bar
+        hs = sell[hit_trades]
+        gap_sl = np.where(hs,
+                          np.maximum(stop_loss[hit_trades], opens[hit_pos] + ask_offset[hit_pos]),
+                          np.minimum(stop_loss[hit_trades], opens[hit_pos]))
+        exit_time[hit_trades] = t[hit_pos]
+        exit_price[hit_trades] = np.where(sl_first, gap_sl, take_profit[hit_trades])
+        exit_reason[hit_trades] = np.where(sl_first, EXIT_REASONS.index('SL'), EXIT_REASONS.index('TP'))
+
+    signals = np.zeros(len(trade_days), dtype=SIGNAL_DTYPE)
+    signals['day'] = days[trade_days]
+    signals['direction'] = direction
+    signals['range_high'] = day_high
+    signals['range_low'] = day_low
+    signals['entry_time'] = t[entry_pos]
+    signals['entry_price'] = entry_price
+    signals['stop_loss'] = stop_loss
+    signals['take_profit'] = take_profit
+    signals['exit_time'] = exit_time
+    signals['exit_price'] = exit_price
+    signals['exit_reason'] = exit_reason
+    return signals
+
+
+def month_chunks(bars: np.ndarray):
+    """Slices of bars per calendar month (bars sorted by time)"""
+    if len(bars) == 0:
+        return []
+    months = np.asarray(bars['time'], dtype=np.int64).astype('datetime64[s]').astype('datetime64[M]')
+    bounds = np.concatenate(([0], np.flatnonzero(months[1:] != months[:-1]) + 1, [len(bars)]))
+    return [slice(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def simulate_symbol_cached(bars: np.ndarray, params: Dict, spec: Dict, cache) -> np.ndarray:
+    """
+    simulate_symbol() month by month through a ResultCache
+
+    Gives the same signals as one simulate_symbol() call over all bars:
+    every trade opens and closes within its day.
+    """
+    key_params = {name: params.get(name) for name in SIGNAL_PARAMS}
+    point = spec.get('point', 0.0) if 'spread' in bars.dtype.names else 0.0
+    parts = []
+    for chunk in month_chunks(bars):
+        month = bars[chunk]
+        key = cache_key('ny_fade', STRATEGY_VERSION, key_params, point, month)
+        parts.append(cache.get_or_compute(key, lambda: simulate_symbol(month, params, spec)))
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=SIGNAL_DTYPE)
+
+
+def lot_size(balance: float, risk_percent: float, sl_distance: float, spec: Dict) -> float:
+    """CalculateLotSize() from the EAs: risk % of balance, floored to the volume step"""
+    tick_size = spec['tick_size']
+    tick_value = spec['tick_value']
+    if sl_distance == 0 or tick_size == 0 or tick_value == 0:
+        return 0.01
+
+    risk_amount = balance * (risk_percent / 100.0)
+    lots = risk_amount / ((sl_distance / tick_size) * tick_value)
+    step = spec['volume_step']
+    lots = np.floor(lots / step + 1e-9) * step
+    return float(min(max(lots, spec['volume_min']), spec['volume_max']))
+
+
+def run_portfolio(signals: Dict[str, np.ndarray], strategies: Dict[str, Dict],
+                  specs: Dict[str, Dict], initial_balance: float = 10000.0) -> Dict:
+    """
+    Size and book every symbol's trades against one shared balance
+
+    Trades are replayed in entry order; trades that closed before an entry
+    are booked first, so each position is sized off the balance the EA
+    would have seen (ACCOUNT_BALANCE - closed trades only).
+
+    Returns:
+        {'symbols': [...], 'trades': TRADE_DTYPE array in exit order,
+         'initial_balance': float, 'final_balance': float}
+    """
+    symbols = list(signals)
+    parts = []
+    for symbol_id, symbol in enumerate(symbols):
+        rows = np.zeros(len(signals[symbol]), dtype=TRADE_DTYPE)
+        for name in SIGNAL_DTYPE.names:
+            rows[name] = signals[symbol][name]
+        rows['symbol_id'] = symbol_id
+        parts.append(rows)
+    trades = np.concatenate(parts) if parts else np.zeros(0, dtype=TRADE_DTYPE)
+    trades = trades[np.argsort(trades['entry_time'], kind='stable')]
+
+    balance = initial_balance
+    pending = []  # heap of (exit_time, row)
+    pnl = np.zeros(len(trades))
+    lots = np.zeros(len(trades))
+    balance_after = np.zeros(len(trades))
+
+    # Money per 1.0 price move per lot, per symbol
+    value_per_point = np.array([specs[s]['tick_value'] / specs[s]['tick_size'] for s in symbols])
+
+    for i in range(len(trades)):
+        row = trades[i]
+        while pending and pending[0][0] <= row['entry_time']:
+            _, j = heapq.heappop(pending)
+            balance += pnl[j]
+            balance_after[j] = balance
+
+        symbol = symbols[row['symbol_id']]
+        lots[i] = lot_size(balance, strategies[symbol]['risk_percent'],
+                           abs(row['entry_price'] - row['stop_loss']), specs[symbol])
+        move = (row['exit_price'] - row['entry_price']) * row['direction']
+        pnl[i] = move * value_per_point[row['symbol_id']] * lots[i]
+        heapq.heappush(pending, (row['exit_time'], i))
+
+    while pending:
+        _, j = heapq.heappop(pending)
+        balance += pnl[j]
+        balance_after[j] = balance
+
+    trades['lots'] = lots
+    trades['pnl'] = pnl
+    trades['balance'] = balance_after
+    trades = trades[np.lexsort((trades['entry_time'], trades['exit_time']))]
+
+    return {
+        'symbols': symbols,
+        'trades': trades,
+        'initial_balance': initial_balance,
+        'final_balance': balance,
+    }
+
+
+def _stats(pnl: np.ndarray) -> Dict:
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl <= 0]
+    gross_loss = -losses.sum()
+    return {
+        'trades': int(len(pnl)),
+        'wins': int(len(wins)),
+        'win_rate': float(len(wins) / len(pnl) * 100) if len(pnl) else 0.0,
+        'pnl': float(pnl.sum()),
+        'profit_factor': float(wins.sum() / gross_loss) if gross_loss > 0 else None,
+        'avg_win': float(wins.mean()) if len(wins) else 0.0,
+        'avg_loss': float(losses.mean()) if len(losses) else 0.0,
+    }
+
+
+def summarize(result: Dict) -> Dict:
+    """Portfolio and per-symbol statistics for a run_portfolio() result"""
+    trades = result['trades']
+    initial = result['initial_balance']
+    curve = np.concatenate(([initial], trades['balance']))
+    peaks = np.maximum.accumulate(curve)
+    drawdown = (peaks - curve) / peaks
+
+    summary = _stats(trades['pnl'])
+    summary.update({
+        'initial_balance': initial,
+        'final_balance': result['final_balance'],
+        'return_pct': (result['final_balance'] / initial - 1) * 100,
+        'max_drawdown_pct': float(drawdown.max() * 100),
+        'exit_reasons': {reason: int((trades['exit_reason'] == i).sum())
+                         for i, reason in enumerate(EXIT_REASONS)},
+        'by_symbol': {},
+    })
+    for symbol_id, symbol in enumerate(result['symbols']):
+        summary['by_symbol'][symbol] = _stats(trades['pnl'][trades['symbol_id'] == symbol_id])
+    return summary
+
+
+def backtest(data: Dict[str, np.ndarray], strategies: Optional[Dict[str, Dict]] = None,
+             specs: Optional[Dict[str, Dict]] = None, initial_balance: float = 10000.0,
+             cache=None) -> Dict:
+    """
+    Run the NY Fade portfolio over M1 bars
+
+    Args:
+        data: {symbol: M1 rates array}
+        strategies: {symbol: EA inputs} (default: DEFAULT_STRATEGIES)
+        specs: {symbol: contract spec} (default: DEFAULT_SPECS)
+        initial_balance: Shared starting balance
+        cache: Optional ResultCache for per-month signals
+
+    Returns:
+        run_portfolio() result with a 'summary' key added
+    """
+    strategies = strategies or DEFAULT_STRATEGIES
+    specs = specs or DEFAULT_SPECS
+    if cache is None:
+        signals = {symbol: simulate_symbol(bars, strategies[symbol], specs[symbol])
+                   for symbol, bars in data.items()}
+    else:
+        signals = {symbol: simulate_symbol_cached(bars, strategies[symbol], specs[symbol], cache)
+                   for symbol, bars in data.items()}
+    result = run_portfolio(signals, strategies, specs, initial_balance)
+    result['summary'] = summarize(result)
+    return result
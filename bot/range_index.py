@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Range Query Index for European Indexes MT5 Bot
+High/low of arbitrary time windows over bar history without re-slicing
+
+A sparse table holds the max/min of every power-of-two run of bars, so
+the high/low between any two times is two binary searches plus two table
+lookups. Queries take arrays of windows, which makes sweeping candidate
+session windows (e.g. Asia 04:00-08:30 vs 05:00-09:00) across years of
+days a handful of vectorized lookups instead of a scan per window.
+
+Memory is O(n log n): two years of M5 bars (~150k) use ~40 MB.
+"""
+
+import numpy as np
+import pytz
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Tuple
+from pathlib import Path
+
+logger = logging.getLogger('EuropeanIndexesMT5.RangeIndex')
+
+
+class SparseTable:
+    """Static range-max or range-min over an array, O(1) per query"""
+
+    def __init__(self, values: np.ndarray, op=np.maximum):
+        """
+        Build the table in O(n log n)
+
+        Args:
+            values: 1-D array to index
+            op: np.maximum or np.minimum
+        """
+        values = np.asarray(values, dtype=np.float64)
+        self.op = op
+        self.n = len(values)
+        levels = max(1, int(self.n).bit_length())
+        # Row k holds op over values[i:i + 2**k]; tails past n - 2**k are never read
+        self.table = np.empty((levels, max(self.n, 1)), dtype=np.float64)
+        if self.n:
+            self.table[0] = values
+        for k in range(1, levels):
+            half = 1 << (k - 1)
+            row, prev = self.table[k], self.table[k - 1]
+            row[:] = prev
+            op(prev[:-half], prev[half:], out=row[:-half])
+
+    def query(self, lo, hi) -> np.ndarray:
+        """
+        op over values[lo:hi] for scalar or array bounds (hi exclusive)
+
+        Empty windows return NaN.
+        """
+        lo = np.asarray(lo, dtype=np.int64)
+        hi = np.asarray(hi, dtype=np.int64)
+        length = hi - lo
+        empty = length <= 0
+        safe = np.where(empty, 1, length)
+        k = np.log2(safe).astype(np.int64)
+        lo_c = np.where(empty, 0, lo)
+        right = np.where(empty, 0, hi - (1 << k))
+        result = self.op(self.table[k, lo_c], self.table[k, right])
+        return np.where(empty, np.nan, result)
+
+
+class RangeIndex:
+    """High/low of any [t1, t2) time window over one symbol's bars"""
+
+    def __init__(self, times: np.ndarray, highs: np.ndarray, lows: np.ndarray, utc: bool = True):
+        """
+        Initialize index
+
+        Args:
+            times: Bar open times, epoch seconds, ascending
+            highs/lows: Bar highs and lows
+            utc: times are real UTC (MT5 bar times shifted from server time);
+                False for stores written before that conversion
+        """
+        self.utc = utc
+        self.times = np.asarray(times, dtype=np.int64)
+        self.highs = np.asarray(highs, dtype=np.float64)
+        self.lows = np.asarray(lows, dtype=np.float64)
+        self.max_table = SparseTable(self.highs, np.maximum)
+        self.min_table = SparseTable(self.lows, np.minimum)
+
+    @classmethod
+    def from_rates(cls, rates) -> 'RangeIndex':
+        """
+        Build from an MT5 rates array or a bars DataFrame indexed by UTC time
+
+        A raw rates array carries server-time stamps and is marked non-UTC.
+        """
+        if hasattr(rates, 'index') and hasattr(rates, 'columns'):
+            index = rates.index
+            if index.tz is None:
+                index = index.tz_localize('UTC')
+            times = index.as_unit('s').asi8
+            return cls(times, rates['high'].to_numpy(), rates['low'].to_numpy())
+        return cls(rates['time'], rates['high'], rates['low'], utc=False)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def extend(self, times: np.ndarray, highs: np.ndarray, lows: np.ndarray) -> int:
+        """Append bars newer than the last indexed bar and rebuild; returns bars added"""
+        times = np.asarray(times, dtype=np.int64)
+        if len(self.times):
+            keep = times > self.times[-1]
+            times, highs, lows = times[keep], np.asarray(highs)[keep], np.asarray(lows)[keep]
+        if len(times) == 0:
+            return 0
+        self.__init__(np.concatenate((self.times, times)),
+                      np.concatenate((self.highs, highs)),
+                      np.concatenate((self.lows, lows)),
+                      self.utc)
+        return len(times)
+
+    def bar_bounds(self, t1, t2) -> Tuple[np.ndarray, np.ndarray]:
+        """Bar positions [lo, hi) for bars opening in [t1, t2)"""
+        lo = np.searchsorted(self.times, np.asarray(t1, dtype=np.int64), side='left')
+        hi = np.searchsorted(self.times, np.asarray(t2, dtype=np.int64), side='left')
+        return lo, hi
+
+    def window(self, t1, t2) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (high, low) of bars opening in [t1, t2) - scalars or arrays of windows
+
+        O(log n) per window for the time lookup, O(1) for the range query.
+        Windows without bars return NaN.
+        """
+        lo, hi = self.bar_bounds(t1, t2)
+        return self.max_table.query(lo, hi), self.min_table.query(lo, hi)
+
+    def save(self, path: str):
+        """Persist the bar arrays (the tables are rebuilt on load)"""
+        path = Path(path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp.npz')
+            np.savez(tmp_path, times=self.times, highs=self.highs, lows=self.lows, utc=self.utc)
+            tmp_path.replace(path)
+        except Exception as e:
+            logger.error(f"Error saving range index {path}: {e}")
+
+    @classmethod
+    def load(cls, path: str) -> 'RangeIndex':
+        """Load bar arrays saved by save(); empty index if missing or unreadable"""
+        path = Path(path)
+        try:
+            if path.exists():
+                with np.load(path) as data:
+                    utc = bool(data['utc']) if 'utc' in data.files else False
+                    return cls(data['times'], data['highs'], data['lows'], utc)
+        except Exception as e:
+            logger.error(f"Error loading range index {path}: {e}")
+        return cls(np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0))
+
+
+def trading_days(times: np.ndarray, timezone: str = 'Asia/Dubai') -> np.ndarray:
+    """Distinct local dates (as datetime.date) covered by bar times"""
+    if len(times) == 0:
+        return np.zeros(0, dtype=object)
+    tz = pytz.timezone(timezone)
+    first = datetime.fromtimestamp(int(times[0]), tz).date()
+    last = datetime.fromtimestamp(int(times[-1]), tz).date()
+    return np.array([first + timedelta(days=i) for i in range((last - first).days + 1)])
+
+
+def local_midnights(days, timezone: str = 'Asia/Dubai') -> np.ndarray:
+    """
+    UTC epoch seconds of local midnight for each day
+
+    Uses the UTC offset at local noon, so a session time on a DST change
+    day is exact from the switch onwards (the switch is 02:00-03:00 local,
+    before any trading session this bot uses).
+    """
+    tz = pytz.timezone(timezone)
+    bases = []
+    for day in days:
+        noon = tz.localize(datetime.combine(day, datetime.min.time()) + timedelta(hours=12))
+        bases.append(int(noon.timestamp()) - 12 * 3600)
+    return np.array(bases, dtype=np.int64)
+
+
+def session_bounds(days, start_minute: int, end_minute: int,
+                   timezone: str = 'Asia/Dubai',
+                   midnights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    UTC epoch-second bounds [t1, t2) of a local session on each day
+
+    Args:
+        days: Iterable of local dates
+        start_minute/end_minute: Session start/end as minutes after local midnight
+        timezone: Session timezone
+        midnights: Precomputed local_midnights(days) - pass it when sweeping
+            many windows over the same days
+    """
+    if midnights is None:
+        midnights = local_midnights(days, timezone)
+    return midnights + start_minute * 60, midnights + end_minute * 60
+
+
+def sweep_session_windows(index: RangeIndex, windows, london_start_minute: int = 11 * 60,
+                          london_end_minute: int = 14 * 60, timezone: str = 'Asia/Dubai',
+                          days=None, min_range: float = 0.0) -> Dict[Tuple[int, int], Dict]:
+    """
+    Range statistics for many candidate Asia windows, by index lookups only
+
+    For each (start_minute, end_minute) window: per-day range high/low,
+    then whether the London session traded through either edge. The London
+    high/low is looked up once and shared by every window.
+
+    Window bounds are converted from local time to UTC epochs, so the
+    index must hold real UTC bar times (index.utc). Raw MT5 bar times are
+    server time and would shift every window by the server offset.
+
+    Args:
+        index: RangeIndex over the symbol's bars
+        windows: Iterable of (start_minute, end_minute), local time
+        london_start_minute/london_end_minute: London session, local time
+        timezone: Session timezone
+        days: Local dates to evaluate (default: every day in the index)
+        min_range: Skip days whose range is smaller than this
+
+    Returns:
+        {(start, end): {'days', 'avg_range', 'median_range', 'break_above_pct',
+                        'break_below_pct', 'break_both_pct', 'inside_pct'}}
+    """
+    if not index.utc:
+        raise ValueError("Range index holds server-time bars, not UTC - rebuild it")
+    if days is None:
+        days = trading_days(index.times, timezone)
+    days = list(days)
+    results = {}
+    if not days:
+        return results
+
+    midnights = local_midnights(days, timezone)
+    l1, l2 = session_bounds(days, london_start_minute, london_end_minute, midnights=midnights)
+    london_high, london_low = index.window(l1, l2)
+
+    for start, end in windows:
+        t1, t2 = session_bounds(days, start, end, midnights=midnights)
+        high, low = index.window(t1, t2)
+        size = high - low
+        valid = ~np.isnan(size) & ~np.isnan(london_high) & (size >= min_range)
+        n = int(valid.sum())
+        if n == 0:
+            results[(start, end)] = {'days': 0}
+            continue
+
+        above = london_high[valid] > high[valid]
+        below = london_low[valid] < low[valid]
+        results[(start, end)] = {
+            'days': n,
+            'avg_range': float(size[valid].mean()),
+            'median_range': float(np.median(size[valid])),
+            'break_above_pct': float(above.mean() * 100),
+            'break_below_pct': float(below.mean() * 100),
+            'break_both_pct': float((above & below).mean() * 100),
+            'inside_pct': float((~above & ~below).mean() * 100),
+        }
+
+    return results
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Result Cache for European Indexes MT5 Bot
+Disk memoization for backtests and parameter sweeps
+
+A result is stored under the sha256 of everything that determines it:
+the raw bytes of the input bar slice, the parameters (canonical JSON) and
+the strategy version. Rerunning a backtest, or a sweep that overlaps an
+earlier one, reads those results back instead of recomputing them;
+appending new bars only changes the key of the chunk that contains them.
+
+Entries are .npz files under <cache_dir>/<2 hex>/<key>.npz. A hit touches
+the file's mtime, and when the cache grows past max_bytes the least
+recently used entries are deleted. Hit/miss counts and the compute time
+saved are kept per session (stats()).
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import numpy as np
+from pathlib import Path
+from typing import Optional, Dict, Callable
+
+logger = logging.getLogger('EuropeanIndexesMT5.ResultCache')
+
+# Default location and size limit
+CACHE_DIR = Path(__file__).resolve().parents[2] / 'state' / 'result_cache'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Evict down to this fraction of max_bytes so eviction scans stay rare
+EVICT_TO = 0.9
+
+
+def _hash_part(digest, part):
+    """Feed one key component into the digest, tagged by type"""
+    if isinstance(part, np.ndarray):
+        array = np.ascontiguousarray(part)
+        digest.update(b'nd')
+        digest.update(array.dtype.str.encode())
+        digest.update(repr(array.dtype.descr).encode())
+        digest.update(repr(array.shape).encode())
+        digest.update(memoryview(array).cast('B'))
+    elif isinstance(part, (dict, list, tuple)):
+        digest.update(b'js')
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+    elif isinstance(part, bytes):
+        digest.update(b'by')
+        digest.update(part)
+    else:
+        digest.update(b'rp')
+        digest.update(repr(part).encode())
+    digest.update(b'\x00')
+
+
+def cache_key(*parts) -> str:
+    """sha256 hex digest of the key components (arrays by content, dicts as sorted JSON)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        _hash_part(digest, part)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Persistent array cache keyed by content hash, with LRU size eviction"""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory holding the entries (created if missing)
+            max_bytes: Size on disk above which least recently used entries are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0     # Original compute time of every hit
+        self.computed_seconds = 0.0  # Compute time spent on misses
+        self.total_bytes = sum(size for _, size, _ in self._entries())
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.npz"
+
+    def _entries(self):
+        """(path, size, mtime) of every entry on disk"""
+        for path in self.cache_dir.glob('*/*.npz'):
+            try:
+                st = path.stat()
+            except OSError:
+                continue  # Evicted by another process
+            yield path, st.st_size, st.st_mtime
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Cached array for key, or None (counted as a miss)"""
+        path = self._path(key)
+        try:
+            with np.load(path) as entry:
+                value = entry['value']
+                seconds = float(entry['seconds'])
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️  Dropping unreadable cache entry {path.name}: {e}")
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        self.hits += 1
+        self.saved_seconds += seconds
+        return value
+
+    def put(self, key: str, value: np.ndarray, compute_seconds: float = 0.0):
+        """Store value under key (atomic replace), then evict if over max_bytes"""
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{key}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, value=value, seconds=np.float64(compute_seconds))
+            old_size = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+            self.total_bytes += path.stat().st_size - old_size
+        except OSError as e:
+            logger.warning(f"⚠️  Could not write cache entry {key[:12]}: {e}")
+            self._remove(tmp_path)
+            return
+
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """Cached value for key, or compute(), store and return it"""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        started = time.perf_counter()
+        value = compute()
+        seconds = time.perf_counter() - started
+        self.computed_seconds += seconds
+        self.put(key, value, seconds)
+        return value
+
+    def evict(self, target_bytes: Optional[int] = None):
+        """Delete least recently used entries until the cache fits target_bytes"""
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * EVICT_TO)
+
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= target_bytes:
+                break
+            if self._remove(path):
+                total -= size
+                self.evictions += 1
+        self.total_bytes = total
+
+    def clear(self):
+        """Delete every entry"""
+        self.evict(target_bytes=0)
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except OSError:
+            return False
+
+    def stats(self) -> Dict:
+        """Session hit rate and compute saved, plus current size on disk"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups * 100 if lookups else 0.0,
+            'saved_seconds': self.saved_seconds,
+            'computed_seconds': self.computed_seconds,
+            'evictions': self.evictions,
+            'size_mb': self.total_bytes / (1024 * 1024),
+            'max_mb': self.max_bytes / (1024 * 1024),
+        }
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Runtime Snapshot for European Indexes MT5 Bot
+Persists the in-memory trading state (Asia ranges, open trades, daily
+risk used, OCO pending pairs) so a restarted bot can resume the session
+instead of starting cold. Writes are atomic (temp file + rename), so a crash mid-write never
+leaves a corrupt snapshot behind.
+"""
+
+import json
+import os
+import logging
+from datetime import date, datetime
+from typing import Optional, Dict
+
+logger = logging.getLogger('EuropeanIndexesMT5.RuntimeState')
+
+DATE_KEYS = ('date',)
+DATETIME_KEYS = ('identified_at', 'entry_time')
+
+
+def _encode(record: Dict) -> Dict:
+    """Make one range/trade record JSON-safe"""
+    encoded = {}
+    for key, value in record.items():
+        if isinstance(value, (date, datetime)):
+            encoded[key] = value.isoformat()
+        elif hasattr(value, 'item'):  # numpy scalar
+            encoded[key] = value.item()
+        else:
+            encoded[key] = value
+    return encoded
+
+
+def _encode_pair(pair: Dict) -> Dict:
+    """Make one OCO pair JSON-safe (its legs are nested {direction: value} dicts)"""
+    encoded = _encode({key: value for key, value in pair.items() if not isinstance(value, dict)})
+    encoded.update({key: _encode(value) for key, value in pair.items() if isinstance(value, dict)})
+    return encoded
+
+
+def _decode(record: Dict) -> Dict:
+    """Restore date/datetime fields of one range/trade record"""
+    decoded = dict(record)
+    for key in DATE_KEYS:
+        if isinstance(decoded.get(key), str):
+            decoded[key] = date.fromisoformat(decoded[key])
+    for key in DATETIME_KEYS:
+        if isinstance(decoded.get(key), str):
+            decoded[key] = datetime.fromisoformat(decoded[key])
+    return decoded
+
+
+class RuntimeSnapshot:
+    """Save/load bot runtime state for warm restarts"""
+
+    def __init__(self, snapshot_file: str):
+        self.snapshot_file = snapshot_file
+
+    def save(self, trading_date: date, asia_ranges: Dict, current_trades: Dict,
+             daily_risk_used: float, pending_orders: Optional[Dict] = None):
+        """Atomically write the current runtime state"""
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_file), exist_ok=True)
+            snapshot = {
+                'trading_date': trading_date.isoformat(),
+                'saved_at': datetime.now().isoformat(),
+                'daily_risk_used': daily_risk_used,
+                'asia_ranges': {s: _encode(r) for s, r in asia_ranges.items()},
+                'current_trades': {s: _encode(t) for s, t in current_trades.items()},
+                'pending_orders': {s: _encode_pair(p) for s, p in (pending_orders or {}).items()},
+            }
+            tmp_file = f"{self.snapshot_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(tmp_file, self.snapshot_file)
+        except Exception as e:
+            logger.error(f"Error saving runtime snapshot: {e}")
+
+    def load(self, trading_date: date) -> Optional[Dict]:
+        """
+        Load the snapshot if it belongs to trading_date
+
+        Returns None when there is no snapshot or it is from another day
+        (a stale day's ranges and risk must never leak into today).
+        """
+        try:
+            if not os.path.exists(self.snapshot_file):
+                return None
+            with open(self.snapshot_file, 'r') as f:
+                snapshot = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading runtime snapshot: {e}")
+            return None
+
+        if snapshot.get('trading_date') != trading_date.isoformat():
+            logger.info(f"Runtime snapshot is from {snapshot.get('trading_date')} - ignoring")
+            return None
+
+        return {
+            'daily_risk_used': snapshot.get('daily_risk_used', 0),
+            'asia_ranges': {s: _decode(r) for s, r in snapshot.get('asia_ranges', {}).items()},
+            'current_trades': {s: _decode(t) for s, t in snapshot.get('current_trades', {}).items()},
+            'pending_orders': snapshot.get('pending_orders', {}),
+            'saved_at': snapshot.get('saved_at'),
+        }
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Broker Symbol Resolver for European Indexes MT5 Bot
+Maps logical instruments (DAX, GER40, ...) to the broker's symbol names
+
+One symbols_get() call builds an in-memory index over every symbol's
+name, description and path. Names are normalized so broker decorations
+like GER40.cash, DE40m, #UK100 or EU50_i still match. Resolutions are
+cached per trade server, so later startups skip the scan entirely.
+"""
+
+import json
+import os
+import re
+import logging
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Iterable
+
+logger = logging.getLogger('EuropeanIndexesMT5.SymbolResolver')
+
+# Default alias groups (config.json "symbol_variations" overrides these)
+DEFAULT_ALIASES = {
+    'DAX': ['GER40', 'GER30', 'DE40', 'DE30', 'DAX40', 'DAX'],
+    'CAC40': ['FRA40', 'FR40', 'CAC40', 'CAC'],
+    'FTSE': ['UK100', 'FTSE100', 'UKX'],
+    'EURO_STOXX': ['EUSTX50', 'EU50', 'STOXX50', 'ESTX50', 'SX5E'],
+}
+
+SEPARATORS = re.compile(r'[._#+!\-\s]')
+LOWER_SUFFIX = re.compile(r'^([A-Z0-9]+?)([a-z]+)$')
+WORDS = re.compile(r'[A-Za-z0-9]+')
+DIGITS = re.compile(r'\d+')
+
+
+def normalize(name: str) -> str:
+    """Strip broker decorations: 'GER40.cash' -> 'GER40', 'DE40m' -> 'DE40'"""
+    parts = [p for p in SEPARATORS.split(name) if p]
+    if not parts:
+        return name.upper()
+    # Prefix decorations ('#UK100', 'm.GER40') leave the longest alphanumeric part
+    base = max(parts, key=lambda p: (any(c.isdigit() for c in p), len(p)))
+    match = LOWER_SUFFIX.match(base)
+    if match:
+        base = match.group(1)
+    return base.upper()
+
+
+class SymbolResolver:
+    """Resolve logical instrument names to broker symbols with one terminal scan"""
+
+    def __init__(self, aliases: Optional[Dict[str, List[str]]] = None,
+                 cache_dir: Optional[str] = None,
+                 cache_max_age_hours: float = 24 * 7):
+        """
+        Initialize resolver
+
+        Args:
+            aliases: {group: [variations]} e.g. {'DAX': ['GER40', 'DE40']}
+            cache_dir: Directory for per-server resolution caches (None disables)
+            cache_max_age_hours: Cached resolutions older than this are rebuilt
+        """
+        aliases = aliases or DEFAULT_ALIASES
+        # Only list values are alias groups (config sections may carry a "note" string)
+        aliases = {group: variations for group, variations in aliases.items()
+                   if isinstance(variations, (list, tuple))}
+        self.groups = list(aliases)
+        self.aliases = {}
+        for group, variations in aliases.items():
+            names = [group] + list(variations)
+            for name in names:
+                self.aliases.setdefault(name.upper(), names)
+        self.cache_dir = cache_dir
+        self.cache_max_age = timedelta(hours=cache_max_age_hours)
+
+        self.names = {}         # {NAME: broker name}
+        self.bases = {}         # {normalized base: [broker names]}
+        self.sorted_bases = []  # Sorted base keys for prefix lookups
+        self.words = {}         # {description/path word: [broker names]}
+        self.descriptions = {}  # {broker name: description}
+        self.scanned = False    # Index built from symbols_get() this session
+
+    def build_index(self, symbols: Iterable) -> int:
+        """Index SymbolInfo records (from mt5.symbols_get()) by name, base and text"""
+        self.names, self.bases, self.words, self.descriptions = {}, {}, {}, {}
+        count = 0
+        for info in symbols:
+            name = info.name
+            self.names[name.upper()] = name
+            self.bases.setdefault(normalize(name), []).append(name)
+            self.descriptions[name] = getattr(info, 'description', '')
+            text = f"{getattr(info, 'description', '')} {getattr(info, 'path', '')}"
+            for word in set(w.upper() for w in WORDS.findall(text)):
+                self.words.setdefault(word, []).append(name)
+            count += 1
+        self.sorted_bases = sorted(self.bases)
+        self.scanned = True
+        return count
+
+    def _prefix_matches(self, base: str, max_extra: int = 4) -> List[str]:
+        """Broker names whose base extends base by a short letter suffix (STOXX50 -> STOXX50E)"""
+        matches = []
+        i = bisect_left(self.sorted_bases, base)
+        while i < len(self.sorted_bases) and self.sorted_bases[i].startswith(base):
+            extra = self.sorted_bases[i][len(base):]
+            if extra and len(extra) <= max_extra and extra.isalpha():
+                matches.extend(self.bases[self.sorted_bases[i]])
+            i += 1
+        return matches
+
+    def candidates(self, logical: str) -> List[str]:
+        """Names to try for a logical instrument, the requested one first"""
+        names = [logical] + self.aliases.get(logical.upper(), [])
+        return list(dict.fromkeys(n.upper() for n in names))
+
+    def resolve(self, logical: str) -> Optional[str]:
+        """
+        Resolve one logical name against the index
+
+        Order: exact name, then normalized base (suffix/prefix decorations),
+        then a short letter suffix on the base, then description/path words. Ties prefer the shortest broker name,
+        which is usually the plain cash CFD. Description matches are a guess:
+        when the aliases carry a number (GER40, DE30) the broker name must
+        carry one of them too, and the match is logged as a warning.
+        """
+        candidates = self.candidates(logical)
+
+        for name in candidates:
+            if name in self.names:
+                return self.names[name]
+
+        for name in candidates:
+            matches = self.bases.get(normalize(name))
+            if matches:
+                return min(matches, key=len)
+
+        for name in candidates:
+            matches = self._prefix_matches(normalize(name))
+            if matches:
+                return min(matches, key=len)
+
+        numbers = {n for name in candidates for n in DIGITS.findall(name)}
+        for name in candidates:
+            matches = self.words.get(name, [])
+            if numbers:
+                matches = [m for m in matches if numbers.intersection(DIGITS.findall(normalize(m)))]
+            if matches:
+                match = min(matches, key=len)
+                logger.warning(f"{logical} matched {match} by description only "
+                               f"({self.descriptions.get(match, '')}) - add it to symbol_variations if wrong")
+                return match
+
+        return None
+
+    def describe(self, mt5, name: str) -> str:
+        """Broker description of a symbol (from the index, or the terminal on a cache hit)"""
+        if name not in self.descriptions:
+            info = mt5.symbol_info(name)
+            self.descriptions[name] = getattr(info, 'description', '') if info is not None else ''
+        return self.descriptions[name]
+
+    def resolve_all(self, logicals: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Resolve many logical names (in-memory lookups only)"""
+        return {logical: self.resolve(logical) for logical in logicals}
+
+    def _cache_path(self, server: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        safe_server = re.sub(r'[^A-Za-z0-9_.-]', '_', server)
+        return os.path.join(self.cache_dir, f"{safe_server}.json")
+
+    def load_cache(self, server: str) -> Dict[str, str]:
+        """Cached resolutions for a trade server ({} if missing or expired)"""
+        path = self._cache_path(server)
+        try:
+            if path and os.path.exists(path):
+                with open(path, 'r') as f:
+                    cache = json.load(f)
+                built_at = datetime.fromisoformat(cache.get('built_at', '1970-01-01'))
+                if datetime.now() - built_at < self.cache_max_age:
+                    return cache.get('resolved', {})
+        except Exception as e:
+            logger.error(f"Error loading symbol cache for {server}: {e}")
+        return {}
+
+    def save_cache(self, server: str, resolved: Dict[str, str]):
+        """Persist resolutions for a trade server"""
+        path = self._cache_path(server)
+        if not path:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump({'built_at': datetime.now().isoformat(), 'resolved': resolved}, f, indent=2)
+        except Exception as e:
+            logger.error(f"Error saving symbol cache for {server}: {e}")
+
+    def invalidate(self, server: str, logicals: Iterable[str]):
+        """Drop cached resolutions that the terminal no longer accepts"""
+        cached = self.load_cache(server)
+        stale = [logical for logical in logicals if logical in cached]
+        if stale:
+            for logical in stale:
+                del cached[logical]
+            self.save_cache(server, cached)
+            logger.info(f"Dropped cached symbols for {server}: {', '.join(stale)}")
+
+    def resolve_with_terminal(self, mt5, server: str, logicals: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolve logical names for a connected terminal
+
+        Uses the per-server cache when it covers every name, otherwise
+        does a single symbols_get() scan and refreshes the cache.
+        """
+        cached = self.load_cache(server)
+        if all(cached.get(logical) for logical in logicals):
+            return {logical: cached[logical] for logical in logicals}
+
+        symbols = mt5.symbols_get()
+        if symbols is None:
+            logger.error(f"symbols_get() failed: {mt5.last_error()}")
+            return {logical: cached.get(logical) for logical in logicals}
+
+        count = self.build_index(symbols)
+        resolved = self.resolve_all(logicals)
+        logger.info(f"Indexed {count} broker symbols on {server}")
+
+        cached.update({k: v for k, v in resolved.items() if v})
+        self.save_cache(server, cached)
+        return resolved
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Columnar Trade Store for European Indexes MT5 Bot
+
+Trades are appended to typed arrays (one per column) instead of a list of
+dicts: 37 bytes per trade, so months of history stay small in-process.
+Running aggregates (wins/losses, PnL, drawdown, per-symbol breakdown) are
+updated on insert, so statistics are O(1) no matter how much history is
+kept. Columns export to NumPy without copying for analysis.
+"""
+
+from array import array
+from datetime import datetime
+from typing import Optional, Dict, List, Iterator
+
+import numpy as np
+
+DIRECTIONS = {'LONG': 1, 'SHORT': -1}
+DIRECTION_NAMES = {1: 'LONG', -1: 'SHORT', 0: ''}
+
+# (column name, array typecode)
+COLUMNS = (
+    ('timestamp', 'd'),   # Epoch seconds
+    ('symbol_id', 'H'),   # Index into TradeStore.symbols
+    ('direction', 'b'),   # 1 = LONG, -1 = SHORT
+    ('entry_price', 'd'),
+    ('exit_price', 'd'),
+    ('pnl', 'd'),
+    ('reason_id', 'H'),   # Index into TradeStore.reasons
+)
+
+
+class TradeStats:
+    """Running trade aggregates, updated in O(1) per trade"""
+
+    __slots__ = ('trades', 'wins', 'losses', 'pnl', 'gross_profit', 'gross_loss',
+                 'peak', 'max_drawdown')
+
+    def __init__(self):
+        self.trades = 0
+        self.wins = 0
+        self.losses = 0
+        self.pnl = 0.0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.peak = 0.0          # Highest cumulative PnL seen
+        self.max_drawdown = 0.0  # Largest drop from peak (positive number)
+
+    def add(self, pnl: float):
+        """Fold one closed trade into the aggregates"""
+        self.trades += 1
+        self.pnl += pnl
+        if pnl > 0:
+            self.wins += 1
+            self.gross_profit += pnl
+        else:
+            self.losses += 1
+            self.gross_loss -= pnl
+        if self.pnl > self.peak:
+            self.peak = self.pnl
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.pnl)
+
+    def add_many(self, pnls: np.ndarray):
+        """Fold trades in order - same result as add() per trade, vectorized"""
+        if len(pnls) == 0:
+            return
+        wins = pnls > 0
+        self.trades += len(pnls)
+        self.wins += int(wins.sum())
+        self.losses += int(len(pnls) - wins.sum())
+        self.gross_profit += float(pnls[wins].sum())
+        self.gross_loss -= float(pnls[~wins].sum())
+        equity = self.pnl + np.cumsum(pnls)
+        peaks = np.maximum(np.maximum.accumulate(equity), self.peak)
+        self.max_drawdown = max(self.max_drawdown, float((peaks - equity).max()))
+        self.pnl = float(equity[-1])
+        self.peak = float(peaks[-1])
+
+    @property
+    def win_rate(self) -> float:
+        return (self.wins / self.trades * 100) if self.trades > 0 else 0
+
+    def as_dict(self) -> Dict:
+        return {
+            'trades': self.trades,
+            'wins': self.wins,
+            'losses': self.losses,
+            'win_rate': self.win_rate,
+            'pnl': self.pnl,
+            'gross_profit': self.gross_profit,
+            'gross_loss': self.gross_loss,
+            'profit_factor': (self.gross_profit / self.gross_loss) if self.gross_loss > 0 else None,
+            'expectancy': (self.pnl / self.trades) if self.trades > 0 else 0.0,
+            'max_drawdown': self.max_drawdown,
+        }
+
+
+class TradeStore:
+    """Append-only columnar trade history with running statistics"""
+
+    def __init__(self):
+        self.columns = {name: array(code) for name, code in COLUMNS}
+        self.symbols = []      # symbol_id -> symbol
+        self.symbol_ids = {}   # symbol -> symbol_id
+        self.reasons = []
+        self.reason_ids = {}
+        self.totals = TradeStats()
+        self.by_symbol = {}    # {symbol: TradeStats}
+
+    def __len__(self) -> int:
+        return len(self.columns['timestamp'])
+
+    @staticmethod
+    def _intern(value: str, values: List[str], ids: Dict[str, int]) -> int:
+        if value not in ids:
+            ids[value] = len(values)
+            values.append(value)
+        return ids[value]
+
+    def append(self, symbol: str, direction: str, entry: float, exit: float,
+               pnl: float, reason: str, timestamp: Optional[float] = None) -> int:
+        """Add one closed trade; returns its row index"""
+        c = self.columns
+        c['timestamp'].append(datetime.now().timestamp() if timestamp is None else timestamp)
+        c['symbol_id'].append(self._intern(symbol, self.symbols, self.symbol_ids))
+        c['direction'].append(DIRECTIONS.get(direction, 0))
+        c['entry_price'].append(entry)
+        c['exit_price'].append(exit)
+        c['pnl'].append(pnl)
+        c['reason_id'].append(self._intern(reason, self.reasons, self.reason_ids))
+
+        self.totals.add(pnl)
+        if symbol not in self.by_symbol:
+            self.by_symbol[symbol] = TradeStats()
+        self.by_symbol[symbol].add(pnl)
+        return len(self) - 1
+
+    def trim(self, keep: int) -> int:
+        """
+        Drop all but the newest keep rows; returns the number removed
+
+        Running aggregates (totals, by_symbol) still cover every trade ever
+        appended - only the row-level history is shortened.
+        """
+        drop = len(self) - keep
+        if drop <= 0:
+            return 0
+        for column in self.columns.values():
+            del column[:drop]
+        return drop
+
+    def record(self, i: int) -> Dict:
+        """Row i as a trade dict (same keys as TradeMonitor's JSON state)"""
+        c = self.columns
+        return {
+            'timestamp': datetime.fromtimestamp(c['timestamp'][i]).isoformat(),
+            'symbol': self.symbols[c['symbol_id'][i]],
+            'direction': DIRECTION_NAMES[c['direction'][i]],
+            'entry_price': c['entry_price'][i],
+            'exit_price': c['exit_price'][i],
+            'pnl': c['pnl'][i],
+            'reason': self.reasons[c['reason_id'][i]],
+        }
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict]:
+        """Iterate trade dicts for rows [start, stop)"""
+        for i in range(start, len(self) if stop is None else stop):
+            yield self.record(i)
+
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        """
+        Zero-copy NumPy views of every column
+
+        The views share memory with the store - copy them before appending
+        more trades (array growth may reallocate the buffers).
+        """
+        return {name: np.frombuffer(self.columns[name], dtype=np.dtype(code))
+                for name, code in COLUMNS}
+
+    @property
+    def bytes_per_trade(self) -> int:
+        return sum(self.columns[name].itemsize for name, _ in COLUMNS)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Performance Analytics
+Streams the full trade journal and exported MT5 deal history once and
+writes a compact JSON report: expectancy per symbol / weekday / range
+size / account, drawdown curves, slippage and latency distributions
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add bot directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'bot'))
+
+import numpy as np
+
+from analytics import PerformanceAnalyzer, analyze, deals_to_array
+
+STATE_DIR = Path(__file__).resolve().parents[2] / 'state'
+DEALS_DIR = STATE_DIR / 'deals'
+
+
+def export_deals(years: float, deals_dir: Path):
+    """
+    Write this account's deal history to state/deals/<login>/<YYYY-MM>.npy
+
+    Months already exported are skipped (except the current one), so a
+    re-run only fetches what is new.
+    """
+    try:
+        from mt5_gateway import load_mt5
+        mt5 = load_mt5()  # Shared gateway when MT5_GATEWAY is set
+    except ImportError:
+        print("❌ MetaTrader5 library not installed")
+        print("Install with: pip install MetaTrader5")
+        return 1
+
+    if not mt5.initialize():
+        print(f"❌ MT5 initialization failed: {mt5.last_error()}")
+        return 1
+
+    try:
+        account = mt5.account_info()
+        if account is None:
+            print(f"❌ Failed to get account info: {mt5.last_error()}")
+            return 1
+
+        out_dir = deals_dir / str(account.login)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        now = datetime.now()
+        month = (now - timedelta(days=365 * years)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        written = skipped = 0
+        while month <= now:
+            next_month = (month + timedelta(days=32)).replace(day=1)
+            chunk_file = out_dir / f"{month:%Y-%m}.npy"
+            if chunk_file.exists() and next_month <= now:
+                skipped += 1
+                month = next_month
+                continue
+
+            deals = mt5.history_deals_get(month, next_month) or ()
+            orders = {o.ticket: o for o in (mt5.history_orders_get(month, next_month) or ())}
+            for deal in deals:
+                if deal.order and deal.order not in orders:
+                    # Pending order placed in an earlier month
+                    found = mt5.history_orders_get(ticket=deal.order)
+                    if found:
+                        orders[deal.order] = found[0]
+            if deals:
+                np.save(chunk_file, deals_to_array(deals, orders))
+                written += len(deals)
+            month = next_month
+
+        print(f"✅ Account {account.login}: {written} deals exported to {out_dir} "
+              f"({skipped} months already exported)")
+        return 0
+    finally:
+        mt5.shutdown()
+
+
+def print_groups(title: str, groups: dict):
+    if not groups:
+        return
+    print(f"\n{title}")
+    print(f"  {'':14} {'Trades':>7} {'Win%':>6} {'Expect.':>9} {'P&L':>11} {'PF':>6} {'MaxDD':>9}")
+    for key, s in groups.items():
+        pf = f"{s['profit_factor']:6.2f}" if s['profit_factor'] is not None else f"{'-':>6}"
+        print(f"  {str(key)[:14]:14} {s['trades']:>7} {s['win_rate']:>6.1f} {s['expectancy']:>9.2f} "
+              f"{s['pnl']:>11.2f} {pf} {s['max_drawdown']:>9.2f}")
+
+
+def print_histogram(title: str, h: dict, unit: str):
+    if not h['count']:
+        return
+    print(f"{title:22} n={h['count']} | mean {h['mean']:.2f}{unit} | p50 {h['p50']:.2f}{unit} | "
+          f"p90 {h['p90']:.2f}{unit} | p99 {h['p99']:.2f}{unit} | max {h['max']:.2f}{unit}")
+
+
+def print_report(report: dict):
+    journal = report['journal']
+    deals = report['deals']
+
+    print("="*72)
+    print("JOURNAL (strategy view)")
+    print("="*72)
+    print_groups("Per symbol", journal['by_symbol'])
+    print_groups("Per weekday", journal['by_weekday'])
+    print_groups("Per range size (% of price)", journal['by_range_size'])
+    print_groups("Per account", journal['by_account'])
+    print()
+    print_histogram("Slippage (adverse)", journal['slippage_bps'], ' bps')
+    print_histogram("Order round trip", journal['order_latency_ms'], ' ms')
+    if journal['skipped_records']:
+        print(f"⚠️  {journal['skipped_records']} journal records skipped (missing fields)")
+
+    if deals['deals']:
+        print()
+        print("="*72)
+        print("DEALS (broker view, incl. commission and swap)")
+        print("="*72)
+        print_groups("Per symbol", deals['by_symbol'])
+        print_groups("Per weekday (close)", deals['by_weekday'])
+        print_groups("Per account", deals['by_account'])
+        print()
+        costs = deals['costs']
+        print(f"Costs: commission {costs['commission']:.2f} | swap {costs['swap']:.2f} | fee {costs['fee']:.2f}")
+        print_histogram("Fill vs order price", deals['slippage_bps'], ' bps')
+        print_histogram("Order to deal", deals['execution_latency_ms'], ' ms')
+        if deals['open_positions']:
+            print(f"Open positions (not booked): {deals['open_positions']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Streaming performance analytics over the journal and MT5 deal history',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Export 3 years of deal history for the logged-in account (repeat per account)
+  python scripts/analytics.py export-deals --years 3
+
+  # Report over the journal and every exported account
+  python scripts/analytics.py report
+
+  # Only the bot's deals, report written elsewhere
+  python scripts/analytics.py report --magic 234000 --out /tmp/report.json
+        """
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export-deals', help='Export deal history from MT5 to monthly .npy chunks')
+    export_parser.add_argument('--years', type=float, default=3.0, help='History to export (default: 3)')
+    export_parser.add_argument('--deals-dir', default=str(DEALS_DIR), help='Export root (default: state/deals)')
+
+    report_parser = subparsers.add_parser('report', help='Stream journal + deals and write a report')
+    report_parser.add_argument('--journal', nargs='*', default=None,
+                               help='Journal files (default: state/journal.jsonl)')
+    report_parser.add_argument('--deals', nargs='*', default=None,
+                               help='Account export directories (default: every state/deals/<login>)')
+    report_parser.add_argument('--magic', type=int, default=None, help='Only count deals with this magic number')
+    report_parser.add_argument('--curve-points', type=int, default=512,
+                               help='Max samples per equity curve (default: 512)')
+    report_parser.add_argument('--out', default=str(STATE_DIR / 'analytics_report.json'),
+                               help='Report file (default: state/analytics_report.json)')
+    report_parser.add_argument('--quiet', action='store_true', help='Only write the report')
+
+    args = parser.parse_args()
+
+    if args.command == 'export-deals':
+        return export_deals(args.years, Path(args.deals_dir))
+
+    journals = args.journal if args.journal is not None else \
+        [str(p) for p in [STATE_DIR / 'journal.jsonl'] if p.exists()]
+    deal_dirs = args.deals if args.deals is not None else \
+        [str(p) for p in sorted(DEALS_DIR.glob('*')) if p.is_dir()]
+    if not journals and not deal_dirs:
+        print("❌ Nothing to analyze (no journal or deal exports found)")
+        return 1
+
+    started = time.perf_counter()
+    analyzer = PerformanceAnalyzer(curve_points=args.curve_points, magic=args.magic)
+    report = analyze(journals, deal_dirs, analyzer)
+    elapsed = time.perf_counter() - started
+
+    if not args.quiet:
+        print_report(report)
+    print()
+    print(f"Analyzed {report['journal']['totals']['trades']} journal trades and "
+          f"{report['deals']['deals']} deals in {elapsed:.2f}s")
+
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, separators=(',', ':'))
+    print(f"Report written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
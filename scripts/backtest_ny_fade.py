@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+NY Fade Portfolio Backtest
+Backtests Gold_NY_Fade, BTC_NY_Fade and DAX_NY_Fade together on one
+shared balance from stored M1 history (fetch it once from MT5 with --fetch)
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Add bot directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'bot'))
+
+from ny_fade_backtest import (backtest, DEFAULT_STRATEGIES, DEFAULT_SPECS, EXIT_REASONS)
+from result_cache import ResultCache, CACHE_DIR
+
+CONFIG_FILE = Path(__file__).parent.parent / 'config.json'
+DATA_DIR = Path(__file__).resolve().parents[2] / 'state' / 'bars_m1'
+
+RATES_DTYPE = np.dtype([('time', 'i8'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'),
+                        ('close', 'f8'), ('tick_volume', 'u8'), ('spread', 'i4')])
+
+
+def load_config():
+    """ny_fade section of config.json (empty dict if missing or invalid)"""
+    try:
+        with open(CONFIG_FILE, 'r') as f:
+            return json.load(f).get('ny_fade', {})
+    except Exception as e:
+        print(f"⚠️  Could not load {CONFIG_FILE.name}: {e}")
+        return {}
+
+
+def load_bars(data_dir: Path, symbol: str):
+    """M1 bars from <symbol>.npz, or an MT5 History Center CSV export <symbol>.csv"""
+    npz_path = data_dir / f"{symbol}.npz"
+    if npz_path.exists():
+        with np.load(npz_path) as data:
+            return data['rates']
+
+    csv_path = data_dir / f"{symbol}.csv"
+    if csv_path.exists():
+        import pandas as pd
+        df = pd.read_csv(csv_path, sep='\t')
+        df.columns = [c.strip('<>').lower() for c in df.columns]
+        stamps = pd.to_datetime(df['date'] + ' ' + df['time'], format='%Y.%m.%d %H:%M:%S')
+        rates = np.zeros(len(df), dtype=RATES_DTYPE)
+        rates['time'] = stamps.to_numpy().astype('datetime64[s]').astype('int64')
+        for column in ('open', 'high', 'low', 'close'):
+            rates[column] = df[column].to_numpy()
+        rates['tick_volume'] = df.get('tickvol', 0)
+        rates['spread'] = df.get('spread', 0)
+        return rates
+
+    return None
+
+
+def fetch_bars(symbols, years: float, data_dir: Path):
+    """Download M1 history (30-day chunks) and contract specs from MT5"""
+    try:
+        from mt5_gateway import load_mt5
+        mt5 = load_mt5()  # Shared gateway when MT5_GATEWAY is set
+    except ImportError:
+        print("❌ MetaTrader5 library not installed")
+        print("Install with: pip install MetaTrader5")
+        return False
+
+    if not mt5.initialize():
+        print(f"❌ MT5 initialization failed: {mt5.last_error()}")
+        return False
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    end = datetime.utcnow()
+    try:
+        for symbol in symbols:
+            if not mt5.symbol_select(symbol, True):
+                print(f"⚠️  {symbol}: not available on this server")
+                continue
+
+            chunks = []
+            chunk_end = end
+            start = end - timedelta(days=365 * years)
+            while chunk_end > start:
+                chunk_start = max(start, chunk_end - timedelta(days=30))
+                rates = mt5.copy_rates_range(symbol, mt5.TIMEFRAME_M1, chunk_start, chunk_end)
+                if rates is not None and len(rates):
+                    chunks.append(rates)
+                chunk_end = chunk_start
+
+            if not chunks:
+                print(f"⚠️  {symbol}: no M1 history ({mt5.last_error()})")
+                continue
+
+            rates = np.concatenate(chunks[::-1])
+            rates = rates[np.unique(rates['time'], return_index=True)[1]]
+            np.savez(data_dir / f"{symbol}.npz", rates=rates)
+
+            info = mt5.symbol_info(symbol)
+            if info is not None:
+                spec = {'point': info.point, 'tick_size': info.trade_tick_size,
+                        'tick_value': info.trade_tick_value, 'volume_min': info.volume_min,
+                        'volume_max': info.volume_max, 'volume_step': info.volume_step}
+                with open(data_dir / f"{symbol}.spec.json", 'w') as f:
+                    json.dump(spec, f, indent=2)
+            print(f"✅ {symbol}: {len(rates)} M1 bars saved")
+    finally:
+        mt5.shutdown()
+    return True
+
+
+def load_spec(data_dir: Path, symbol: str, config: dict):
+    """Contract spec: broker spec saved by --fetch, then config.json, then defaults"""
+    spec = dict(DEFAULT_SPECS.get(symbol, DEFAULT_SPECS['XAUUSD']))
+    spec_path = data_dir / f"{symbol}.spec.json"
+    if spec_path.exists():
+        with open(spec_path) as f:
+            spec.update(json.load(f))
+    spec.update(config.get('specs', {}).get(symbol, {}))
+    return spec
+
+
+def print_report(result, elapsed: float, bars: int):
+    summary = result['summary']
+    trades = result['trades']
+    print("="*72)
+    print(f"NY FADE PORTFOLIO | {', '.join(result['symbols'])}")
+    print("="*72)
+    if len(trades):
+        first = datetime.utcfromtimestamp(int(trades['entry_time'].min())).date()
+        last = datetime.utcfromtimestamp(int(trades['exit_time'].max())).date()
+        print(f"Period:          {first} → {last}")
+    print(f"Balance:         ${summary['initial_balance']:,.2f} → ${summary['final_balance']:,.2f} "
+          f"({summary['return_pct']:+.1f}%)")
+    print(f"Max Drawdown:    {summary['max_drawdown_pct']:.1f}%")
+    print(f"Trades:          {summary['trades']} | Win Rate: {summary['win_rate']:.1f}%")
+    if summary['profit_factor'] is not None:
+        print(f"Profit Factor:   {summary['profit_factor']:.2f}")
+    print(f"Exits:           " + ' | '.join(f"{k}: {v}" for k, v in summary['exit_reasons'].items()))
+    print()
+    print(f"{'Symbol':10} {'Trades':>7} {'Win%':>6} {'P&L':>12} {'PF':>6} {'AvgWin':>9} {'AvgLoss':>9}")
+    for symbol, s in summary['by_symbol'].items():
+        pf = f"{s['profit_factor']:6.2f}" if s['profit_factor'] is not None else f"{'-':>6}"
+        print(f"{symbol:10} {s['trades']:>7} {s['win_rate']:>6.1f} {s['pnl']:>12,.2f} {pf} "
+              f"{s['avg_win']:>9.2f} {s['avg_loss']:>9.2f}")
+    print()
+    print(f"Backtest Time:   {elapsed:.2f}s for {bars:,} M1 bars")
+    print("="*72)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Portfolio backtest of the NY Fade EA family on shared equity',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Download 3 years of M1 history and contract specs once
+  python scripts/backtest_ny_fade.py --fetch --years 3
+
+  # Backtest the portfolio (inputs from config.json "ny_fade", else EA defaults)
+  python scripts/backtest_ny_fade.py --balance 10000
+
+  # Gold only, wider stop, trades to CSV
+  python scripts/backtest_ny_fade.py --symbols XAUUSD --sl-multiplier 1.5 --trades-csv gold.csv
+
+  # Recompute everything (skip the result cache)
+  python scripts/backtest_ny_fade.py --no-cache
+        """
+    )
+    parser.add_argument('--symbols', nargs='+', default=None,
+                        help='Symbols to include (default: every configured strategy)')
+    parser.add_argument('--data-dir', default=str(DATA_DIR),
+                        help='M1 bar directory (<symbol>.npz or MT5 CSV export <symbol>.csv)')
+    parser.add_argument('--fetch', action='store_true', help='Download M1 history from MT5 first')
+    parser.add_argument('--years', type=float, default=3.0, help='History to fetch (default: 3)')
+    parser.add_argument('--balance', type=float, default=None, help='Starting balance (default: 10000)')
+    parser.add_argument('--risk', type=float, default=None, help='Override RiskPercent for all symbols')
+    parser.add_argument('--sl-multiplier', type=float, default=None,
+                        help='Override StopLossMultiplier for all symbols')
+    parser.add_argument('--trades-csv', default=None, help='Write every trade to this CSV')
+    parser.add_argument('--cache-dir', default=str(CACHE_DIR), help='Result cache directory')
+    parser.add_argument('--cache-max-mb', type=float, default=512, help='Result cache size limit (default: 512)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write cached results')
+    args = parser.parse_args()
+
+    config = load_config()
+    data_dir = Path(args.data_dir)
+    strategies = {s: dict(p) for s, p in DEFAULT_STRATEGIES.items()}
+    for symbol, params in config.get('strategies', {}).items():
+        strategies[symbol] = {**strategies.get(symbol, DEFAULT_STRATEGIES['XAUUSD']), **params}
+    symbols = args.symbols or list(strategies)
+
+    if args.fetch and not fetch_bars(symbols, args.years, data_dir):
+        return 1
+
+    data, specs = {}, {}
+    for symbol in symbols:
+        if symbol not in strategies:
+            strategies[symbol] = dict(DEFAULT_STRATEGIES['XAUUSD'])
+        if args.risk is not None:
+            strategies[symbol]['risk_percent'] = args.risk
+        if args.sl_multiplier is not None:
+            strategies[symbol]['stop_loss_multiplier'] = args.sl_multiplier
+
+        bars = load_bars(data_dir, symbol)
+        if bars is None or len(bars) == 0:
+            print(f"⚠️  {symbol}: no M1 data in {data_dir} (run with --fetch)")
+            continue
+        data[symbol] = bars
+        specs[symbol] = load_spec(data_dir, symbol, config)
+
+    if not data:
+        print("❌ No data to backtest")
+        return 1
+
+    cache = None if args.no_cache else ResultCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024))
+    balance = args.balance or config.get('initial_balance', 10000.0)
+    started = time.perf_counter()
+    result = backtest(data, strategies, specs, balance, cache=cache)
+    elapsed = time.perf_counter() - started
+    print_report(result, elapsed, sum(len(b) for b in data.values()))
+
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Result cache: {stats['hits']}/{stats['hits'] + stats['misses']} symbol-months cached "
+              f"({stats['hit_rate']:.0f}% hit rate) | {stats['saved_seconds']:.2f}s compute saved | "
+              f"{stats['size_mb']:.1f}/{stats['max_mb']:.0f} MB")
+
+    if args.trades_csv:
+        trades = result['trades']
+        with open(args.trades_csv, 'w') as f:
+            f.write("symbol,direction,entry_time,entry_price,stop_loss,take_profit,"
+                    "exit_time,exit_price,exit_reason,lots,pnl,balance\n")
+            for row in trades:
+                f.write(f"{result['symbols'][row['symbol_id']]},"
+                        f"{'BUY' if row['direction'] == 1 else 'SELL'},"
+                        f"{datetime.utcfromtimestamp(int(row['entry_time'])).isoformat()},"
+                        f"{row['entry_price']},{row['stop_loss']},{row['take_profit']},"
+                        f"{datetime.utcfromtimestamp(int(row['exit_time'])).isoformat()},"
+                        f"{row['exit_price']},{EXIT_REASONS[row['exit_reason']]},"
+                        f"{row['lots']:.2f},{row['pnl']:.2f},{row['balance']:.2f}\n")
+        print(f"Trades written to {args.trades_csv}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Daily Feature Index Builder & Query Tool
+Builds per-symbol daily range features from MT5 history and answers
+filtered questions about range behaviour without re-scanning bars
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add bot directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'bot'))
+
+from feature_index import DailyFeatureIndex, int_to_date
+from range_index import sweep_session_windows
+
+STORE_DIR = Path(__file__).resolve().parents[2] / 'state' / 'features'
+MAX_SERVER_OFFSET = 14 * 3600
+
+
+def parse_filter(text):
+    """Parse 'column=low:high' or 'column=value' into a query filter"""
+    column, _, value = text.partition('=')
+    if ':' in value:
+        low, _, high = value.partition(':')
+        return column, (float(low) if low else None, float(high) if high else None)
+    return column, float(value)
+
+
+def measure_server_offset(mt5, symbols):
+    """Trade server clock minus UTC in seconds (rounded to 30 min), from the freshest tick"""
+    ticks = [mt5.symbol_info_tick(symbol) for symbol in symbols]
+    times = [tick.time for tick in ticks if tick is not None and tick.time]
+    if not times:
+        return None
+    offset = int(round((max(times) - time.time()) / 1800.0)) * 1800
+    return offset if abs(offset) <= MAX_SERVER_OFFSET else None
+
+
+def server_to_utc(times, offset, server_tz=None):
+    """MT5 bar times (server clock, epoch seconds) -> real UTC DatetimeIndex"""
+    import pandas as pd
+    stamps = pd.to_datetime(times, unit='s')
+    if server_tz:
+        # DST-aware: the server clock follows server_tz across the whole history
+        return pd.DatetimeIndex(stamps).tz_localize(
+            server_tz, ambiguous='NaT', nonexistent='shift_forward').tz_convert('UTC')
+    return pd.DatetimeIndex(stamps - pd.Timedelta(seconds=offset)).tz_localize('UTC')
+
+
+def build(args, index):
+    """Fetch missing history from MT5 and append new days"""
+    try:
+        from mt5_gateway import load_mt5
+        import pandas as pd
+        mt5 = load_mt5()  # Shared gateway when MT5_GATEWAY is set
+    except ImportError:
+        print("❌ MetaTrader5 library not installed")
+        print("Install with: pip install MetaTrader5")
+        return 1
+
+    if not mt5.initialize():
+        print(f"❌ MT5 initialization failed: {mt5.last_error()}")
+        return 1
+
+    try:
+        # MT5 stamps bars in trade server time; the store holds real UTC
+        if args.server_offset is not None:
+            offset = int(round(args.server_offset * 3600))
+        else:
+            offset = measure_server_offset(mt5, args.symbols)
+            if offset is None and not args.server_tz:
+                print("❌ Could not measure the server time offset (market closed or stale quotes)")
+                print("Pass --server-offset HOURS or --server-tz ZONE")
+                return 1
+        if args.server_tz:
+            print(f"🕒 Server clock: {args.server_tz}")
+        else:
+            print(f"🕒 Server time offset: UTC{offset / 3600:+.1f}h "
+                  f"(fixed - use --server-tz if the server follows DST)")
+
+        now = datetime.utcnow()
+        for symbol in args.symbols:
+            last = index.last_date(symbol)
+            # Re-fetch the last stored day: the store drops anything already indexed
+            start = now - timedelta(days=args.days) if last is None else \
+                datetime.combine(last, datetime.min.time())
+
+            # Range bounds are compared with server-time stamps
+            rates = mt5.copy_rates_range(symbol, mt5.TIMEFRAME_M5, start, now + timedelta(days=1))
+            if rates is None or len(rates) == 0:
+                print(f"⚠️  {symbol}: no new bars ({mt5.last_error()})")
+                continue
+
+            df = pd.DataFrame(rates)
+            df.index = server_to_utc(df.pop('time'), offset, args.server_tz)
+            df.index.name = 'time'
+            df = df[df.index.notna()]
+
+            try:
+                added = index.update(symbol, df)
+            except ValueError as e:
+                print(f"❌ {e}")
+                continue
+            print(f"✅ {symbol}: {added} new days | {len(index.load(symbol))} total")
+    finally:
+        mt5.shutdown()
+
+    return 0
+
+
+def query(args, index):
+    """Run a filtered query and print the summary"""
+    filters = dict(parse_filter(f) for f in args.filter)
+
+    started = time.perf_counter()
+    rows = index.query(args.symbol, **filters)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    summary = index.summarize(rows)
+    print("="*60)
+    print(f"{args.symbol} | Filters: {filters or 'none'}")
+    print("="*60)
+    print(f"Days:            {summary['days']}")
+    print(f"Breakouts:       {summary['breakouts']}")
+    print(f"Target Hits:     {summary['target_hits']}")
+    print(f"Hit Rate:        {summary['hit_rate']:.1f}%")
+    if summary['median_target_minutes'] is not None:
+        print(f"Median Time:     {summary['median_target_minutes']:.0f} min")
+    if summary['avg_mae'] is not None:
+        print(f"Avg MAE:         {summary['avg_mae']:.2f}")
+    if len(rows):
+        print(f"Period:          {int_to_date(rows['date'][0])} → {int_to_date(rows['date'][-1])}")
+    print(f"Query Time:      {elapsed_ms:.2f} ms")
+    print("="*60)
+    return 0
+
+
+def parse_hhmm(text):
+    """'08:30' -> minutes after midnight"""
+    hours, _, minutes = text.partition(':')
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def sweep(args, index):
+    """Compare candidate Asia windows using the stored bars' range index"""
+    ranges = index.range_index(args.symbol)
+    if len(ranges) == 0:
+        print(f"❌ No stored bars for {args.symbol} - run 'build' first")
+        return 1
+    if not ranges.utc:
+        print(f"❌ Stored bars for {args.symbol} are in server time, not UTC - "
+              f"delete {Path(args.store) / args.symbol}*.npz and run 'build' again")
+        return 1
+
+    starts = range(parse_hhmm(args.start_from), parse_hhmm(args.start_to) + 1, args.step)
+    windows = [(start, start + length)
+               for start in starts
+               for length in range(args.min_length, args.max_length + 1, args.step)]
+
+    started = time.perf_counter()
+    results = sweep_session_windows(
+        ranges, windows,
+        london_start_minute=parse_hhmm(args.london_start),
+        london_end_minute=parse_hhmm(args.london_end),
+        timezone=index.sessions['timezone'],
+        min_range=args.min_range,
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    def fmt(minute):
+        return f"{minute // 60:02d}:{minute % 60:02d}"
+
+    print("="*78)
+    print(f"{args.symbol} | {len(windows)} Asia windows | {len(ranges)} bars")
+    print("="*78)
+    print(f"{'Window':<13} {'Days':>5} {'AvgRange':>9} {'Median':>8} {'Above%':>7} "
+          f"{'Below%':>7} {'Both%':>6} {'Inside%':>8}")
+    # Rank by share of days with a clean single-edge break (the fade setup)
+    def single_break(r):
+        return r['break_above_pct'] + r['break_below_pct'] - 2 * r['break_both_pct'] if r['days'] else -1
+    ranked = sorted(results.items(), key=lambda item: single_break(item[1]), reverse=True)
+    for (start, end), r in ranked[:args.top]:
+        if not r['days']:
+            continue
+        print(f"{fmt(start)}-{fmt(end):<7} {r['days']:>5} {r['avg_range']:>9.2f} "
+              f"{r['median_range']:>8.2f} {r['break_above_pct']:>7.1f} {r['break_below_pct']:>7.1f} "
+              f"{r['break_both_pct']:>6.1f} {r['inside_pct']:>8.1f}")
+    print(f"Sweep Time:      {elapsed_ms:.2f} ms")
+    print("="*78)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Daily feature index for Asia range behaviour',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Build / update from MT5 history (2 years on first run)
+  python scripts/features.py build --symbols GER40 FRA40 UK100 EUSTX50
+
+  # DAX days with Asia range under 40 points
+  python scripts/features.py query GER40 range_size=:40
+
+  # ... that broke above and returned within 60 minutes
+  python scripts/features.py query GER40 range_size=:40 breakout_side=1 target_minutes=:60
+
+  # Compare Asia windows starting 04:00-06:00, 3-5 hours long, every 30 min
+  python scripts/features.py sweep GER40 --start-from 04:00 --start-to 06:00
+        """
+    )
+    parser.add_argument('--store', default=str(STORE_DIR),
+                        help='Feature table directory (default: state/features)')
+    parser.add_argument('--london-end', type=int, default=14,
+                        help='London session end hour, Dubai time (default: 14)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build or update feature tables from MT5')
+    build_parser.add_argument('--symbols', nargs='+',
+                              default=['GER40', 'FRA40', 'UK100', 'EUSTX50'])
+    build_parser.add_argument('--days', type=int, default=730,
+                              help='History to fetch on first build (default: 730)')
+    build_parser.add_argument('--server-offset', type=float, default=None,
+                              help='Server clock minus UTC in hours (default: measured from ticks)')
+    build_parser.add_argument('--server-tz', default=None,
+                              help='Server clock time zone, e.g. Europe/Athens (DST-aware, overrides the offset)')
+
+    query_parser = subparsers.add_parser('query', help='Query a feature table')
+    query_parser.add_argument('symbol')
+    query_parser.add_argument('filter', nargs='*',
+                              help='column=value or column=low:high (either bound optional)')
+
+    sweep_parser = subparsers.add_parser('sweep', help='Compare candidate Asia session windows')
+    sweep_parser.add_argument('symbol')
+    sweep_parser.add_argument('--start-from', default='04:00', help='Earliest window start (default: 04:00)')
+    sweep_parser.add_argument('--start-to', default='06:00', help='Latest window start (default: 06:00)')
+    sweep_parser.add_argument('--min-length', type=int, default=180,
+                              help='Shortest window in minutes (default: 180)')
+    sweep_parser.add_argument('--max-length', type=int, default=300,
+                              help='Longest window in minutes (default: 300)')
+    sweep_parser.add_argument('--step', type=int, default=30, help='Grid step in minutes (default: 30)')
+    sweep_parser.add_argument('--london-start', default='11:00', help='London open (default: 11:00)')
+    sweep_parser.add_argument('--london-end', dest='sweep_london_end', default=None,
+                              help='London close (default: --london-end hour)')
+    sweep_parser.add_argument('--min-range', type=float, default=0.0,
+                              help='Ignore days with a smaller range (default: 0)')
+    sweep_parser.add_argument('--top', type=int, default=20, help='Rows to print (default: 20)')
+
+    args = parser.parse_args()
+    index = DailyFeatureIndex(args.store, london_end_hour=args.london_end)
+
+    if args.command == 'build':
+        return build(args, index)
+    if args.command == 'sweep':
+        args.london_end = args.sweep_london_end or f"{args.london_end}:00"
+        return sweep(args, index)
+    return query(args, index)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
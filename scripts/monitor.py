@@ -2,14 +2,22 @@
 """
 Monitoring Script for European Indexes MT5 Bot
 Shows real-time stats, errors, and trade history
+
+With --shm, reads the bot's shared-memory live state instead of the
+state file (ranges, positions, last ticks; refreshes every second).
 """
 
+import argparse
 import json
 import os
+import sys
 from pathlib import Path
 from datetime import datetime
 import time
 
+# Add bot directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'bot'))
+
 def clear_screen():
     """Clear terminal screen"""
     os.system('clear' if os.name == 'posix' else 'cls')
@@ -92,8 +100,84 @@ def print_dashboard(state):
     print("Press Ctrl+C to exit | Refreshes every 10 seconds")
     print("="*80)
 
+def print_live_dashboard(live):
+    """Print dashboard from a shared-memory live state snapshot"""
+    clear_screen()
+    
+    updated = datetime.fromtimestamp(live['updated_at']).strftime('%Y-%m-%d %H:%M:%S')
+    print("="*80)
+    print("EUROPEAN INDEXES MT5 BOT - LIVE STATE (shared memory)")
+    print("="*80)
+    print(f"Last Update: {updated} | Session: {live['session']} | "
+          f"Loop: {live['loop_latency_ms']:.0f} ms | Seq: {live['seq']}")
+    print()
+    
+    print("📊 STATISTICS")
+    print("-"*80)
+    print(f"Trades Today:    {live['trades_today']} (Wins: {live['wins']})")
+    print(f"Daily P&L:       ${live['daily_pnl']:.2f}")
+    print(f"Total P&L:       ${live['total_pnl']:.2f}")
+    print(f"Daily Risk:      {live['daily_risk_used']:.1%}")
+    print(f"Errors Today:    {live['errors_today']}")
+    print(f"MT5 Latency:     p99 {live['mt5_p99_ms']:.0f} ms | Timeouts: {live['mt5_timeouts']} | "
+          f"Loop Stalls: {live['loop_stalls']}")
+    if live['degraded']:
+        print("🚨 CLOSE-ONLY MODE - terminal unresponsive, no new entries")
+    print()
+    
+    print("📈 SYMBOLS")
+    print("-"*80)
+    print(f"{'Symbol':10} {'Asia Low':>10} {'Asia High':>10} {'Bid':>10} {'Ask':>10} "
+          f"{'Pos':>5} {'Entry':>10} {'Open P&L':>9} {'Trades':>6}")
+    for symbol, r in live['symbols'].items():
+        position = {1: 'LONG', -1: 'SHORT'}.get(r['position'], '-')
+        entry = f"{r['entry_price']:10.2f}" if r['position'] else f"{'-':>10}"
+        print(f"{symbol:10} {r['asia_low']:10.2f} {r['asia_high']:10.2f} {r['bid']:10.2f} "
+              f"{r['ask']:10.2f} {position:>5} {entry} {r['unrealized_pnl']:9.2f} {r['trades']:6}")
+    print()
+    
+    print("="*80)
+    print("Press Ctrl+C to exit | Refreshes every second")
+    print("="*80)
+
+def monitor_shared_memory(interval):
+    """Live monitoring loop over the shared-memory segment"""
+    from live_state import LiveStateReader
+    
+    try:
+        reader = LiveStateReader()
+    except FileNotFoundError:
+        print("⚠️  Live state segment not found. Is the bot running?")
+        return
+    
+    try:
+        while True:
+            live = reader.snapshot()
+            if live:
+                print_live_dashboard(live)
+            else:
+                print("⚠️  No live state published yet")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n\n👋 Monitoring stopped")
+    except ValueError as e:
+        print(f"❌ {e}")
+    finally:
+        reader.close()
+
 def main():
     """Main monitoring loop"""
+    parser = argparse.ArgumentParser(description='European Indexes MT5 Bot monitor')
+    parser.add_argument('--shm', action='store_true',
+                        help='Read live state from shared memory instead of the state file')
+    parser.add_argument('--interval', type=float, default=None,
+                        help='Refresh interval in seconds (default: 10, or 1 with --shm)')
+    args = parser.parse_args()
+    
+    if args.shm:
+        monitor_shared_memory(args.interval or 1)
+        return
+    
     state_file = Path(__file__).resolve().parents[2] / 'state' / 'european_indexes_mt5_state.json'
     
     print("Starting European Indexes MT5 Bot Monitor...")
@@ -114,7 +198,7 @@ def main():
             else:
                 print("⚠️  Could not load state file")
             
-            time.sleep(10)  # Refresh every 10 seconds
+            time.sleep(args.interval or 10)  # Refresh every 10 seconds
             
     except KeyboardInterrupt:
         print("\n\n👋 Monitoring stopped")
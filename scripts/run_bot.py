@@ -5,10 +5,23 @@ Separate from Alpaca bots - runs independently for prop firm trading
 """
 
 import argparse
+import json
 import sys
 import os
 from pathlib import Path
 
+CONFIG_FILE = Path(__file__).parent.parent / 'config.json'
+
+
+def load_config():
+    """Load config.json (empty dict if missing or invalid)"""
+    try:
+        with open(CONFIG_FILE, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️  Could not load {CONFIG_FILE.name}: {e}")
+        return {}
+
 def main():
     parser = argparse.ArgumentParser(
         description='European Indexes Asia-London Range Trading Bot (MT5)',
@@ -27,6 +40,9 @@ Examples:
   # Smaller lot size
   python run_european_indexes_mt5.py --lot-size 0.01
   
+  # Broker-side entries: OCO limit orders at the Asia range edges
+  python run_european_indexes_mt5.py --entry-mode pending
+  
   # Test connection only
   python run_european_indexes_mt5.py --test
         """
@@ -48,13 +64,40 @@ Examples:
     parser.add_argument('--lot-size', type=float, default=0.01,
                        help='Position size in lots (default: 0.01)')
     
+    parser.add_argument('--max-correlated', type=float, default=None,
+                       help='Max correlated exposure in units of one trade '
+                            '(default: config.json trading_parameters.max_correlated_exposure, else 2.0)')
+    
+    parser.add_argument('--entry-mode', choices=['market', 'pending'], default=None,
+                       help='market: enter on a polled breakout; pending: OCO limit orders at the range edges '
+                            '(default: config.json trading_parameters.entry_mode, else market)')
+    
     parser.add_argument('--test', action='store_true',
                        help='Test MT5 connection and symbols only')
     
     parser.add_argument('--monitor', action='store_true',
                        help='Show monitoring dashboard')
     
+    parser.add_argument('--gateway', nargs='?', const='1', default=None,
+                       help='Use the shared MT5 gateway (optionally its address) instead of a direct terminal connection')
+    
+    parser.add_argument('--close-on-shutdown', action='store_true',
+                       help='Close open positions when the bot stops (default: leave them for warm restart)')
+    
+    parser.add_argument('--status-every', type=int, default=None,
+                       help='Log per-cycle status at INFO every N cycles (default: config.json logging.status_log_every)')
+    
     args = parser.parse_args()
+    config = load_config()
+    logging_config = config.get('logging', {})
+    entry_mode = args.entry_mode or config.get('trading_parameters', {}).get('entry_mode', 'market')
+    max_correlated = args.max_correlated if args.max_correlated is not None else \
+        config.get('trading_parameters', {}).get('max_correlated_exposure', 2.0)
+    
+    # Route MT5 calls through the gateway process (see scripts/run_gateway.py)
+    if args.gateway:
+        os.environ['MT5_GATEWAY'] = args.gateway
+    sys.path.insert(0, str(Path(__file__).parent.parent / 'bot'))
     
     # Test mode
     if args.test:
@@ -62,7 +105,8 @@ Examples:
         print("="*60)
         
         try:
-            import MetaTrader5 as mt5
+            from mt5_gateway import load_mt5
+            mt5 = load_mt5()
             
             if not mt5.initialize():
                 print(f"❌ MT5 initialization failed: {mt5.last_error()}")
@@ -163,20 +207,43 @@ Examples:
     print(f"Risk per Trade: {args.risk_per_trade*100:.0f}%")
     print(f"Daily Risk Limit: {args.daily_risk*100:.0f}%")
     print(f"Lot Size: {args.lot_size}")
+    print(f"Entry Mode: {entry_mode}")
+    print(f"Max Correlated Exposure: {max_correlated}")
     print("="*60)
     print()
     
     try:
-        # Add bot directory to path
-        sys.path.insert(0, str(Path(__file__).parent.parent / 'bot'))
-        from european_indexes_mt5 import EuropeanIndexesMT5Bot
+        from european_indexes_mt5 import EuropeanIndexesMT5Bot, log_file
+        from log_setup import setup_logging
+        
+        # Relative paths are resolved like the default (workspace root, next to state/)
+        configured_log = logging_config.get('log_file')
+        if configured_log:
+            log_file = Path(configured_log)
+            if not log_file.is_absolute():
+                log_file = Path(__file__).resolve().parents[2] / log_file
+        
+        setup_logging(
+            log_file,
+            level=logging_config.get('log_level', 'INFO'),
+            max_bytes=logging_config.get('max_bytes', 10 * 1024 * 1024),
+            backup_count=logging_config.get('backup_count', 5),
+            rotate_when=logging_config.get('rotate_when')
+        )
+        
+        status_every = args.status_every or logging_config.get('status_log_every', 1)
         
         bot = EuropeanIndexesMT5Bot(
             symbols=args.symbols,
             stop_loss_pct=args.stop_loss,
             max_risk_per_trade=args.risk_per_trade,
             max_daily_risk=args.daily_risk,
-            lot_size=args.lot_size
+            lot_size=args.lot_size,
+            status_log_every=status_every,
+            close_on_shutdown=args.close_on_shutdown,
+            symbol_aliases=config.get('symbol_variations'),
+            max_correlated_exposure=max_correlated,
+            entry_mode=entry_mode
         )
         
         bot.run()
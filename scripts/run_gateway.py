@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Run the shared MT5 gateway
+Owns the single terminal connection and serves the bot, monitor and
+research scripts (start those with MT5_GATEWAY=1 or --gateway)
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add bot directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'bot'))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Shared MT5 gateway for the European Indexes bot and tools',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Start the gateway (keep it running)
+  python scripts/run_gateway.py
+
+  # Then, in other terminals
+  python scripts/run_bot.py --gateway
+  MT5_GATEWAY=1 python scripts/test_connection.py
+        """
+    )
+    parser.add_argument('--address', default=None,
+                        help='Socket path / named pipe (default: platform default)')
+    parser.add_argument('--cache-ms', type=float, default=5.0,
+                        help='Read cache TTL in milliseconds (default: 5)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        from mt5_gateway import MT5Gateway, DEFAULT_ADDRESS
+        gateway = MT5Gateway(address=args.address or DEFAULT_ADDRESS, cache_ttl_ms=args.cache_ms)
+    except ImportError:
+        print("❌ MetaTrader5 library not installed")
+        print("Install with: pip install MetaTrader5")
+        return 1
+
+    try:
+        gateway.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Gateway stopped")
+    except Exception as e:
+        print(f"❌ Gateway error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
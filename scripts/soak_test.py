@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Memory Soak Test
+Simulates weeks of unattended running through the bot's in-memory
+components (trade monitor, day rollover, bar builder, exposure model)
+and checks that resident memory stays flat. No MT5 terminal is used.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytz
+
+# Add bot directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'bot'))
+
+# The bot module binds an MT5 handle at import; a gateway client is created
+# lazily and never connects here, so no terminal (or MetaTrader5 package) is needed
+os.environ.setdefault('MT5_GATEWAY', '1')
+
+from european_indexes_mt5 import TradeMonitor
+from journal import TradeJournal
+from day_state import DayStateManager
+from bar_builder import MultiTimeframeBarBuilder
+from exposure import CorrelationExposureLimiter
+
+SYMBOLS = ['GER40', 'FRA40', 'UK100', 'EUSTX50']
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1e3
+    except OSError:
+        pass
+    import resource  # Peak, not current - still catches steady growth
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def simulate_day(day_start: int, rng, monitor, days, bars, args):
+    """One trading day: a full M1 stream per symbol, ranges, trades, errors"""
+    prices = 18000 + np.cumsum(rng.normal(0, 2, (len(SYMBOLS), 1440)), axis=1)
+    for minute in range(1440):
+        t = day_start + minute * 60
+        for i, symbol in enumerate(SYMBOLS):
+            p = prices[i, minute]
+            bars.on_m1(symbol, t, p, p + 1.0, p - 1.0, p, 10.0)
+
+    for symbol in SYMBOLS:
+        days.current.asia_ranges[symbol] = {
+            'date': days.current.date, 'asia_high': 18010.0,
+            'asia_low': 17990.0, 'range_size': 20.0,
+        }
+
+    for n in range(args.trades_per_day):
+        symbol = SYMBOLS[n % len(SYMBOLS)]
+        pnl = float(rng.normal(20, 50))
+        monitor.log_trade(symbol, 'LONG' if n % 2 else 'SHORT', 18000.0, 18000.0 + pnl, pnl, 'TARGET')
+        days.current.daily_risk_used += 0.01
+
+    for n in range(args.errors_per_day):
+        monitor.log_error('DATA_ERROR', f"Simulated error {n}", SYMBOLS[n % len(SYMBOLS)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory soak test over simulated trading days')
+    parser.add_argument('--days', type=int, default=30, help='Days to simulate (default: 30)')
+    parser.add_argument('--trades-per-day', type=int, default=8)
+    parser.add_argument('--errors-per-day', type=int, default=300,
+                        help='More than the in-memory error cap, on purpose (default: 300)')
+    parser.add_argument('--history-limit', type=int, default=50,
+                        help='Trade rows kept across days (small, so trimming is exercised)')
+    parser.add_argument('--warmup-days', type=int, default=5,
+                        help='Days before the RSS baseline is taken (default: 5)')
+    parser.add_argument('--max-growth-mb', type=float, default=5.0,
+                        help='Allowed RSS growth after warm-up (default: 5 MB)')
+    args = parser.parse_args()
+
+    # Simulated trades/errors would flood the console and the bot's log file
+    logging.getLogger('EuropeanIndexesMT5').setLevel(logging.CRITICAL)
+    dubai = pytz.timezone('Asia/Dubai')
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = TradeJournal(os.path.join(tmp, 'journal.jsonl'))
+        monitor = TradeMonitor(os.path.join(tmp, 'state.json'), journal,
+                               history_limit=args.history_limit)
+        start = dubai.localize(datetime(2025, 1, 6))
+        days = DayStateManager(dubai, now=start)
+        monitor.trading_date = days.current.date
+        exposure = CorrelationExposureLimiter(SYMBOLS)
+        bars = MultiTimeframeBarBuilder(SYMBOLS)
+        bars.subscribe(lambda s, tf, bar: exposure.on_bar(s, int(bar['time']), float(bar['close'])),
+                       timeframes=['M5'])
+
+        print("="*70)
+        print(f"Soak test: {args.days} days | {len(SYMBOLS)} symbols | "
+              f"{args.trades_per_day} trades/day | {args.errors_per_day} errors/day")
+        print("="*70)
+        print("In-memory counts are taken at the end of each day, before rollover")
+        print(f"{'Day':>4} {'Date':<11} {'RSS MB':>8} {'Trades':>7} {'Errors':>7} "
+              f"{'Ranges':>7} {'M1 bars':>8} {'Sec':>6}")
+
+        baseline = None
+        rss = rss_mb()
+        for day in range(args.days):
+            started = time.perf_counter()
+            now = start + timedelta(days=day)
+            simulate_day(int(now.timestamp()), rng, monitor, days, bars, args)
+            retained = (len(monitor.store), len(monitor.errors_today), len(days.current.asia_ranges))
+
+            # Same sequence as EuropeanIndexesMT5Bot.roll_day()
+            previous = days.check_rollover(now + timedelta(days=1))
+            if previous is not None:
+                summary = days.day_summary(previous)
+                summary.update(monitor.get_stats())
+                journal.append_day(previous.date, summary)
+                monitor.reset_day(days.current.date)
+
+            rss = rss_mb()
+            if day + 1 == args.warmup_days:
+                baseline = rss
+            print(f"{day + 1:>4} {str(previous.date):<11} {rss:>8.1f} {retained[0]:>7} "
+                  f"{retained[1]:>7} {retained[2]:>7} "
+                  f"{len(bars.bars(SYMBOLS[0], 'M1')):>8} {time.perf_counter() - started:>6.2f}")
+
+        journal_lines = sum(1 for _ in journal.read())
+        journal_mb = os.path.getsize(journal.journal_file) / 1e6
+
+    print("="*70)
+    print(f"Journal: {journal_lines} records ({journal_mb:.2f} MB on disk)")
+    if baseline is None:
+        print("⚠️  Not enough days for a post-warm-up baseline")
+        return 0
+
+    growth = rss - baseline
+    print(f"RSS after warm-up: {baseline:.1f} MB → {rss:.1f} MB ({growth:+.1f} MB)")
+    if growth > args.max_growth_mb:
+        print(f"❌ Memory grew more than {args.max_growth_mb:.1f} MB")
+        return 1
+    print("✅ Memory flat")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@
 Test MT5 Connection and Symbol Availability
 """
 
+import json
 import sys
 from pathlib import Path
 
@@ -10,12 +11,25 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'bot'))
 
 try:
-    import MetaTrader5 as mt5
+    from mt5_gateway import load_mt5
+    mt5 = load_mt5()  # Shared gateway when MT5_GATEWAY is set
 except ImportError:
     print("❌ MetaTrader5 library not installed")
     print("Install with: pip install MetaTrader5")
     sys.exit(1)
 
+from symbol_resolver import SymbolResolver, DEFAULT_ALIASES
+
+CONFIG_FILE = Path(__file__).parent.parent / 'config.json'
+
+def load_aliases():
+    """Alias groups from config.json symbol_variations (defaults if missing)"""
+    try:
+        with open(CONFIG_FILE, 'r') as f:
+            return json.load(f).get('symbol_variations') or DEFAULT_ALIASES
+    except Exception:
+        return DEFAULT_ALIASES
+
 def test_connection():
     """Test MT5 connection"""
     print("="*70)
@@ -51,29 +65,28 @@ def test_connection():
     print("Testing European Index Symbols:")
     print("-"*70)
     
-    test_symbols = {
-        'DAX': ['GER40', 'GER30', 'DE40', 'DAX40'],
-        'CAC40': ['FRA40', 'FR40', 'CAC40'],
-        'FTSE': ['UK100', 'FTSE100'],
-        'Euro STOXX': ['EUSTX50', 'EU50', 'STOXX50']
-    }
+    # One symbols_get() scan resolves every alias group (no per-name probing)
+    resolver = SymbolResolver(load_aliases())
+    symbols = mt5.symbols_get()
+    if symbols is None:
+        print(f"❌ symbols_get() failed: {mt5.last_error()}")
+        mt5.shutdown()
+        return False
+    
+    print(f"Indexed {resolver.build_index(symbols)} broker symbols")
     
     found_symbols = {}
     
-    for index_name, variations in test_symbols.items():
+    for index_name, symbol in resolver.resolve_all(resolver.groups).items():
         print(f"\n{index_name}:")
-        found = False
-        for symbol in variations:
+        if symbol is not None:
             symbol_info = mt5.symbol_info(symbol)
+            print(f"  ✅ {symbol}: {resolver.descriptions.get(symbol, '')}")
             if symbol_info is not None:
-                print(f"  ✅ {symbol}: {symbol_info.description}")
                 print(f"     Spread: {symbol_info.spread} | Digits: {symbol_info.digits}")
-                found_symbols[index_name] = symbol
-                found = True
-                break
-        
-        if not found:
-            print(f"  ❌ None of {variations} found")
+            found_symbols[index_name] = symbol
+        else:
+            print(f"  ❌ None of {resolver.candidates(index_name)} found")
             print(f"     Check your broker's symbol names")
     
     print()